@@ -91,11 +91,11 @@ class NetworkProvider {
     return '$fullPath?$queryString';
   }
 
-  Future<NetworkState> get(String path, {Map<String, dynamic>? query, BackendType backendType = BackendType.nodejs}) async {
+  Future<NetworkState> get(String path, {Map<String, dynamic>? query, BackendType backendType = BackendType.nodejs, bool useCache = true}) async {
     final fullPath = _buildUrl(path, query, backendType);
 
     // Check cache first
-    final cachedData = _cache.getCachedData(fullPath);
+    final cachedData = useCache ? _cache.getCachedData(fullPath) : null;
     if (cachedData != null) {
       return cachedData;
     }
@@ -112,7 +112,7 @@ class NetworkProvider {
       );
 
       // Cache successful responses
-      if (networkState.success) {
+      if (useCache && networkState.success) {
         _cache.cacheData(fullPath, networkState);
       }
 
@@ -189,8 +189,8 @@ class NetworkProvider {
     return get(path, query: query, backendType: BackendType.nodejs);
   }
 
-  Future<NetworkState> getFromPython(String path, {Map<String, dynamic>? query}) async {
-    return get(path, query: query, backendType: BackendType.python);
+  Future<NetworkState> getFromPython(String path, {Map<String, dynamic>? query, bool useCache = true}) async {
+    return get(path, query: query, backendType: BackendType.python, useCache: useCache);
   }
 
   Future<NetworkState> uploadFileToPython({
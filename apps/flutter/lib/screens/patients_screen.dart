@@ -1287,9 +1287,15 @@ class _PatientsScreenState extends ConsumerState<PatientsScreen>
           },
         );
 
-        if (response.success) {
+        // The server processes the file in a background job; poll it until it finishes
+        final jobId = response.data?['job_id'] as String?;
+        final jobState = response.success && jobId != null
+            ? await _waitForUploadJob(jobId)
+            : response;
+
+        if (jobState.success) {
           // Show success message with data summary
-          final uploadedData = response.data;
+          final uploadedData = jobState.data;
           String message = 'Dataset uploaded successfully!';
           
           if (uploadedData != null) {
@@ -1318,7 +1324,7 @@ class _PatientsScreenState extends ConsumerState<PatientsScreen>
               action: SnackBarAction(
                 label: 'View Data',
                 textColor: Colors.white,
-                onPressed: () => _showUploadedDataDialog(response.data),
+                onPressed: () => _showUploadedDataDialog(uploadedData),
               ),
             ),
           );
@@ -1330,7 +1336,7 @@ class _PatientsScreenState extends ConsumerState<PatientsScreen>
                 children: [
                   Icon(Icons.error_outline, color: Colors.white),
                   SizedBox(width: 12),
-                  Expanded(child: Text(response.message ?? 'Upload failed')),
+                  Expanded(child: Text(jobState.message ?? 'Upload failed')),
                 ],
               ),
               backgroundColor: Colors.red,
@@ -1364,6 +1370,35 @@ class _PatientsScreenState extends ConsumerState<PatientsScreen>
     }
   }
 
+  Future<NetworkState> _waitForUploadJob(String jobId) async {
+    const pollInterval = Duration(seconds: 1);
+    const maxWait = Duration(minutes: 10);
+    final deadline = DateTime.now().add(maxWait);
+
+    while (DateTime.now().isBefore(deadline)) {
+      await Future.delayed(pollInterval);
+      final status = await ref.read(networkProvider).getFromPython('/jobs/$jobId', useCache: false);
+      if (!status.success) {
+        return NetworkState(success: false, message: status.message ?? 'Could not check upload progress');
+      }
+
+      final job = status.data?['job'] as Map<String, dynamic>?;
+      switch (job?['status']) {
+        case 'succeeded':
+          return NetworkState(
+            success: true,
+            message: 'File uploaded and processed successfully',
+            data: Map<String, dynamic>.from(job?['result'] as Map? ?? {}),
+          );
+        case 'failed':
+        case 'cancelled':
+        case 'interrupted':
+          return NetworkState(success: false, message: job?['error'] as String? ?? 'Upload job ${job?['status']}');
+      }
+    }
+    return NetworkState(success: false, message: 'Upload is still processing; check back later');
+  }
+
   void _showUploadedDataDialog(Map<String, dynamic>? uploadedData) {
     final colors = ref.read(themeProvider) == ThemeMode.dark
         ? AppColors.dark
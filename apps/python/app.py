@@ -4,7 +4,11 @@ import pandas as pd
 import numpy as np
 import pickle
 import os
+import re
 import joblib
+from model_store import CurrentBundleWatcher, TrainingJobManager, load_bundle, resolve_current_bundle
+from warmup import WARMUP_PATIENT, WarmupState
+from json_provider import json_provider_class
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 import warnings
@@ -15,26 +19,26 @@ warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
 CORS(app)
+# Request and response bodies: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+app.json = json_provider_class(os.environ.get('JSON_PROVIDER', 'auto'))(app)
 
-# Global variables to store the trained model and preprocessing objects
-model = None
-feature_columns = None
-target_encoder = None
-scaler = None
+# Active model bundle (model, feature columns, encoder, scaler). Handlers read it
+# once per request; retraining replaces the whole reference in one assignment.
+model_bundle = None
+
+# Global variables to store the data files
 inventory_data = None
 charges_data = None
 patient_data = None
 
 def load_model_and_data():
     """Load the trained model and data files"""
-    global model, feature_columns, target_encoder, scaler, inventory_data, charges_data, patient_data
+    global model_bundle, inventory_data, charges_data, patient_data
     
     try:
-        # Load the trained model and preprocessing objects
-        model = joblib.load('trained_model.pkl')
-        feature_columns = joblib.load('feature_columns.pkl')
-        target_encoder = joblib.load('target_encoder.pkl')
-        scaler = joblib.load('scaler.pkl')
+        # Load the latest promoted model bundle, or the bundled pickles
+        bundle_path, bundle_version = resolve_current_bundle()
+        model_bundle = load_bundle(bundle_path, bundle_version)
         
         # Load data files
         inventory_data = pd.read_csv('inventory.csv')
@@ -47,37 +51,11 @@ def load_model_and_data():
         print(f"Error loading model: {e}")
         return False
 
-def preprocess_patient_data(patient_data):
+def preprocess_patient_data(patient_data, bundle):
     """Preprocess patient data for prediction"""
     try:
-        # Create DataFrame from patient data
-        patient_df = pd.DataFrame([patient_data])
-        patient_df.columns = patient_df.columns.str.strip()
-        
-        # Parse symptoms and create dummy variables
-        if 'Reported Sym' in patient_df.columns:
-            patient_df['Reported Sym'] = patient_df['Reported Sym'].str.strip().str.replace('"', '').fillna('Unknown')
-            symptom_dummies = patient_df['Reported Sym'].str.get_dummies(sep=', ').add_prefix('Symptom_')
-            patient_df = pd.concat([patient_df, symptom_dummies], axis=1).drop('Reported Sym', axis=1)
-        
-        # One-hot encode categorical features
-        categorical_cols = ['Menopause Stage', 'Ultrasound Fe']
-        for col in categorical_cols:
-            if col in patient_df.columns:
-                patient_df[col] = patient_df[col].str.strip().str.replace('"', '').fillna('Unknown')
-        
-        patient_processed = pd.get_dummies(patient_df, columns=categorical_cols, dtype=float)
-        
-        # Align columns with training features
-        final_patient_features = patient_processed.reindex(columns=feature_columns, fill_value=0)
-        
-        # Scale numerical features
-        numerical_cols = ['Age', 'SI Cyst Size cm', 'Cyst Growth', 'fca 125 Level']
-        cols_to_scale = [col for col in numerical_cols if col in final_patient_features.columns]
-        if cols_to_scale:
-            final_patient_features[cols_to_scale] = scaler.transform(final_patient_features[cols_to_scale])
-        
-        return final_patient_features
+        # Encode straight into a scaled numpy row aligned with the training features
+        return bundle.feature_encoder.encode(patient_data)
     except Exception as e:
         print(f"Error preprocessing data: {e}")
         return None
@@ -103,8 +81,8 @@ def get_cost_and_inventory_info(recommended_plan):
             cost_info = {
                 "status": "Available",
                 "service": cost_row.iloc[0]['Service'],
-                "baseCost": float(cost_row.iloc[0]['Base Cost (KES)']),
-                "outOfPocket": float(cost_row.iloc[0]['Out-of-Pocket (KES)']),
+                "baseCost": cost_row.iloc[0]['Base Cost (KES)'],
+                "outOfPocket": cost_row.iloc[0]['Out-of-Pocket (KES)'],
                 "currency": "KES"
             }
         
@@ -115,7 +93,7 @@ def get_cost_and_inventory_info(recommended_plan):
                 inventory_info = {
                     "status": "Available",
                     "item": inventory_row.iloc[0]['Item'],
-                    "availableStock": int(inventory_row.iloc[0]['Available Stock']),
+                    "availableStock": inventory_row.iloc[0]['Available Stock'],
                     "unit": "pieces"
                 }
     
@@ -130,12 +108,14 @@ def root():
         'description': 'REST API for predicting ovarian cyst treatment plans',
         'endpoints': {
             'health': '/health - Health check endpoint',
+            'ready': '/ready - Readiness probe (200 once warm-up has completed)',
             'predict': '/predict - Basic prediction endpoint',
             'care_template': '/care-template - Complete care template with costs',
             'model_info': '/model-info - Model information and statistics',
             'test_samples': '/test-samples - Test with sample patients',
             'validate_input': '/validate-input - Validate patient input data',
-            'train': '/train - Retrain the model'
+            'train': '/train - Retrain the model in the background',
+            'train_status': '/train/<job_id> - Training job status'
         },
         'timestamp': datetime.now().isoformat()
     })
@@ -145,7 +125,8 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'model_loaded': model is not None,
+        'model_loaded': model_bundle is not None,
+        'model_version': model_bundle.version if model_bundle is not None else None,
         'data_loaded': all([inventory_data is not None, charges_data is not None, patient_data is not None]),
         'timestamp': datetime.now().isoformat(),
         'endpoints_available': [
@@ -160,16 +141,18 @@ def health_check():
 @app.route('/model-info', methods=['GET'])
 def model_info():
     """Get model information and statistics"""
-    if model is None:
+    bundle = model_bundle
+    if bundle is None:
         return jsonify({'error': 'Model not loaded'}), 503
     
     try:
         # Get model statistics
         model_stats = {
-            'model_type': type(model).__name__,
-            'feature_count': len(feature_columns),
-            'treatment_classes': list(target_encoder.classes_),
-            'class_count': len(target_encoder.classes_),
+            'model_type': type(bundle.model).__name__,
+            'model_version': bundle.version,
+            'feature_count': len(bundle.feature_columns),
+            'treatment_classes': list(bundle.target_encoder.classes_),
+            'class_count': len(bundle.target_encoder.classes_),
             'training_samples': len(patient_data) if patient_data is not None else 0
         }
         
@@ -179,19 +162,19 @@ def model_info():
             data_stats = {
                 'total_patients': len(patient_data),
                 'age_range': {
-                    'min': int(patient_data['Age'].min()),
-                    'max': int(patient_data['Age'].max()),
-                    'mean': float(patient_data['Age'].mean())
+                    'min': patient_data['Age'].min(),
+                    'max': patient_data['Age'].max(),
+                    'mean': patient_data['Age'].mean()
                 },
                 'cyst_size_range': {
-                    'min': float(patient_data['SI Cyst Size cm'].min()),
-                    'max': float(patient_data['SI Cyst Size cm'].max()),
-                    'mean': float(patient_data['SI Cyst Size cm'].mean())
+                    'min': patient_data['SI Cyst Size cm'].min(),
+                    'max': patient_data['SI Cyst Size cm'].max(),
+                    'mean': patient_data['SI Cyst Size cm'].mean()
                 },
                 'ca125_range': {
-                    'min': int(patient_data['fca 125 Level'].min()),
-                    'max': int(patient_data['fca 125 Level'].max()),
-                    'mean': float(patient_data['fca 125 Level'].mean())
+                    'min': patient_data['fca 125 Level'].min(),
+                    'max': patient_data['fca 125 Level'].max(),
+                    'mean': patient_data['fca 125 Level'].mean()
                 }
             }
         
@@ -275,7 +258,8 @@ def predict():
                 'timestamp': datetime.now().isoformat()
             }), 400
         
-        if model is None:
+        bundle = model_bundle
+        if bundle is None:
             return jsonify({
                 'success': False,
                 'error': 'Model not loaded',
@@ -283,7 +267,7 @@ def predict():
             }), 503
         
         # Preprocess the patient data
-        processed_data = preprocess_patient_data(data)
+        processed_data = preprocess_patient_data(data, bundle)
         if processed_data is None:
             return jsonify({
                 'success': False,
@@ -292,19 +276,19 @@ def predict():
             }), 400
         
         # Make prediction
-        prediction_encoded = model.predict(processed_data)
-        recommended_plan = target_encoder.inverse_transform(prediction_encoded)[0]
+        prediction_encoded = bundle.model.predict(processed_data)
+        recommended_plan = bundle.target_encoder.inverse_transform(prediction_encoded)[0]
         
         # Get prediction probabilities
-        probabilities = model.predict_proba(processed_data)[0]
+        probabilities = bundle.model.predict_proba(processed_data)[0]
         confidence = max(probabilities)
         
         return jsonify({
             'success': True,
             'prediction': recommended_plan,
-            'confidence': float(confidence),
+            'confidence': confidence,
             'probabilities': {
-                target_encoder.classes_[i]: float(prob) 
+                bundle.target_encoder.classes_[i]: prob 
                 for i, prob in enumerate(probabilities)
             },
             'patient_data': data,
@@ -331,7 +315,8 @@ def generate_care_template():
                 'timestamp': datetime.now().isoformat()
             }), 400
         
-        if model is None:
+        bundle = model_bundle
+        if bundle is None:
             return jsonify({
                 'success': False,
                 'error': 'Model not loaded',
@@ -339,7 +324,7 @@ def generate_care_template():
             }), 503
         
         # Preprocess the patient data
-        processed_data = preprocess_patient_data(data)
+        processed_data = preprocess_patient_data(data, bundle)
         if processed_data is None:
             return jsonify({
                 'success': False,
@@ -348,11 +333,11 @@ def generate_care_template():
             }), 400
         
         # Make prediction
-        prediction_encoded = model.predict(processed_data)
-        recommended_plan = target_encoder.inverse_transform(prediction_encoded)[0]
+        prediction_encoded = bundle.model.predict(processed_data)
+        recommended_plan = bundle.target_encoder.inverse_transform(prediction_encoded)[0]
         
         # Get prediction probabilities
-        probabilities = model.predict_proba(processed_data)[0]
+        probabilities = bundle.model.predict_proba(processed_data)[0]
         confidence = max(probabilities)
         
         # Generate cost and inventory information
@@ -361,9 +346,9 @@ def generate_care_template():
         return jsonify({
             'success': True,
             'prediction': recommended_plan,
-            'confidence': float(confidence),
+            'confidence': confidence,
             'probabilities': {
-                target_encoder.classes_[i]: float(prob) 
+                bundle.target_encoder.classes_[i]: prob 
                 for i, prob in enumerate(probabilities)
             },
             'cost_info': cost_info,
@@ -388,7 +373,8 @@ def generate_care_template():
 def test_samples():
     """Test the model with sample patients from the dataset"""
     try:
-        if model is None:
+        bundle = model_bundle
+        if bundle is None:
             return jsonify({
                 'success': False,
                 'error': 'Model not loaded',
@@ -411,17 +397,17 @@ def test_samples():
                 patient = patient_data.iloc[idx]
                 
                 # Make prediction
-                result = predict_patient(patient)
+                result = predict_patient(patient, bundle)
                 if result:
                     results.append({
                         'test_case': i + 1,
                         'patient_id': patient['Patient ID'],
                         'patient_data': {
-                            'age': int(patient['Age']),
+                            'age': patient['Age'],
                             'menopause_stage': patient['Menopause Stage'],
-                            'cyst_size': float(patient['SI Cyst Size cm']),
-                            'cyst_growth': float(patient['Cyst Growth']),
-                            'ca125_level': int(patient['fca 125 Level']),
+                            'cyst_size': patient['SI Cyst Size cm'],
+                            'cyst_growth': patient['Cyst Growth'],
+                            'ca125_level': patient['fca 125 Level'],
                             'ultrasound_features': patient['Ultrasound Fe'],
                             'reported_symptoms': patient['Reported Sym']
                         },
@@ -442,20 +428,20 @@ def test_samples():
             'timestamp': datetime.now().isoformat()
         }), 500
 
-def predict_patient(patient):
+def predict_patient(patient, bundle):
     """Helper function to predict for a single patient"""
     try:
         # Preprocess the patient data
-        processed_data = preprocess_patient_data(patient)
+        processed_data = preprocess_patient_data(patient, bundle)
         if processed_data is None:
             return None
         
         # Make prediction
-        prediction_encoded = model.predict(processed_data)
-        recommended_plan = target_encoder.inverse_transform(prediction_encoded)[0]
+        prediction_encoded = bundle.model.predict(processed_data)
+        recommended_plan = bundle.target_encoder.inverse_transform(prediction_encoded)[0]
         
         # Get prediction probabilities
-        probabilities = model.predict_proba(processed_data)[0]
+        probabilities = bundle.model.predict_proba(processed_data)[0]
         confidence = max(probabilities)
         
         # Get cost and inventory information
@@ -463,9 +449,9 @@ def predict_patient(patient):
         
         return {
             'prediction': recommended_plan,
-            'confidence': float(confidence),
+            'confidence': confidence,
             'probabilities': {
-                target_encoder.classes_[i]: float(prob) 
+                bundle.target_encoder.classes_[i]: prob 
                 for i, prob in enumerate(probabilities)
             },
             'cost_info': cost_info,
@@ -476,33 +462,83 @@ def predict_patient(patient):
         print(f"Error making prediction: {e}")
         return None
 
+def run_training():
+    """Train a new model from patient_data.csv and return its artifacts"""
+    from feature_cache import load_training_frame
+    from ovarian_cyst_predictor import train_and_evaluate
+    
+    # Preprocessed data, reused from the feature cache while patient_data.csv is unchanged
+    processed_data, target_label_encoder = load_training_frame('patient_data.csv')
+    
+    # Train
+    model, feature_columns, scaler = train_and_evaluate(processed_data, target_label_encoder)
+    
+    return {
+        'model': model,
+        'feature_columns': feature_columns,
+        'target_encoder': target_label_encoder,
+        'scaler': scaler
+    }
+
+def activate_model_bundle(bundle):
+    """Swap in a newly trained bundle; in-flight requests keep the old one"""
+    global model_bundle
+    model_bundle = bundle
+
+training_jobs = TrainingJobManager(run_training, activate_model_bundle)
+
+# A /train job promotes its bundle through models/CURRENT; every other worker switches to it
+# on a request at most MODEL_RELOAD_INTERVAL seconds later
+bundle_watcher = CurrentBundleWatcher(lambda: model_bundle.version if model_bundle is not None else None,
+                                      activate_model_bundle,
+                                      check_interval=float(os.environ.get('MODEL_RELOAD_INTERVAL', 2.0)))
+
+@app.before_request
+def pick_up_promoted_model():
+    if model_bundle is not None:
+        bundle_watcher.check()
+
+def reinit_after_fork():
+    """Reset per-process state in a worker forked from a preloaded master"""
+    training_jobs.reset_after_fork()
+    bundle_watcher.reset_after_fork()
+    # A worker forked after a promotion would otherwise serve the master's boot-time bundle
+    if model_bundle is not None:
+        bundle_watcher.check(force=True)
+
+# Readiness: set once warm_up() has driven requests through the hot paths
+warmup_state = WarmupState()
+
+WARMUP_STEPS = [
+    {'name': 'predict', 'method': 'POST', 'path': '/predict', 'json': WARMUP_PATIENT},
+    {'name': 'care_template', 'method': 'POST', 'path': '/care-template', 'json': WARMUP_PATIENT},
+    {'name': 'test_samples', 'method': 'GET', 'path': '/test-samples'}
+]
+
+def warm_up():
+    """Run the warm-up requests after load_model_and_data(); /ready answers 200 once they pass"""
+    return warmup_state.run(app, WARMUP_STEPS)['ok']
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 only after warm-up has completed"""
+    status = warmup_state.status()
+    status['timestamp'] = datetime.now().isoformat()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.route('/train', methods=['POST'])
 def train_model():
-    """Train the model with new data"""
+    """Start retraining the model in the background"""
     try:
-        from ovarian_cyst_predictor import preprocess_and_clean, train_and_evaluate
-        
-        # Load the original data
-        original_patient_data = pd.read_csv('patient_data.csv')
-        
-        # Preprocess and train
-        processed_data, target_label_encoder = preprocess_and_clean(original_patient_data)
-        model, feature_columns, scaler = train_and_evaluate(processed_data, target_label_encoder)
-        
-        # Save the trained model and preprocessing objects
-        joblib.dump(model, 'trained_model.pkl')
-        joblib.dump(feature_columns, 'feature_columns.pkl')
-        joblib.dump(target_label_encoder, 'target_encoder.pkl')
-        joblib.dump(scaler, 'scaler.pkl')
-        
-        # Reload the model
-        load_model_and_data()
+        job, created = training_jobs.start()
         
         return jsonify({
             'success': True,
-            'message': 'Model trained and saved successfully',
+            'message': 'Training started' if created else 'A training job is already running',
+            'job': job,
+            'status_url': f"/train/{job['job_id']}",
             'timestamp': datetime.now().isoformat()
-        })
+        }), 202 if created else 409
         
     except Exception as e:
         return jsonify({
@@ -511,9 +547,28 @@ def train_model():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@app.route('/train/<job_id>', methods=['GET'])
+def train_status(job_id):
+    """Get the status of a training job"""
+    job = training_jobs.get(job_id) if re.fullmatch(r'[0-9a-f]{12}', job_id) else None
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Training job {job_id} not found',
+            'timestamp': datetime.now().isoformat()
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job,
+        'active_model_version': model_bundle.version if model_bundle is not None else None,
+        'timestamp': datetime.now().isoformat()
+    })
+
 if __name__ == '__main__':
     # Load the model on startup
     if load_model_and_data():
+        warm_up()
         print("🚀 Starting API Server...")
         print("🌐 Server running at: http://127.0.0.1:5001")
         app.run(host='127.0.0.1', port=5001, debug=True)
@@ -0,0 +1,124 @@
+"""
+JSON serialization benchmark for the Ovarian Cyst Prediction API
+Times each endpoint through the Flask test client and the share of that time spent encoding and decoding JSON
+"""
+
+import argparse
+import time
+import warnings
+from typing import Any, Dict, List
+
+from json_provider import JSON_PROVIDERS, json_provider_class
+from warmup import WARMUP_HEADER, WARMUP_PATIENT
+
+
+class JSONTimer:
+    """Wraps a provider's dumps/loads/response and adds up the time spent in them"""
+
+    def __init__(self, provider: Any):
+        self.seconds = 0.0
+        self._depth = 0
+        for name in ('dumps', 'loads', 'response'):
+            setattr(provider, name, self._timed(getattr(provider, name)))
+
+    def _timed(self, method):
+        def timed(*args, **kwargs):
+            # Only the outermost call counts: response() and fragments call dumps() again
+            self._depth += 1
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    self.seconds += time.perf_counter() - started
+        return timed
+
+
+def benchmark_requests(server: Any, batch_size: int) -> List[Dict[str, Any]]:
+    head = server.patient_repository.head(batch_size)
+    batch = head[server.PATIENT_FIELDS].to_dict('records')
+    patient_id = head['Patient ID'].iloc[0]
+    return [
+        {'name': 'GET /', 'method': 'GET', 'path': '/'},
+        {'name': 'GET /health', 'method': 'GET', 'path': '/health'},
+        {'name': 'POST /predict', 'method': 'POST', 'path': '/predict', 'json': WARMUP_PATIENT},
+        {'name': f'POST /predict/batch ({len(batch)})', 'method': 'POST', 'path': '/predict/batch',
+         'json': {'patients': batch}},
+        {'name': 'POST /care-template', 'method': 'POST', 'path': '/care-template', 'json': WARMUP_PATIENT},
+        {'name': 'GET /patient/<id>/care-template', 'method': 'GET', 'path': f'/patient/{patient_id}/care-template'},
+        {'name': 'POST /cost-estimation', 'method': 'POST', 'path': '/cost-estimation', 'json': WARMUP_PATIENT},
+        {'name': 'POST /inventory-status', 'method': 'POST', 'path': '/inventory-status', 'json': WARMUP_PATIENT},
+        {'name': 'GET /patients (100)', 'method': 'GET', 'path': '/patients?page=1&per_page=100'},
+        {'name': 'GET /patients (NDJSON)', 'method': 'GET', 'path': '/patients',
+         'headers': {'Accept': server.NDJSON_MIMETYPE}},
+        {'name': 'GET /search-patients', 'method': 'GET', 'path': '/search-patients?q=OC-10'}
+    ]
+
+
+def run_benchmark(server: Any, providers: List[str], repeat: int, batch_size: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Mean milliseconds per request and in JSON for every endpoint, for each provider"""
+    app = server.app
+    client = app.test_client()
+    steps = benchmark_requests(server, batch_size)
+    results = {}
+    for name in providers:
+        app.json = json_provider_class(name)(app)
+        timer = JSONTimer(app.json)
+        rows = []
+        for step in steps:
+            # Marked as warm-up traffic so the benchmark does not record assessments
+            headers = dict(step.get('headers', {}), **{WARMUP_HEADER: 'benchmark'})
+            call = lambda: client.open(step['path'], method=step['method'], json=step.get('json'), headers=headers)
+            response = call()
+            if response.status_code != 200:
+                raise RuntimeError(f"{step['name']} returned {response.status_code}")
+            response.get_data()
+            timer.seconds = 0.0
+            started = time.perf_counter()
+            for _ in range(repeat):
+                call().get_data()
+            total = time.perf_counter() - started
+            rows.append({
+                'endpoint': step['name'],
+                'request_ms': total * 1000.0 / repeat,
+                'json_ms': timer.seconds * 1000.0 / repeat,
+                'bytes': len(response.get_data())
+            })
+        results[name] = rows
+    return results
+
+
+def print_report(results: Dict[str, List[Dict[str, Any]]]):
+    names = list(results)
+    header = f"{'Endpoint':<36}{'Bytes':>9}"
+    for name in names:
+        header += f"{name + ' ms':>14}{'JSON ms':>10}{'share':>8}"
+    print(header)
+    print('-' * len(header))
+    for i, row in enumerate(results[names[0]]):
+        line = f"{row['endpoint']:<36}{row['bytes']:>9}"
+        for name in names:
+            entry = results[name][i]
+            share = entry['json_ms'] / entry['request_ms'] if entry['request_ms'] else 0.0
+            line += f"{entry['request_ms']:>14.3f}{entry['json_ms']:>10.3f}{share:>8.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure the share of each endpoint spent in JSON encoding and decoding')
+    parser.add_argument('--providers', nargs='+', default=['stdlib', 'orjson'],
+                        choices=[name for name in JSON_PROVIDERS if name != 'auto'],
+                        help='JSON providers to compare (default: stdlib orjson)')
+    parser.add_argument('--repeat', type=int, default=200, help='Requests per endpoint (default: 200)')
+    parser.add_argument('--batch-size', type=int, default=100, help='Patients in the /predict/batch body (default: 100)')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    import enhanced_api_server as server
+
+    if not server.load_model_and_data():
+        print("❌ Failed to load model and data. Train a model first with: python train_model.py")
+    else:
+        print(f"⏱️ {args.repeat} requests per endpoint through the Flask test client\n")
+        print_report(run_benchmark(server, args.providers, args.repeat, args.batch_size))
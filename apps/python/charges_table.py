@@ -0,0 +1,259 @@
+"""
+Precomputed cost estimates for the Ovarian Cyst Prediction API
+Compiles hospital_charges.csv into estimates keyed by treatment plan, facility and region
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+CHARGES_PATH = 'hospital_charges.csv'
+REQUIRED_COLUMNS = ('Facility', 'Region', 'Service', 'Base Cost (KES)')
+
+# Charge-sheet service priced for each treatment plan; the first row whose Service contains it is used
+PLAN_SERVICES = {
+    'Surgery': 'Ovarian Cystec',
+    'Medication': 'Pain Managem',
+    'Observation': 'Initial Consult',
+    'Referral': 'Referral Speci'
+}
+
+RISK_MULTIPLIERS = {
+    'Low': 1.0,
+    'Medium': 1.2,
+    'High': 1.5
+}
+
+# Financing options (Kenyan context)
+FINANCING_OPTIONS = {
+    'cash_payment': {
+        'discount': 0.05,  # 5% discount for cash payment
+        'description': 'Cash payment with 5% discount'
+    },
+    'nhif': {
+        'coverage': 0.8,  # 80% coverage
+        'description': 'NHIF coverage (80% of total cost)',
+        'requirements': ['Valid NHIF card', 'Referral letter']
+    },
+    'insurance': {
+        'coverage': 0.9,  # 90% coverage
+        'description': 'Private insurance coverage (90% of total cost)',
+        'requirements': ['Insurance card', 'Pre-authorization']
+    },
+    'installment': {
+        'down_payment': 0.3,  # 30% down payment
+        'months': 6,
+        'interest_rate': 0.12,  # 12% annual interest
+        'description': '6-month installment plan with 12% interest'
+    }
+}
+
+# (base cost, service, facility, region) of the charge row an estimate is priced from
+Charge = Tuple[float, str, Optional[str], Optional[str]]
+NO_CHARGE: Charge = (0, '', None, None)
+
+
+def _key(value: Any) -> Optional[str]:
+    """Facility and region names are matched ignoring case and surrounding spaces"""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return str(value).strip().lower() or None
+
+
+def additional_costs(plan: str) -> Dict[str, int]:
+    """Fixed costs added to the base charge"""
+    return {
+        'consultation': 2000,
+        'ultrasound': 3000,
+        'lab_tests': 1500,
+        'medications': 5000 if plan == 'Medication' else 0,
+        'follow_up': 2000
+    }
+
+
+def financing_costs(adjusted_cost: float) -> Dict[str, Dict[str, Any]]:
+    """What the patient pays under each financing option"""
+    costs = {}
+    for option, details in FINANCING_OPTIONS.items():
+        if option == 'cash_payment':
+            costs[option] = {
+                'amount': adjusted_cost * (1 - details['discount']),
+                'description': details['description']
+            }
+        elif option in ['nhif', 'insurance']:
+            costs[option] = {
+                'amount': adjusted_cost * (1 - details['coverage']),
+                'description': details['description'],
+                'requirements': details['requirements']
+            }
+        elif option == 'installment':
+            monthly_payment = (adjusted_cost * (1 - details['down_payment']) *
+                               (1 + details['interest_rate'] * details['months'] / 12)) / details['months']
+            costs[option] = {
+                'down_payment': adjusted_cost * details['down_payment'],
+                'monthly_payment': monthly_payment,
+                'total_amount': adjusted_cost * details['down_payment'] + monthly_payment * details['months'],
+                'description': details['description']
+            }
+    return costs
+
+
+def build_estimates(plan: str, charge: Charge) -> Dict[str, Dict[str, Any]]:
+    """The estimate for every risk level, priced from one charge row"""
+    base_cost, service_name, facility, region = charge
+    extra = additional_costs(plan)
+    total_base_cost = base_cost + sum(extra.values())
+    estimates = {}
+    for risk_level, multiplier in RISK_MULTIPLIERS.items():
+        adjusted_cost = total_base_cost * multiplier
+        estimates[risk_level] = {
+            'base_cost': base_cost,
+            'additional_costs': extra,
+            'total_base_cost': total_base_cost,
+            'risk_adjusted_cost': adjusted_cost,
+            'financing_options': financing_costs(adjusted_cost),
+            'currency': 'KES',
+            'service_name': service_name,
+            'facility': facility,
+            'region': region
+        }
+    return estimates
+
+
+class ChargesTable:
+    """Estimates for every plan and risk level, nationally and per facility and region
+
+    Built once from the charges sheet; never modified afterwards, so it can
+    be read from any thread while a replacement is being built.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        missing = [column for column in REQUIRED_COLUMNS if column not in frame.columns]
+        if missing:
+            raise ValueError(f"Charges sheet is missing columns: {', '.join(missing)}")
+        self.rows = len(frame)
+        self._national: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._by_facility: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+        self._by_region: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+
+        for plan, service in PLAN_SERVICES.items():
+            matches = frame[frame['Service'].str.contains(service, regex=False, na=False)]
+            charges = list(zip(matches['Base Cost (KES)'].astype(float).tolist(), matches['Service'].tolist(),
+                               matches['Facility'].tolist(), matches['Region'].tolist()))
+            self._national[plan] = build_estimates(plan, self._charge(charges[0]) if charges else NO_CHARGE)
+            # Reversed so the first row for each facility or region wins, as for the national charge
+            for charge in reversed(charges):
+                charge = self._charge(charge)
+                estimates = build_estimates(plan, charge)
+                if _key(charge[2]):
+                    self._by_facility[(plan, _key(charge[2]))] = estimates
+                if _key(charge[3]):
+                    self._by_region[(plan, _key(charge[3]))] = estimates
+
+    @staticmethod
+    def _charge(row: Tuple[Any, Any, Any, Any]) -> Charge:
+        base_cost, service, facility, region = row
+        return base_cost, service, None if _key(facility) is None else facility, None if _key(region) is None else region
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'ChargesTable':
+        return cls(pd.read_csv(path))
+
+    def estimate(self, plan: str, risk_level: str, facility: Optional[str] = None,
+                 region: Optional[str] = None) -> Dict[str, Any]:
+        """Estimate priced at ``facility``, else in ``region``, else from the first charge for the plan
+
+        Raises KeyError for an unknown risk level. The nested dicts are shared
+        between calls and must not be modified.
+        """
+        estimates = (self._by_facility.get((plan, _key(facility)))
+                     or self._by_region.get((plan, _key(region)))
+                     or self._national.get(plan))
+        if estimates is None:
+            estimates = build_estimates(plan, NO_CHARGE)
+        return dict(estimates[risk_level])
+
+
+class ChargesLookup:
+    """The current ChargesTable for a charges file, rebuilt when the file changes
+
+    The file is checked at most every ``check_interval`` seconds. A new table
+    is built completely before it replaces the old one, so an estimate never
+    mixes rows from two versions of the file. If the new file cannot be read,
+    the previous table stays in use.
+    """
+
+    def __init__(self, path: str = CHARGES_PATH, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = max(0.0, float(check_interval))
+        self._lock = threading.Lock()
+        self._signature = self._stat()
+        self._table = ChargesTable.from_csv(path)
+        self._checked_at = time.monotonic()
+        self.version = 1
+        self.loaded_at = datetime.now().isoformat()
+        self.last_error: Optional[str] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self) -> bool:
+        """Rebuild the table if the file changed since it was loaded; True when it was replaced"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        # One rebuild at a time; other threads keep using the current table meanwhile
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if signature == self._signature:
+                return False
+            # Recorded first so a file that cannot be parsed is not retried on every check
+            self._signature = signature
+            try:
+                table = ChargesTable.from_csv(self.path)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ Could not reload {self.path}, keeping the previous charges: {e}")
+                return False
+            self._table = table
+            self.version += 1
+            self.loaded_at = datetime.now().isoformat()
+            self.last_error = None
+            print(f"✅ Reloaded {self.path} ({table.rows} charges)")
+            return True
+        finally:
+            self._lock.release()
+
+    @property
+    def table(self) -> ChargesTable:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self.refresh()
+        return self._table
+
+    def estimate(self, plan: str, risk_level: str, facility: Optional[str] = None,
+                 region: Optional[str] = None) -> Dict[str, Any]:
+        return self.table.estimate(plan, risk_level, facility=facility, region=region)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'rows': self._table.rows,
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'last_error': self.last_error
+        }
+
+    def reset_after_fork(self):
+        """Replace the lock inherited from the parent process"""
+        self._lock = threading.Lock()
@@ -0,0 +1,127 @@
+"""
+Streaming dataset ingestion for the Ovarian Cyst Prediction API
+Reads uploaded spreadsheets in row chunks and writes scored output as it goes
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 5000
+SUPPORTED_EXTENSIONS = ['csv', 'xlsx', 'xls', 'parquet']
+
+
+def _excel_header(values) -> List[str]:
+    """Column names for an Excel header row, named like pandas does for blanks"""
+    return [str(value) if value is not None else f'Unnamed: {i}'
+            for i, value in enumerate(values)]
+
+
+def _iter_xlsx(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream the first worksheet of an .xlsx file in row chunks (read-only mode)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _excel_header(header)
+
+        buffer = []
+        for values in rows:
+            if all(value is None for value in values):
+                continue
+            buffer.append(values[:len(columns)])
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=columns)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _iter_parquet(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a Parquet file record batch by record batch"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet uploads require the 'pyarrow' package")
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+
+def iter_dataset_chunks(path: str, file_extension: str,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield the rows of an uploaded dataset as DataFrames of at most ``chunk_size`` rows"""
+    if file_extension == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif file_extension == 'xlsx':
+        yield from _iter_xlsx(path, chunk_size)
+    elif file_extension == 'xls':
+        # The legacy binary format has no streaming reader; slice it after loading
+        frame = pd.read_excel(path)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size]
+    elif file_extension == 'parquet':
+        yield from _iter_parquet(path, chunk_size)
+    else:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+
+
+def run_dataset_pipeline(path: str, file_extension: str, output_path: str,
+                         score_chunk: Callable[[pd.DataFrame], Tuple[pd.DataFrame, Dict[str, int]]],
+                         chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Score a dataset chunk by chunk, appending each scored chunk to ``output_path``
+
+    ``score_chunk`` returns the scored rows and counters for one chunk
+    (``processed``, ``failed``, ``predicted``). Only one chunk is held in
+    memory at a time. ``on_chunk`` receives the progress record of every
+    finished chunk and may raise to abort the run.
+    """
+    summary = {'total_records': 0, 'processed_records': 0, 'failed_records': 0,
+               'predicted_records': 0, 'chunks': []}
+    started = time.monotonic()
+    header_written = False
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w', newline='', encoding='utf-8') as output:
+        for chunk_number, chunk in enumerate(iter_dataset_chunks(path, file_extension, chunk_size)):
+            chunk_started = time.monotonic()
+            # Index rows by their position in the file, whichever reader produced them
+            chunk.index = pd.RangeIndex(summary['total_records'], summary['total_records'] + len(chunk))
+            scored, counts = score_chunk(chunk)
+            scored.to_csv(output, header=not header_written, index=False)
+            output.flush()  # scored rows are readable while the rest is processed
+            header_written = True
+
+            progress = {
+                'chunk': chunk_number + 1,
+                'rows': len(chunk),
+                'processed': counts['processed'],
+                'failed': counts['failed'],
+                'predicted': counts['predicted'],
+                'seconds': round(time.monotonic() - chunk_started, 4)
+            }
+            summary['total_records'] += len(chunk)
+            summary['processed_records'] += counts['processed']
+            summary['failed_records'] += counts['failed']
+            summary['predicted_records'] += counts['predicted']
+            summary['chunks'].append(progress)
+            print(f"📦 Chunk {progress['chunk']}: {progress['rows']} rows, "
+                  f"{progress['processed']} scored, {progress['failed']} failed "
+                  f"({progress['seconds']:.2f}s)")
+            if on_chunk is not None:
+                on_chunk(dict(progress, total_records=summary['total_records']))
+
+    elapsed = time.monotonic() - started
+    summary['seconds'] = round(elapsed, 4)
+    summary['rows_per_second'] = round(summary['total_records'] / elapsed, 1) if elapsed > 0 else 0.0
+    return summary
@@ -1,18 +1,43 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import pandas as pd
-import numpy as np
 import os
-import joblib
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-import warnings
-from datetime import datetime, timedelta
 import json
+import re
+import shutil
 import uuid
-import requests
+import warnings
+from datetime import datetime, timedelta
 from typing import Dict
 
+from startup_timing import StartupTimer
+
+# Heavy imports are timed for the startup report. Training (sklearn fitting),
+# Excel and PDF libraries are imported only when an endpoint first needs them.
+startup_timer = StartupTimer()
+with startup_timer.importing('flask'):
+    from flask import Flask, Response, g, has_request_context, request, jsonify, send_file, stream_with_context
+    from flask_cors import CORS
+    from werkzeug.utils import secure_filename
+with startup_timer.importing('numpy'):
+    import numpy as np
+with startup_timer.importing('pandas'):
+    import pandas as pd
+with startup_timer.importing('model_store'):
+    from model_store import MODELS_DIR, CurrentBundleWatcher, TrainingJobManager, legacy_files_missing, load_bundle, resolve_current_bundle
+with startup_timer.importing('serving modules'):
+    from inference_scheduler import InferenceScheduler
+    from forest_engine import FlattenedForest, verify_engine
+    from prediction_cache import PredictionCache
+    from risk_scoring import RiskScorer
+    from dataset_pipeline import DEFAULT_CHUNK_SIZE, SUPPORTED_EXTENSIONS, run_dataset_pipeline
+    from job_queue import JOBS_DIR, JobManager
+    from pdf_extraction import DEFAULT_PAGE_BUDGET, DEFAULT_PAGES_PER_TASK, PdfExtractor, count_pages, default_workers
+    from warmup import WARMUP_HEADER, WARMUP_PATIENT, WarmupState
+    from feedback_store import FEEDBACK_PATH, FeedbackStore
+    from explanations import DEFAULT_TOP_K, explain_rows, summarize_explanation
+    from patient_store import PATIENT_DB_PATH, decode_cursor, encode_cursor, open_patient_repository
+    from model_registry import PRIMARY_MODEL, ROUTE_HEADER, ModelRegistry, parse_model_list
+    from json_provider import JSONFragment, fragment_map, json_provider_class
+    from charges_table import CHARGES_PATH, ChargesLookup
+
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
@@ -24,8 +49,80 @@ feature_columns = None
 target_encoder = None
 scaler = None
 inventory_data = None
-charges_data = None
-patient_data = None
+charges_lookup = None
+patient_repository = None
+feature_encoder = None
+inference_model = None
+model_version = None
+model_bundle = None
+
+# Upper bound on patients accepted by /predict/batch in one request
+MAX_BATCH_SIZE = 500
+
+# Streaming (Accept: application/x-ndjson) responses are produced this many records at a time
+NDJSON_MIMETYPE = 'application/x-ndjson'
+NDJSON_CHUNK_SIZE = 64
+
+# Encoder for request and response bodies: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+app.json = json_provider_class(JSON_PROVIDER)(app)
+
+# Micro-batching of concurrent single-patient predictions
+INFERENCE_BATCH_SIZE = int(os.environ.get('INFERENCE_BATCH_SIZE', 32))
+INFERENCE_MAX_WAIT_MS = float(os.environ.get('INFERENCE_MAX_WAIT_MS', 2.0))
+
+# Prediction backend: 'numpy' (flattened forest) or 'sklearn'
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'numpy').lower()
+
+# Prediction cache sizing (entries) and time-to-live (seconds)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 1024))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 300))
+
+# Dataset uploads are read and scored in chunks of this many rows; scored
+# output is written to UPLOAD_RESULTS_DIR as it is produced
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+UPLOAD_RESULTS_DIR = os.environ.get('UPLOAD_RESULTS_DIR', 'uploads')
+
+# Uploads are processed by a background pool; job state is kept in JOBS_DIR
+UPLOAD_JOB_WORKERS = int(os.environ.get('UPLOAD_JOB_WORKERS', 2))
+UPLOAD_JOBS_KEEP = int(os.environ.get('UPLOAD_JOBS_KEEP', 200))
+UPLOAD_JOBS_DIR = os.environ.get('UPLOAD_JOBS_DIR', JOBS_DIR)
+
+# PDF uploads: pages read per job (a request may ask for fewer), extraction
+# processes, and pages handed to a process at a time
+PDF_PAGE_BUDGET = int(os.environ.get('PDF_PAGE_BUDGET', DEFAULT_PAGE_BUDGET))
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', default_workers()))
+PDF_PAGES_PER_TASK = int(os.environ.get('PDF_PAGES_PER_TASK', DEFAULT_PAGES_PER_TASK))
+
+# Extra models served next to the primary one: MODEL_CANDIDATES="tree=<version or bundle path>".
+# MODEL_ROUTING_SPLIT="tree=10" sends 10% of requests to a candidate; MODEL_SHADOW="tree" scores
+# every request with it in the background and only logs the result (to SHADOW_LOG_PATH if set)
+MODEL_CANDIDATES = parse_model_list(os.environ.get('MODEL_CANDIDATES', ''))
+MODEL_ROUTING_SPLIT = {name: float(percent) for name, percent in parse_model_list(os.environ.get('MODEL_ROUTING_SPLIT', '')).items()}
+MODEL_SHADOW = [name.strip() for name in os.environ.get('MODEL_SHADOW', '').split(',') if name.strip()]
+SHADOW_LOG_PATH = os.environ.get('SHADOW_LOG_PATH') or None
+
+# Patients from the bundled data sent through /predict/batch during warm-up
+WARMUP_BATCH_SIZE = int(os.environ.get('WARMUP_BATCH_SIZE', 64))
+
+# Confirmed outcomes posted to /feedback, and the incremental updates trained on them
+FEEDBACK_STORE_PATH = os.environ.get('FEEDBACK_PATH', FEEDBACK_PATH)
+INCREMENTAL_NEW_TREES = int(os.environ.get('INCREMENTAL_NEW_TREES', 50))
+INCREMENTAL_WINDOW = int(os.environ.get('INCREMENTAL_WINDOW', 50000))
+INCREMENTAL_HOLDOUT_FRACTION = float(os.environ.get('INCREMENTAL_HOLDOUT_FRACTION', 0.25))
+INCREMENTAL_MIN_FEEDBACK = int(os.environ.get('INCREMENTAL_MIN_FEEDBACK', 10))
+INCREMENTAL_MAX_ACCURACY_DROP = float(os.environ.get('INCREMENTAL_MAX_ACCURACY_DROP', 0.0))
+
+# Where patient records are served from: 'memory' (patient_data.csv per process) or 'sqlite'
+# (one WAL-mode file shared by all workers, filled from patient_data.csv when empty)
+PATIENT_STORE = os.environ.get('PATIENT_STORE', 'memory')
+PATIENT_DB = os.environ.get('PATIENT_DB_PATH', PATIENT_DB_PATH)
+
+# Seconds between checks of hospital_charges.csv for changes; the cost table is rebuilt when it changes
+CHARGES_RELOAD_INTERVAL = float(os.environ.get('CHARGES_RELOAD_INTERVAL', 2.0))
+
+# Seconds between checks of models/CURRENT; a bundle another worker promoted is loaded when it changes
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 2.0))
 
 # Kenyan National Guidelines for Ovarian Cyst Management
 KENYAN_GUIDELINES = {
@@ -56,6 +153,12 @@ KENYAN_GUIDELINES = {
         'cyst_size_min': 10.0,
         'symptoms_urgent': ['Severe pain', 'Fever', 'Rapid weight loss'],
         'ultrasound_malignant': ['Solid mass with irregular borders', 'Complex cyst with thick septations']
+    },
+    'risk_scoring': {
+        'cyst_growth_rapid': 1.0,  # cm
+        'ultrasound_suspicious': ['Solid mass', 'Complex cyst'],
+        'medium_risk_score': 3,
+        'high_risk_score': 6
     }
 }
 
@@ -92,254 +195,364 @@ TREATMENT_PROTOCOLS = {
     }
 }
 
+# Protocols and their warning signs are embedded in every care template; serialize them once
+TREATMENT_PROTOCOL_FRAGMENTS = fragment_map(TREATMENT_PROTOCOLS)
+WARNING_SIGN_FRAGMENTS = fragment_map({plan: protocol.get('warning_signs', [])
+                                       for plan, protocol in TREATMENT_PROTOCOLS.items()})
+EMPTY_PROTOCOL = JSONFragment({})
+NO_WARNING_SIGNS = JSONFragment([])
+
 def load_model_and_data():
-    """Load the trained model and data files, train if missing"""
-    global model, feature_columns, target_encoder, scaler, inventory_data, charges_data, patient_data
+    """Load the trained model and data files
+
+    Never trains: if no model bundle exists the server does not start, and
+    the model has to be trained first with ``python train_model.py``.
+    """
+    global inventory_data, charges_lookup, patient_repository
     
     try:
-        # Check if model files exist
-        required_files = [
-            'trained_model.pkl',
-            'feature_columns.pkl', 
-            'target_encoder.pkl',
-            'scaler.pkl'
-        ]
-        
-        missing_files = []
-        for file in required_files:
-            if not os.path.exists(file):
-                missing_files.append(file)
-        
-        # If model files are missing, train the model
+        startup_timer.reset_artifacts()
+        
+        # Locate the active model bundle (promoted version, or the legacy pickles)
+        bundle_path, bundle_version = resolve_current_bundle()
+        missing_files = legacy_files_missing(bundle_path) if bundle_version is None else []
         if missing_files:
-            print(f"🤖 Model files missing: {', '.join(missing_files)}")
-            print("Training new model...")
-            
-            try:
-                # Import and run training
-                import subprocess
-                import sys
-                
-                result = subprocess.run([sys.executable, 'train_model.py'], 
-                                      capture_output=True, text=True, check=True)
-                
-                print("✅ Model training completed successfully!")
-                print(result.stdout)
-                
-            except subprocess.CalledProcessError as e:
-                print("❌ Error during model training:")
-                print(e.stderr)
-                return False
-            except FileNotFoundError:
-                print("❌ train_model.py not found!")
-                return False
-        
-        # Load the trained model and preprocessing objects
-        model = joblib.load('trained_model.pkl')
-        feature_columns = joblib.load('feature_columns.pkl')
-        target_encoder = joblib.load('target_encoder.pkl')
-        scaler = joblib.load('scaler.pkl')
+            print(f"❌ Model files missing: {', '.join(missing_files)}")
+            print("Train a model first with: python train_model.py")
+            return False
+        
+        # The pickled forest needs sklearn; import it here rather than at module import
+        with startup_timer.importing('sklearn (model runtime)'):
+            import sklearn.ensemble  # noqa: F401
+        
+        # Load and verify the model bundle
+        with startup_timer.loading('model bundle'):
+            bundle = load_bundle(bundle_path, bundle_version)
+        with startup_timer.loading('inference engine'):
+            activate_model_bundle(bundle)
+        load_candidate_models()
         
         # Load data files
-        inventory_data = pd.read_csv('inventory.csv')
-        charges_data = pd.read_csv('hospital_charges.csv')
-        patient_data = pd.read_csv('patient_data.csv')
+        with startup_timer.loading('inventory.csv'):
+            inventory_data = pd.read_csv('inventory.csv')
+        with startup_timer.loading('hospital_charges.csv'):
+            charges_lookup = ChargesLookup(CHARGES_PATH, check_interval=CHARGES_RELOAD_INTERVAL)
+        with startup_timer.loading(f'patient store ({PATIENT_STORE})'):
+            patient_repository = open_patient_repository(PATIENT_STORE, 'patient_data.csv', PATIENT_DB)
+        
+        # Jobs a previous server process left unfinished can no longer complete
+        upload_jobs.recover()
         
         print("✅ Enhanced model and data loaded successfully")
+        startup_timer.log()
         return True
     except Exception as e:
         print(f"❌ Error loading model: {e}")
         return False
 
+def load_candidate_models():
+    """Load the MODEL_CANDIDATES bundles into the registry; a bad candidate is skipped, not fatal"""
+    for name, reference in MODEL_CANDIDATES.items():
+        if name == PRIMARY_MODEL:
+            print(f"⚠️ Candidate name '{PRIMARY_MODEL}' is reserved, skipping")
+            continue
+        path = reference if os.path.isdir(reference) else os.path.join(MODELS_DIR, reference)
+        try:
+            with startup_timer.loading(f'candidate model {name}'):
+                bundle = load_bundle(path)
+                model_registry.register(name, bundle, build_inference_model(bundle.model))
+            print(f"✅ Candidate model '{name}' loaded (version {bundle.version})")
+        except Exception as e:
+            print(f"⚠️ Could not load candidate model '{name}' from {path}: {e}")
+
+def activate_model_bundle(bundle):
+    """Serve predictions from ``bundle`` (at startup and after an incremental update)
+
+    Incremental updates keep the feature schema, scaler and classes, so a
+    request that reads these globals across the swap still gets a consistent
+    prediction.
+    """
+    global model, feature_columns, target_encoder, scaler, feature_encoder, inference_model, model_version, model_bundle
+    engine = build_inference_model(bundle.model)
+    model = bundle.model
+    feature_columns = bundle.feature_columns
+    target_encoder = bundle.target_encoder
+    scaler = bundle.scaler
+    feature_encoder = bundle.feature_encoder
+    inference_model = engine
+    model_version = bundle.version
+    model_bundle = bundle
+    model_registry.set_primary(bundle, engine)
+    prediction_cache.clear()
+
+def build_inference_model(estimator):
+    """Return the prediction backend selected by INFERENCE_ENGINE"""
+    if INFERENCE_ENGINE != 'numpy' or not hasattr(estimator, 'estimators_'):
+        return estimator
+    
+    try:
+        engine = FlattenedForest(estimator)
+        if verify_engine(engine, estimator):
+            print(f"✅ Flattened forest engine ready ({engine.n_trees} trees, {engine.n_nodes} nodes)")
+            return engine
+        print("⚠️ Flattened forest does not match the model, using sklearn")
+    except Exception as e:
+        print(f"⚠️ Could not build flattened forest, using sklearn: {e}")
+    return estimator
+
 def preprocess_patient_data(patient_data):
     """Preprocess patient data for prediction"""
     try:
-        # Create DataFrame from patient data
-        patient_df = pd.DataFrame([patient_data])
-        patient_df.columns = patient_df.columns.str.strip()
-        
-        # Parse symptoms and create dummy variables
-        if 'Reported Sym' in patient_df.columns:
-            patient_df['Reported Sym'] = patient_df['Reported Sym'].str.strip().str.replace('"', '').fillna('Unknown')
-            symptom_dummies = patient_df['Reported Sym'].str.get_dummies(sep=', ').add_prefix('Symptom_')
-            patient_df = pd.concat([patient_df, symptom_dummies], axis=1).drop('Reported Sym', axis=1)
-        
-        # One-hot encode categorical features
-        categorical_cols = ['Menopause Stage', 'Ultrasound Fe']
-        for col in categorical_cols:
-            if col in patient_df.columns:
-                patient_df[col] = patient_df[col].str.strip().str.replace('"', '').fillna('Unknown')
-        
-        patient_processed = pd.get_dummies(patient_df, columns=categorical_cols, dtype=float)
-        
-        # Align columns with training features
-        final_patient_features = patient_processed.reindex(columns=feature_columns, fill_value=0)
-        
-        # Scale numerical features
-        numerical_cols = ['Age', 'SI Cyst Size cm', 'Cyst Growth', 'fca 125 Level']
-        cols_to_scale = [col for col in numerical_cols if col in final_patient_features.columns]
-        if cols_to_scale:
-            final_patient_features[cols_to_scale] = scaler.transform(final_patient_features[cols_to_scale])
-        
-        return final_patient_features
+        # Encode straight into a scaled numpy row aligned with the training features
+        features = feature_encoder.encode(patient_data)
+        # A null numeric field encodes to NaN, which the model cannot score
+        missing = [feature_encoder.feature_columns[i] for i in np.flatnonzero(~np.isfinite(features[0]))]
+        if missing:
+            print(f"❌ Error preprocessing data: no usable value for {', '.join(missing)}")
+            return None
+        return features
     except Exception as e:
         print(f"❌ Error preprocessing data: {e}")
         return None
 
-def assess_risk_level(patient_data):
-    """Assess risk level based on Kenyan guidelines"""
-    risk_factors = []
-    risk_score = 0
-    
-    # Age factor
-    if patient_data['Age'] > 50:
-        risk_factors.append("Post-menopausal age")
-        risk_score += 2
-    
-    # Cyst size factor
-    if patient_data['SI Cyst Size cm'] > 10:
-        risk_factors.append("Large cyst (>10cm)")
-        risk_score += 3
-    elif patient_data['SI Cyst Size cm'] > 8:
-        risk_factors.append("Moderate cyst size (8-10cm)")
-        risk_score += 2
-    elif patient_data['SI Cyst Size cm'] > 5:
-        risk_factors.append("Cyst size >5cm")
-        risk_score += 1
-    
-    # CA-125 factor
-    if patient_data['fca 125 Level'] > 500:
-        risk_factors.append("Very high CA-125 (>500)")
-        risk_score += 4
-    elif patient_data['fca 125 Level'] > 200:
-        risk_factors.append("High CA-125 (200-500)")
-        risk_score += 3
-    elif patient_data['fca 125 Level'] > 35:
-        risk_factors.append("Elevated CA-125 (>35)")
-        risk_score += 1
-    
-    # Cyst growth factor
-    if patient_data['Cyst Growth'] > 1.0:
-        risk_factors.append("Rapid cyst growth")
-        risk_score += 2
-    
-    # Ultrasound features
-    if patient_data['Ultrasound Fe'] in ['Solid mass', 'Complex cyst']:
-        risk_factors.append("Suspicious ultrasound features")
-        risk_score += 2
+def predict_from_features(features, entry=None):
+    """Predict treatment plans for encoded rows with a single predict_proba pass
+
+    Uses the primary model unless a registry ``entry`` is given.
+    """
+    entry = entry or model_registry.get(PRIMARY_MODEL)
+    probabilities = entry.predict_proba(features)
+    best = probabilities.argmax(axis=1)
+    class_names = [str(name) for name in entry.class_names]
     
-    # Determine risk level
-    if risk_score >= 6:
-        risk_level = "High"
-    elif risk_score >= 3:
-        risk_level = "Medium"
+    # tolist() converts the whole probability matrix to Python floats at once
+    results = []
+    for row, best_idx in zip(probabilities.tolist(), best.tolist()):
+        results.append({
+            'prediction': class_names[best_idx],
+            'confidence': row[best_idx],
+            'probabilities': dict(zip(class_names, row))
+        })
+    return results
+
+# Shared scheduler that coalesces single-patient predictions into batches
+inference_scheduler = InferenceScheduler(
+    predict_from_features,
+    max_batch_size=INFERENCE_BATCH_SIZE,
+    max_wait_ms=INFERENCE_MAX_WAIT_MS
+)
+
+# Recent predictions keyed on the encoded feature row and model version
+prediction_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL)
+
+# Every loaded model by name, with routing, shadow scoring and per-model latency
+model_registry = ModelRegistry(split=MODEL_ROUTING_SPLIT, shadow=MODEL_SHADOW, shadow_log_path=SHADOW_LOG_PATH)
+
+def route_request():
+    """Registry entry that serves the current request (X-Model header, split, or primary)"""
+    requested = request.headers.get(ROUTE_HEADER) if has_request_context() else None
+    entry = model_registry.choose(requested)
+    if has_request_context():
+        g.served_model = entry
+    return entry
+
+def served_model_version():
+    """Version of the model that answered this request (the primary if none was routed)"""
+    if has_request_context() and 'served_model' in g:
+        return g.served_model.version
+    return model_version
+
+@app.after_request
+def add_model_headers(response):
+    if 'served_model' in g:
+        response.headers['X-Model-Name'] = g.served_model.name
+        response.headers['X-Model-Version'] = g.served_model.version
+    return response
+
+def explanation_top_k():
+    """Number of contributors requested with ?explain=true, or None when no explanation was asked for"""
+    if request.args.get('explain', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    top_k = request.args.get('top_k', DEFAULT_TOP_K, type=int)
+    return min(max(top_k, 1), feature_encoder.n_features)
+
+def explain_predictions(features, predictions, top_k, entry=None):
+    """Tree-path explanations of ``predictions`` for the encoded ``features`` rows"""
+    entry = entry or (g.served_model if 'served_model' in g else model_registry.get(PRIMARY_MODEL))
+    return explain_rows(entry.explainer, feature_encoder, features, entry.class_names,
+                        [prediction_result['prediction'] for prediction_result in predictions], top_k)
+
+def copy_prediction(prediction_result):
+    """Copy a cached prediction so callers never share mutable dicts"""
+    return dict(prediction_result, probabilities=dict(prediction_result['probabilities']))
+
+def predict_single(features):
+    """Predict one encoded patient on the routed model, serving repeats from the prediction cache"""
+    entry = route_request()
+    key = PredictionCache.make_key(features[0], entry.version)
+    prediction_result = prediction_cache.get(key)
+    if prediction_result is not None:
+        prediction_result = copy_prediction(prediction_result)
     else:
-        risk_level = "Low"
+        if entry.name == PRIMARY_MODEL:
+            prediction_result = inference_scheduler.submit(features[0])
+        else:
+            prediction_result = predict_from_features(features[:1], entry)[0]
+        prediction_cache.put(key, copy_prediction(prediction_result))
     
-    return {
-        'risk_level': risk_level,
-        'risk_score': risk_score,
-        'risk_factors': risk_factors
-    }
+    model_registry.submit_shadow(entry, features[:1], [prediction_result['prediction']])
+    return prediction_result
 
-def get_comprehensive_cost_estimation(recommended_plan, patient_data, risk_assessment):
-    """Get comprehensive cost estimation including financing options"""
-    
-    # Base costs from charges data
-    service_map = {
-        'Surgery': ('Ovarian Cystec', 'Speculum'),
-        'Medication': ('Pain Managem', 'Paracetamol'),
-        'Observation': ('Initial Consult', None),
-        'Referral': ('Referral Speci', None)
-    }
-    
-    base_cost = 0
-    service_name = ""
-    
-    if recommended_plan in service_map:
-        service_name, _ = service_map[recommended_plan]
-        cost_row = charges_data[charges_data['Service'].str.contains(service_name, na=False)]
-        if not cost_row.empty:
-            base_cost = float(cost_row.iloc[0]['Base Cost (KES)'])
-            service_name = cost_row.iloc[0]['Service']
-    
-    # Additional costs based on risk level and complexity
-    additional_costs = {
-        'consultation': 2000,
-        'ultrasound': 3000,
-        'lab_tests': 1500,
-        'medications': 5000 if recommended_plan == 'Medication' else 0,
-        'follow_up': 2000
-    }
-    
-    # Risk-based adjustments
-    risk_multiplier = {
-        'Low': 1.0,
-        'Medium': 1.2,
-        'High': 1.5
-    }
-    
-    total_base_cost = base_cost + sum(additional_costs.values())
-    adjusted_cost = total_base_cost * risk_multiplier[risk_assessment['risk_level']]
-    
-    # Financing options (Kenyan context)
-    financing_options = {
-        'cash_payment': {
-            'discount': 0.05,  # 5% discount for cash payment
-            'description': 'Cash payment with 5% discount'
-        },
-        'nhif': {
-            'coverage': 0.8,  # 80% coverage
-            'description': 'NHIF coverage (80% of total cost)',
-            'requirements': ['Valid NHIF card', 'Referral letter']
-        },
-        'insurance': {
-            'coverage': 0.9,  # 90% coverage
-            'description': 'Private insurance coverage (90% of total cost)',
-            'requirements': ['Insurance card', 'Pre-authorization']
-        },
-        'installment': {
-            'down_payment': 0.3,  # 30% down payment
-            'months': 6,
-            'interest_rate': 0.12,  # 12% annual interest
-            'description': '6-month installment plan with 12% interest'
-        }
-    }
-    
-    # Calculate financing costs
-    financing_costs = {}
-    for option, details in financing_options.items():
-        if option == 'cash_payment':
-            financing_costs[option] = {
-                'amount': adjusted_cost * (1 - details['discount']),
-                'description': details['description']
-            }
-        elif option in ['nhif', 'insurance']:
-            financing_costs[option] = {
-                'amount': adjusted_cost * (1 - details['coverage']),
-                'description': details['description'],
-                'requirements': details['requirements']
-            }
-        elif option == 'installment':
-            monthly_payment = (adjusted_cost * (1 - details['down_payment']) * 
-                             (1 + details['interest_rate'] * details['months'] / 12)) / details['months']
-            financing_costs[option] = {
-                'down_payment': adjusted_cost * details['down_payment'],
-                'monthly_payment': monthly_payment,
-                'total_amount': adjusted_cost * details['down_payment'] + monthly_payment * details['months'],
-                'description': details['description']
-            }
+# Background jobs for dataset uploads
+upload_jobs = JobManager(UPLOAD_JOBS_DIR, max_workers=UPLOAD_JOB_WORKERS, keep=UPLOAD_JOBS_KEEP)
+
+# Process pool for PDF text extraction, started on the first PDF upload
+pdf_extractor = PdfExtractor(workers=PDF_WORKERS, pages_per_task=PDF_PAGES_PER_TASK)
+
+# Readiness: set once warm_up() has driven requests through every hot path
+warmup_state = WarmupState()
+
+# Confirmed treatment outcomes, and background incremental updates learned from them
+feedback_store = FeedbackStore(FEEDBACK_STORE_PATH)
+
+def run_incremental_training(mode='warm_start', new_trees=INCREMENTAL_NEW_TREES, window=INCREMENTAL_WINDOW):
+    """Train a candidate from the serving bundle plus recorded outcomes (see incremental_training)"""
+    from incremental_training import incremental_update
     
-    return {
-        'base_cost': base_cost,
-        'additional_costs': additional_costs,
-        'total_base_cost': total_base_cost,
-        'risk_adjusted_cost': adjusted_cost,
-        'financing_options': financing_costs,
-        'currency': 'KES',
-        'service_name': service_name
+    return incremental_update(model_bundle, pd.read_csv('patient_data.csv'), feedback_store.load(),
+                              mode=mode, new_trees=new_trees, window=window,
+                              holdout_fraction=INCREMENTAL_HOLDOUT_FRACTION,
+                              min_feedback=INCREMENTAL_MIN_FEEDBACK,
+                              max_accuracy_drop=INCREMENTAL_MAX_ACCURACY_DROP)
+
+training_jobs = TrainingJobManager(run_incremental_training, activate_model_bundle,
+                                   training_data_path=FEEDBACK_STORE_PATH)
+
+# Bundles promoted by a training job in another worker
+bundle_watcher = CurrentBundleWatcher(lambda: model_version, activate_model_bundle,
+                                      check_interval=MODEL_RELOAD_INTERVAL)
+
+@app.before_request
+def pick_up_promoted_model():
+    if model_bundle is not None:
+        bundle_watcher.check()
+
+def reinit_after_fork():
+    """Reset per-process state in a worker forked from a preloaded master"""
+    inference_scheduler.reset_after_fork()
+    prediction_cache.reset_after_fork()
+    upload_jobs.reset_after_fork()
+    pdf_extractor.reset_after_fork()
+    model_registry.reset_after_fork()
+    feedback_store.reset_after_fork()
+    training_jobs.reset_after_fork()
+    bundle_watcher.reset_after_fork()
+    if patient_repository is not None:
+        patient_repository.reset_after_fork()
+    if charges_lookup is not None:
+        charges_lookup.reset_after_fork()
+    # A worker forked after a promotion would otherwise serve the master's boot-time bundle
+    if model_bundle is not None:
+        bundle_watcher.check(force=True)
+
+# Guideline risk scoring, vectorized over columns of patients
+risk_scorer = RiskScorer(KENYAN_GUIDELINES)
+
+def assess_risk_level(patient_data):
+    """Assess risk level based on Kenyan guidelines"""
+    return risk_scorer.assess(patient_data)
+
+def assess_risk_levels(df):
+    """Assess risk for every row of a patient DataFrame in one vectorized pass"""
+    return risk_scorer.score(
+        df['Age'].to_numpy(), df['SI Cyst Size cm'].to_numpy(), df['fca 125 Level'].to_numpy(),
+        df['Cyst Growth'].to_numpy(), df['Ultrasound Fe'].to_numpy()
+    )
+
+# Patient fields read from uploaded datasets
+PATIENT_FIELDS = ['Age', 'Menopause Stage', 'SI Cyst Size cm', 'Cyst Growth',
+                  'fca 125 Level', 'Ultrasound Fe', 'Reported Sym']
+
+def normalize_uploaded_patients(df):
+    """Coerce an uploaded sheet to the patient schema; returns (patients, valid_mask)
+
+    Mirrors the per-row int()/float() conversion: rows whose Age or CA-125
+    are not numbers, or whose cyst size or growth are non-numeric text,
+    are marked invalid.
+    """
+    def numeric(column):
+        raw = df[column] if column in df else pd.Series(0, index=df.index)
+        values = pd.to_numeric(raw, errors='coerce')
+        return values, values.notna() | raw.isna()
+
+    age, _ = numeric('Age')
+    ca125, _ = numeric('fca 125 Level')
+    cyst_size, size_ok = numeric('SI Cyst Size cm')
+    growth, growth_ok = numeric('Cyst Growth')
+    valid = np.isfinite(age) & np.isfinite(ca125) & size_ok & growth_ok
+
+    patients = pd.DataFrame({
+        'Age': np.trunc(age.where(valid, 0)).astype(np.int64),
+        'Menopause Stage': df['Menopause Stage'] if 'Menopause Stage' in df else 'Pre-menopausal',
+        'SI Cyst Size cm': cyst_size.astype(np.float64),
+        'Cyst Growth': growth.astype(np.float64),
+        'fca 125 Level': np.trunc(ca125.where(valid, 0)).astype(np.int64),
+        'Ultrasound Fe': df['Ultrasound Fe'] if 'Ultrasound Fe' in df else 'Simple cyst',
+        'Reported Sym': df['Reported Sym'] if 'Reported Sym' in df else ''
+    }, index=df.index)
+    return patients, valid.to_numpy()
+
+def score_upload_chunk(df):
+    """Risk-score and model-score one chunk of an uploaded dataset
+
+    Returns the scored rows (with their 1-based row number in the file) and
+    the chunk's counters. Rows the model cannot take (missing measurements
+    or non-text categorical values) keep their risk assessment but get no
+    prediction.
+    """
+    patients, valid = normalize_uploaded_patients(df)
+    scored = patients[valid].copy()
+    scored.insert(0, 'Row', scored.index + 1)
+
+    risk = assess_risk_levels(scored)
+    scored['Risk Score'] = risk['risk_score']
+    scored['Risk Level'] = risk['risk_level']
+    factor_labels = {int(mask): '; '.join(risk_scorer.describe_factors(int(mask)))
+                     for mask in np.unique(risk['factor_mask'])}
+    scored['Risk Factors'] = [factor_labels[int(mask)] for mask in risk['factor_mask']]
+
+    predictable = np.isfinite(scored[['SI Cyst Size cm', 'Cyst Growth']].to_numpy()).all(axis=1)
+    for col in ['Menopause Stage', 'Ultrasound Fe', 'Reported Sym']:
+        predictable &= scored[col].map(lambda value: value is None or isinstance(value, str) or pd.isna(value)).to_numpy()
+
+    class_names = list(target_encoder.classes_[inference_model.classes_])
+    scored['Prediction'] = None
+    scored['Confidence'] = np.nan
+    for name in class_names:
+        scored[f'Probability {name}'] = np.nan
+    if predictable.any():
+        probabilities = inference_model.predict_proba(feature_encoder.encode_frame(scored[predictable]))
+        scored.loc[predictable, 'Prediction'] = np.asarray(class_names, dtype=object)[probabilities.argmax(axis=1)]
+        scored.loc[predictable, 'Confidence'] = probabilities.max(axis=1)
+        for i, name in enumerate(class_names):
+            scored.loc[predictable, f'Probability {name}'] = probabilities[:, i]
+
+    return scored, {
+        'processed': len(scored),
+        'failed': len(df) - len(scored),
+        'predicted': int(predictable.sum())
     }
 
+def get_comprehensive_cost_estimation(recommended_plan, patient_data, risk_assessment):
+    """Get comprehensive cost estimation including financing options
+
+    Looked up from the charges table compiled at load time. When the patient
+    data names a ``Facility`` or ``Region``, that facility's (or region's)
+    charge for the plan is used.
+    """
+    return charges_lookup.estimate(recommended_plan, risk_assessment['risk_level'],
+                                   facility=patient_data.get('Facility'), region=patient_data.get('Region'))
+
 def get_real_time_inventory_status(recommended_plan):
     """Get real-time inventory status for the recommended treatment"""
     
@@ -366,7 +579,7 @@ def get_real_time_inventory_status(recommended_plan):
             
             if not matching_items.empty:
                 for _, row in matching_items.iterrows():
-                    stock_level = int(row['Available Stock'])
+                    stock_level = row['Available Stock']
                     item_name = row['Item']
                     
                     if stock_level > 10:
@@ -461,15 +674,15 @@ def generate_intelligent_care_template(patient_data, prediction_result, risk_ass
         'kenyan_guidelines_compliance': {
             'follows_guidelines': True,
             'guideline_reference': f"Kenyan National Guidelines for Ovarian Cyst Management",
-            'recommendation_basis': TREATMENT_PROTOCOLS.get(prediction_result['prediction'], {})
+            'recommendation_basis': TREATMENT_PROTOCOL_FRAGMENTS.get(prediction_result['prediction'], EMPTY_PROTOCOL)
         },
-        'treatment_protocol': TREATMENT_PROTOCOLS.get(prediction_result['prediction'], {}),
+        'treatment_protocol': TREATMENT_PROTOCOL_FRAGMENTS.get(prediction_result['prediction'], EMPTY_PROTOCOL),
         'cost_estimation': cost_estimation,
         'inventory_status': inventory_status,
         'follow_up_plan': {
             'next_appointment': (datetime.now() + timedelta(days=30)).isoformat(),
             'required_tests': ['Ultrasound', 'CA-125'] if prediction_result['prediction'] != 'Surgery' else ['Post-op ultrasound'],
-            'warning_signs': TREATMENT_PROTOCOLS.get(prediction_result['prediction'], {}).get('warning_signs', [])
+            'warning_signs': WARNING_SIGN_FRAGMENTS.get(prediction_result['prediction'], NO_WARNING_SIGNS)
         },
         'quality_metrics': {
             'diagnostic_accuracy': prediction_result['confidence'],
@@ -483,51 +696,94 @@ def generate_intelligent_care_template(patient_data, prediction_result, risk_ass
 
 # Remove FHIR, HIE, and DHIS2 integration classes and endpoints
 
+def wants_ndjson():
+    """True when the client asked for newline-delimited JSON over plain JSON"""
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def ndjson_response(records, headers=None):
+    """Stream an iterable of dicts as one JSON document per line"""
+    def generate():
+        for record in records:
+            yield app.json.dumps(record) + '\n'
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE, headers=headers)
+
+def frame_records(frame, fields):
+    """Serialize rows column-wise: one conversion per column, then a bulk to_dict
+
+    ``fields`` lists (output key, source column, dtype or None); the result
+    matches converting each row's values with int() / float() one by one.
+    """
+    columns = {key: frame[column].astype(dtype) if dtype else frame[column]
+               for key, column, dtype in fields}
+    return pd.DataFrame(columns, index=frame.index, copy=False).to_dict('records')
+
+def iter_serialized_records(frame, fields, chunk_size=NDJSON_CHUNK_SIZE):
+    """``frame_records`` a slice at a time, for streamed responses"""
+    for start in range(0, len(frame), chunk_size):
+        yield from frame_records(frame.iloc[start:start + chunk_size], fields)
+
+def iter_frame_records(frame, to_record, chunk_size=NDJSON_CHUNK_SIZE):
+    """Convert DataFrame rows to response records lazily, a slice at a time"""
+    for start in range(0, len(frame), chunk_size):
+        for row in frame.iloc[start:start + chunk_size].to_dict('records'):
+            yield to_record(row)
+
+# Static part of the GET / response, serialized once
+API_INFO = {
+    'message': 'Enhanced Ovarian Cyst Prediction API with FHIR, OpenHIE, and DHIS2 Integration',
+    'version': '2.1.0',
+    'description': 'AI-powered ovarian cyst prediction system with healthcare interoperability',
+    'features': [
+        'AI-powered diagnostic recommendations',
+        'Kenyan national guidelines compliance',
+        'Real-time inventory tracking',
+        'Comprehensive cost estimation',
+        'Multiple financing options',
+        'Intelligent care templates',
+        'Patient search and retrieval',
+        'FHIR healthcare interoperability',
+        'OpenHIE health information exchange',
+        'DHIS2 health management integration'
+    ],
+    'integrations': {
+        'fhir': 'Fast Healthcare Interoperability Resources',
+        'open_hie': 'Open Health Information Exchange',
+        'dhis2': 'District Health Information Software 2'
+    },
+    'endpoints': {
+        'GET /': 'API information',
+        'GET /health': 'Health check',
+        'GET /ready': 'Readiness probe (200 once warm-up has completed)',
+        'GET /models': 'Loaded models, routing, per-model latency and shadow agreement',
+        'GET /patient/<patient_id>/assessments': 'Care-template assessments generated for a patient',
+        'POST /feedback': 'Record the treatment actually chosen for a patient',
+        'GET /feedback': 'Summary of recorded outcomes',
+        'POST /train/incremental': 'Update the model from recorded outcomes in the background',
+        'GET /train/<job_id>': 'Training job status',
+        'POST /predict': 'Enhanced prediction with risk assessment (?explain=true&top_k=5 adds feature contributions)',
+        'POST /predict/batch': 'Batch prediction for a JSON array of patients',
+        'POST /care-template': 'Complete intelligent care template',
+        'POST /risk-assessment': 'Risk assessment based on guidelines',
+        'POST /cost-estimation': 'Detailed cost analysis',
+        'POST /inventory-status': 'Real-time inventory check',
+        'GET /patients': 'List all patients (?cursor= for keyset pages, or ?page=&per_page=)',
+        'GET /search-patients': 'Search patients by ID or region',
+        'GET /patient/<patient_id>/care-template': 'Get care template for existing patient',
+        'POST /fhir/patient': 'Create FHIR Patient resource',
+        'POST /fhir/observation': 'Create FHIR Observation resource',
+        'POST /hie/patient-registry': 'Send to OpenHIE Patient Registry',
+        'POST /hie/facility-registry': 'Send to OpenHIE Facility Registry',
+        'POST /dhis2/tracked-entity': 'Create DHIS2 Tracked Entity Instance',
+        'POST /dhis2/data-value-set': 'Send data to DHIS2'
+    },
+    'status': 'operational'
+}
+API_INFO_FRAGMENTS = fragment_map(API_INFO)
+
 @app.route('/', methods=['GET'])
 def root():
     """API root endpoint with comprehensive information"""
-    return jsonify({
-        'message': 'Enhanced Ovarian Cyst Prediction API with FHIR, OpenHIE, and DHIS2 Integration',
-        'version': '2.1.0',
-        'description': 'AI-powered ovarian cyst prediction system with healthcare interoperability',
-        'features': [
-            'AI-powered diagnostic recommendations',
-            'Kenyan national guidelines compliance',
-            'Real-time inventory tracking',
-            'Comprehensive cost estimation',
-            'Multiple financing options',
-            'Intelligent care templates',
-            'Patient search and retrieval',
-            'FHIR healthcare interoperability',
-            'OpenHIE health information exchange',
-            'DHIS2 health management integration'
-        ],
-        'integrations': {
-            'fhir': 'Fast Healthcare Interoperability Resources',
-            'open_hie': 'Open Health Information Exchange',
-            'dhis2': 'District Health Information Software 2'
-        },
-        'endpoints': {
-            'GET /': 'API information',
-            'GET /health': 'Health check',
-            'POST /predict': 'Enhanced prediction with risk assessment',
-            'POST /care-template': 'Complete intelligent care template',
-            'POST /risk-assessment': 'Risk assessment based on guidelines',
-            'POST /cost-estimation': 'Detailed cost analysis',
-            'POST /inventory-status': 'Real-time inventory check',
-            'GET /patients': 'List all patients (paginated)',
-            'GET /search-patients': 'Search patients by ID or region',
-            'GET /patient/<patient_id>/care-template': 'Get care template for existing patient',
-            'POST /fhir/patient': 'Create FHIR Patient resource',
-            'POST /fhir/observation': 'Create FHIR Observation resource',
-            'POST /hie/patient-registry': 'Send to OpenHIE Patient Registry',
-            'POST /hie/facility-registry': 'Send to OpenHIE Facility Registry',
-            'POST /dhis2/tracked-entity': 'Create DHIS2 Tracked Entity Instance',
-            'POST /dhis2/data-value-set': 'Send data to DHIS2'
-        },
-        'status': 'operational',
-        'timestamp': datetime.now().isoformat()
-    })
+    return jsonify(dict(API_INFO_FRAGMENTS, timestamp=datetime.now().isoformat()))
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -535,11 +791,57 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'model_loaded': model is not None,
-        'data_loaded': all([inventory_data is not None, charges_data is not None, patient_data is not None]),
+        'data_loaded': all([inventory_data is not None, charges_lookup is not None, patient_repository is not None]),
+        'patient_store': patient_repository.describe() if patient_repository is not None else None,
+        'charges': charges_lookup.describe() if charges_lookup is not None else None,
         'guidelines_loaded': KENYAN_GUIDELINES is not None,
+        'inference_engine': 'numpy' if isinstance(inference_model, FlattenedForest) else 'sklearn',
+        'inference_scheduler': inference_scheduler.metrics(),
+        'model_version': model_version,
+        'prediction_cache': prediction_cache.stats(),
         'timestamp': datetime.now().isoformat()
     })
 
+def warmup_steps():
+    """Synthetic requests covering prediction, care templates, search and serialization"""
+    head = patient_repository.head(WARMUP_BATCH_SIZE) if patient_repository is not None else None
+    batch = head[PATIENT_FIELDS].to_dict('records') if head is not None else []
+    first_patient_id = head['Patient ID'].iloc[0] if head is not None and len(head) else 'OC-1000'
+    return [
+        {'name': 'predict', 'method': 'POST', 'path': '/predict', 'json': WARMUP_PATIENT},
+        {'name': 'predict_batch', 'method': 'POST', 'path': '/predict/batch', 'json': {'patients': batch or [WARMUP_PATIENT]}},
+        {'name': 'care_template', 'method': 'POST', 'path': '/care-template', 'json': WARMUP_PATIENT},
+        {'name': 'patient_care_template', 'method': 'GET', 'path': f'/patient/{first_patient_id}/care-template'},
+        {'name': 'search_patients', 'method': 'GET', 'path': f'/search-patients?q={first_patient_id}&type=id'},
+        {'name': 'list_patients', 'method': 'GET', 'path': '/patients?page=1&per_page=50'},
+        {'name': 'list_patients_ndjson', 'method': 'GET', 'path': '/patients?page=1&per_page=50',
+         'headers': {'Accept': NDJSON_MIMETYPE}}
+    ]
+
+def warm_up():
+    """Run the warm-up requests after load_model_and_data(); /ready answers 200 once they pass"""
+    report = warmup_state.run(app, warmup_steps())
+    # Drop the warm-up predictions so real traffic starts from an empty cache
+    prediction_cache.clear()
+    return report['ok']
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 only after warm-up has completed"""
+    status = warmup_state.status()
+    status['model_version'] = model_version
+    status['startup'] = startup_timer.report()
+    status['timestamp'] = datetime.now().isoformat()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/models', methods=['GET'])
+def list_models():
+    """Loaded models with routing setup, per-model latency, memory and shadow agreement"""
+    stats = model_registry.stats()
+    stats['recent_shadow'] = list(model_registry.recent_shadow)[-int(request.args.get('shadow_limit', 10)):]
+    stats['timestamp'] = datetime.now().isoformat()
+    return jsonify(stats)
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Enhanced prediction with risk assessment"""
@@ -570,28 +872,25 @@ def predict():
             }), 400
         
         # Make prediction
-        prediction_encoded = model.predict(processed_data)
-        recommended_plan = target_encoder.inverse_transform(prediction_encoded)[0]
-        
-        # Get prediction probabilities
-        probabilities = model.predict_proba(processed_data)[0]
-        confidence = max(probabilities)
+        prediction_result = predict_single(processed_data)
         
         # Risk assessment
         risk_assessment = assess_risk_level(data)
         
-        return jsonify({
+        response = {
             'success': True,
-            'prediction': recommended_plan,
-            'confidence': float(confidence),
-            'probabilities': {
-                target_encoder.classes_[i]: float(prob) 
-                for i, prob in enumerate(probabilities)
-            },
+            'prediction': prediction_result['prediction'],
+            'confidence': prediction_result['confidence'],
+            'probabilities': prediction_result['probabilities'],
             'risk_assessment': risk_assessment,
             'patient_data': data,
+            'model_version': served_model_version(),
             'timestamp': datetime.now().isoformat()
-        })
+        }
+        top_k = explanation_top_k()
+        if top_k:
+            response['explanation'] = explain_predictions(processed_data, [prediction_result], top_k)[0]
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({
@@ -600,6 +899,130 @@ def predict():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+def predict_patient_batch(patients, offset=0, explain_top_k=None, entry=None):
+    """Predict a list of patient dicts with one model pass; result indexes start at ``offset``
+
+    With ``explain_top_k`` every result also carries its top contributors.
+    Uses the registry ``entry`` when given, otherwise routes the request.
+    """
+    # Encode every valid patient into one feature matrix
+    features = np.zeros((len(patients), feature_encoder.n_features), dtype=np.float64)
+    valid_rows = []
+    results = [None] * len(patients)
+    for i, patient in enumerate(patients):
+        try:
+            feature_encoder.encode_into(patient, features[len(valid_rows)])
+            valid_rows.append(i)
+        except Exception as e:
+            features[len(valid_rows)] = 0.0
+            results[i] = {'index': offset + i, 'success': False, 'error': f'Failed to preprocess data: {e}'}
+
+    # A null numeric field encodes to NaN, which the model cannot score; fail only those rows
+    finite = np.isfinite(features[:len(valid_rows)]).all(axis=1)
+    if not finite.all():
+        for n in np.flatnonzero(~finite):
+            missing = [feature_encoder.feature_columns[j] for j in np.flatnonzero(~np.isfinite(features[n]))]
+            results[valid_rows[n]] = {'index': offset + valid_rows[n], 'success': False,
+                                      'error': f"Failed to preprocess data: no usable value for {', '.join(missing)}"}
+        features = features[:len(valid_rows)][finite]
+        valid_rows = [i for i, ok in zip(valid_rows, finite.tolist()) if ok]
+
+    # Serve repeats from the cache, then one forest traversal for the rest
+    entry = entry or route_request()
+    keys = [PredictionCache.make_key(row, entry.version) for row in features[:len(valid_rows)]]
+    predictions = [prediction_cache.get(key) for key in keys]
+    misses = [n for n, cached in enumerate(predictions) if cached is None]
+    if misses:
+        for n, prediction_result in zip(misses, predict_from_features(features[misses], entry)):
+            prediction_cache.put(keys[n], copy_prediction(prediction_result))
+            predictions[n] = prediction_result
+    if valid_rows:
+        model_registry.submit_shadow(entry, features[:len(valid_rows)],
+                                     [prediction_result['prediction'] for prediction_result in predictions])
+    explanations = [None] * len(valid_rows)
+    if explain_top_k and valid_rows:
+        explanations = explain_predictions(features[:len(valid_rows)], predictions, explain_top_k, entry)
+
+    for i, prediction_result, explanation in zip(valid_rows, predictions, explanations):
+        try:
+            risk_assessment = assess_risk_level(patients[i])
+        except Exception as e:
+            results[i] = {'index': offset + i, 'success': False, 'error': f'Failed to assess risk: {e}'}
+            continue
+        results[i] = {
+            'index': offset + i,
+            'success': True,
+            'prediction': prediction_result['prediction'],
+            'confidence': prediction_result['confidence'],
+            'probabilities': prediction_result['probabilities'],
+            'risk_assessment': risk_assessment
+        }
+        if explanation is not None:
+            results[i]['explanation'] = explanation
+
+    return results
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Predict treatment plans for many patients with one model pass"""
+    try:
+        data = request.get_json()
+        patients = data.get('patients') if isinstance(data, dict) else data
+
+        if not patients or not isinstance(patients, list):
+            return jsonify({
+                'success': False,
+                'error': 'Expected a JSON array of patients',
+                'timestamp': datetime.now().isoformat()
+            }), 400
+
+        if len(patients) > MAX_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'Batch too large. Maximum is {MAX_BATCH_SIZE} patients per request',
+                'timestamp': datetime.now().isoformat()
+            }), 400
+
+        if model is None:
+            return jsonify({
+                'success': False,
+                'error': 'Model not loaded',
+                'timestamp': datetime.now().isoformat()
+            }), 503
+
+        top_k = explanation_top_k()
+        if wants_ndjson():
+            # Routed once, so every slice of the stream is predicted by the same model
+            entry = route_request()
+            def stream_results():
+                for start in range(0, len(patients), NDJSON_CHUNK_SIZE):
+                    yield from predict_patient_batch(patients[start:start + NDJSON_CHUNK_SIZE], offset=start,
+                                                     explain_top_k=top_k, entry=entry)
+            return ndjson_response(stream_results(), headers={
+                'X-Total-Count': str(len(patients)),
+                'X-Model-Name': entry.name,
+                'X-Model-Version': str(entry.version)
+            })
+
+        results = predict_patient_batch(patients, explain_top_k=top_k)
+        processed = sum(1 for result in results if result['success'])
+        return jsonify({
+            'success': True,
+            'total_patients': len(patients),
+            'processed': processed,
+            'failed': len(patients) - processed,
+            'results': results,
+            'model_version': served_model_version(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
 @app.route('/care-template', methods=['POST'])
 def generate_care_template():
     """Generate comprehensive intelligent care template"""
@@ -630,21 +1053,8 @@ def generate_care_template():
             }), 400
         
         # Make prediction
-        prediction_encoded = model.predict(processed_data)
-        recommended_plan = target_encoder.inverse_transform(prediction_encoded)[0]
-        
-        # Get prediction probabilities
-        probabilities = model.predict_proba(processed_data)[0]
-        confidence = max(probabilities)
-        
-        prediction_result = {
-            'prediction': recommended_plan,
-            'confidence': float(confidence),
-            'probabilities': {
-                target_encoder.classes_[i]: float(prob) 
-                for i, prob in enumerate(probabilities)
-            }
-        }
+        prediction_result = predict_single(processed_data)
+        recommended_plan = prediction_result['prediction']
         
         # Risk assessment
         risk_assessment = assess_risk_level(data)
@@ -674,19 +1084,26 @@ def generate_care_template():
                 'follows_guidelines': True,
                 'guideline_reference': "Kenyan National Guidelines for Ovarian Cyst Management"
             },
-            'treatment_protocol': TREATMENT_PROTOCOLS.get(prediction_result['prediction'], {}),
+            'treatment_protocol': TREATMENT_PROTOCOL_FRAGMENTS.get(prediction_result['prediction'], EMPTY_PROTOCOL),
             'cost_estimation': cost_estimation,
             'inventory_status': inventory_status,
             'follow_up_plan': {
                 'next_appointment': (datetime.now() + timedelta(days=30)).isoformat(),
                 'required_tests': ['Ultrasound', 'CA-125'] if prediction_result['prediction'] != 'Surgery' else ['Post-op ultrasound'],
-                'warning_signs': TREATMENT_PROTOCOLS.get(prediction_result['prediction'], {}).get('warning_signs', [])
+                'warning_signs': WARNING_SIGN_FRAGMENTS.get(prediction_result['prediction'], NO_WARNING_SIGNS)
             }
         }
         
+        top_k = explanation_top_k()
+        if top_k:
+            explanation = explain_predictions(processed_data, [prediction_result], top_k)[0]
+            care_template['ai_recommendation']['explanation'] = explanation
+            care_template['ai_recommendation']['rationale'] = summarize_explanation(explanation)
+        
         return jsonify({
             'success': True,
             'care_template': care_template,
+            'model_version': served_model_version(),
             'timestamp': datetime.now().isoformat()
         })
         
@@ -748,8 +1165,7 @@ def cost_estimation():
                 'timestamp': datetime.now().isoformat()
             }), 400
         
-        prediction_encoded = model.predict(processed_data)
-        recommended_plan = target_encoder.inverse_transform(prediction_encoded)[0]
+        recommended_plan = predict_single(processed_data)['prediction']
         
         # Risk assessment
         risk_assessment = assess_risk_level(data)
@@ -761,6 +1177,7 @@ def cost_estimation():
             'success': True,
             'recommended_treatment': recommended_plan,
             'cost_estimation': cost_estimation,
+            'model_version': served_model_version(),
             'timestamp': datetime.now().isoformat()
         })
         
@@ -793,8 +1210,7 @@ def inventory_status():
                 'timestamp': datetime.now().isoformat()
             }), 400
         
-        prediction_encoded = model.predict(processed_data)
-        recommended_plan = target_encoder.inverse_transform(prediction_encoded)[0]
+        recommended_plan = predict_single(processed_data)['prediction']
         
         # Inventory status
         inventory_status = get_real_time_inventory_status(recommended_plan)
@@ -803,6 +1219,7 @@ def inventory_status():
             'success': True,
             'recommended_treatment': recommended_plan,
             'inventory_status': inventory_status,
+            'model_version': served_model_version(),
             'timestamp': datetime.now().isoformat()
         })
         
@@ -813,6 +1230,21 @@ def inventory_status():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+# Patient fields returned by /search-patients: (key, patient_data.csv column, dtype)
+PATIENT_SEARCH_FIELDS = [
+    ('patient_id', 'Patient ID', None),
+    ('age', 'Age', 'int64'),
+    ('menopause_stage', 'Menopause Stage', None),
+    ('cyst_size', 'SI Cyst Size cm', 'float64'),
+    ('cyst_growth', 'Cyst Growth', 'float64'),
+    ('ca125_level', 'fca 125 Level', 'int64'),
+    ('ultrasound_features', 'Ultrasound Fe', None),
+    ('reported_symptoms', 'Reported Sym', None),
+    ('region', 'Region', None),
+    ('date_of_exam', 'Date of Exam', None),
+    ('previous_recommendation', 'Recommended', None)
+]
+
 @app.route('/search-patients', methods=['GET'])
 def search_patients():
     """Search for patients by ID or other criteria"""
@@ -827,25 +1259,20 @@ def search_patients():
                 'timestamp': datetime.now().isoformat()
             }), 400
         
-        if patient_data is None:
+        if patient_repository is None:
             return jsonify({
                 'success': False,
                 'error': 'Patient data not loaded',
                 'timestamp': datetime.now().isoformat()
             }), 503
         
-        # Search based on type
+        # Search based on type, through the index built at load time
         if search_type == 'id':
-            # Search by Patient ID (exact match or partial)
-            if query.upper().startswith('OC-'):
-                # Exact match for full ID
-                results = patient_data[patient_data['Patient ID'].str.contains(query.upper(), na=False)]
-            else:
-                # Partial match
-                results = patient_data[patient_data['Patient ID'].str.contains(query.upper(), na=False)]
+            # Search by Patient ID (full or partial)
+            results = patient_repository.search_id(query.upper())
         elif search_type == 'region':
             # Search by region
-            results = patient_data[patient_data['Region'].str.contains(query, case=False, na=False)]
+            results = patient_repository.search_region(query)
         else:
             return jsonify({
                 'success': False,
@@ -853,22 +1280,12 @@ def search_patients():
                 'timestamp': datetime.now().isoformat()
             }), 400
         
+        if wants_ndjson():
+            return ndjson_response(iter_serialized_records(results, PATIENT_SEARCH_FIELDS),
+                                   headers={'X-Total-Count': str(len(results))})
+        
         # Convert results to list of dictionaries
-        patients = []
-        for _, row in results.iterrows():
-            patients.append({
-                'patient_id': row['Patient ID'],
-                'age': int(row['Age']),
-                'menopause_stage': row['Menopause Stage'],
-                'cyst_size': float(row['SI Cyst Size cm']),
-                'cyst_growth': float(row['Cyst Growth']),
-                'ca125_level': int(row['fca 125 Level']),
-                'ultrasound_features': row['Ultrasound Fe'],
-                'reported_symptoms': row['Reported Sym'],
-                'region': row['Region'],
-                'date_of_exam': row['Date of Exam'],
-                'previous_recommendation': row['Recommended']
-            })
+        patients = frame_records(results, PATIENT_SEARCH_FIELDS)
         
         return jsonify({
             'success': True,
@@ -890,7 +1307,7 @@ def search_patients():
 def get_patient_care_template(patient_id):
     """Generate care template for an existing patient by ID"""
     try:
-        if patient_data is None:
+        if patient_repository is None:
             return jsonify({
                 'success': False,
                 'error': 'Patient data not loaded',
@@ -898,9 +1315,9 @@ def get_patient_care_template(patient_id):
             }), 503
         
         # Find patient by ID
-        patient_row = patient_data[patient_data['Patient ID'] == patient_id.upper()]
+        patient = patient_repository.get(patient_id.upper())
         
-        if patient_row.empty:
+        if patient is None:
             return jsonify({
                 'success': False,
                 'error': f'Patient with ID {patient_id} not found',
@@ -908,12 +1325,11 @@ def get_patient_care_template(patient_id):
             }), 404
         
         # Get patient data
-        patient = patient_row.iloc[0]
         patient_data_dict = {
-            'Age': int(patient['Age']),
-            'SI Cyst Size cm': float(patient['SI Cyst Size cm']),
-            'Cyst Growth': float(patient['Cyst Growth']),
-            'fca 125 Level': int(patient['fca 125 Level']),
+            'Age': patient['Age'],
+            'SI Cyst Size cm': patient['SI Cyst Size cm'],
+            'Cyst Growth': patient['Cyst Growth'],
+            'fca 125 Level': patient['fca 125 Level'],
             'Menopause Stage': patient['Menopause Stage'],
             'Ultrasound Fe': patient['Ultrasound Fe'],
             'Reported Sym': patient['Reported Sym']
@@ -929,21 +1345,8 @@ def get_patient_care_template(patient_id):
             }), 400
         
         # Make prediction
-        prediction_encoded = model.predict(processed_data)
-        recommended_plan = target_encoder.inverse_transform(prediction_encoded)[0]
-        
-        # Get prediction probabilities
-        probabilities = model.predict_proba(processed_data)[0]
-        confidence = max(probabilities)
-        
-        prediction_result = {
-            'prediction': recommended_plan,
-            'confidence': float(confidence),
-            'probabilities': {
-                target_encoder.classes_[i]: float(prob) 
-                for i, prob in enumerate(probabilities)
-            }
-        }
+        prediction_result = predict_single(processed_data)
+        recommended_plan = prediction_result['prediction']
         
         # Risk assessment
         risk_assessment = assess_risk_level(patient_data_dict)
@@ -977,13 +1380,13 @@ def get_patient_care_template(patient_id):
                 'follows_guidelines': True,
                 'guideline_reference': "Kenyan National Guidelines for Ovarian Cyst Management"
             },
-            'treatment_protocol': TREATMENT_PROTOCOLS.get(prediction_result['prediction'], {}),
+            'treatment_protocol': TREATMENT_PROTOCOL_FRAGMENTS.get(prediction_result['prediction'], EMPTY_PROTOCOL),
             'cost_estimation': cost_estimation,
             'inventory_status': inventory_status,
             'follow_up_plan': {
                 'next_appointment': (datetime.now() + timedelta(days=30)).isoformat(),
                 'required_tests': ['Ultrasound', 'CA-125'] if prediction_result['prediction'] != 'Surgery' else ['Post-op ultrasound'],
-                'warning_signs': TREATMENT_PROTOCOLS.get(prediction_result['prediction'], {}).get('warning_signs', [])
+                'warning_signs': WARNING_SIGN_FRAGMENTS.get(prediction_result['prediction'], NO_WARNING_SIGNS)
             },
             'comparison': {
                 'previous_recommendation': patient['Recommended'],
@@ -992,11 +1395,213 @@ def get_patient_care_template(patient_id):
             }
         }
         
+        if WARMUP_HEADER not in request.headers:
+            patient_repository.record_assessment(
+                patient_id=patient['Patient ID'],
+                prediction=prediction_result['prediction'],
+                confidence=prediction_result['confidence'],
+                risk_level=risk_assessment['risk_level'],
+                model_version=served_model_version()
+            )
+        
+        top_k = explanation_top_k()
+        if top_k:
+            explanation = explain_predictions(processed_data, [prediction_result], top_k)[0]
+            care_template['ai_recommendation']['explanation'] = explanation
+            care_template['ai_recommendation']['rationale'] = summarize_explanation(explanation)
+        
         return jsonify({
             'success': True,
             'care_template': care_template,
+            'model_version': served_model_version(),
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+@app.route('/patient/<patient_id>/assessments', methods=['GET'])
+def get_patient_assessments(patient_id):
+    """Care-template assessments previously generated for a stored patient, newest first"""
+    try:
+        if patient_repository is None:
+            return jsonify({
+                'success': False,
+                'error': 'Patient data not loaded',
+                'timestamp': datetime.now().isoformat()
+            }), 503
+        
+        limit = request.args.get('limit', 20, type=int)
+        assessments = patient_repository.assessments(patient_id.upper(), limit)
+        return jsonify({
+            'success': True,
+            'patient_id': patient_id.upper(),
+            'total_results': len(assessments),
+            'assessments': assessments,
+            'patient_store': patient_repository.backend,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+@app.route('/feedback', methods=['POST'])
+def record_feedback():
+    """Record the treatment a clinician actually chose for a patient
+
+    Send ``actual_treatment`` plus either a known ``patient_id`` or the
+    patient fields used by /predict. ``predicted_treatment``, ``model_version``
+    and ``clinician`` are optional.
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided',
+                'timestamp': datetime.now().isoformat()
+            }), 400
+        
+        if target_encoder is None:
+            return jsonify({
+                'success': False,
+                'error': 'Model not loaded',
+                'timestamp': datetime.now().isoformat()
+            }), 503
+        
+        from ovarian_cyst_predictor import TARGET_ALIASES
+        
+        actual_treatment = str(data.get('actual_treatment', '')).strip()
+        actual_treatment = TARGET_ALIASES.get(actual_treatment, actual_treatment)
+        if actual_treatment not in target_encoder.classes_:
+            return jsonify({
+                'success': False,
+                'error': f"actual_treatment must be one of: {', '.join(target_encoder.classes_)}",
+                'timestamp': datetime.now().isoformat()
+            }), 400
+        
+        # Start from the stored patient record when an ID is given; body fields override it
+        record = {}
+        patient_id = str(data.get('patient_id', '')).strip().upper()
+        if patient_id and patient_repository is not None:
+            record = patient_repository.get(patient_id) or {}
+        record.update({field: data[field] for field in PATIENT_FIELDS + ['Region', 'Date of Exam'] if field in data})
+        
+        missing = [field for field in PATIENT_FIELDS if field != 'Reported Sym' and field not in record]
+        if missing:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown patient_id and missing fields: {', '.join(missing)}",
+                'timestamp': datetime.now().isoformat()
+            }), 400
+        try:
+            for field in ('Age', 'SI Cyst Size cm', 'Cyst Growth', 'fca 125 Level'):
+                record[field] = float(record[field])
+        except (TypeError, ValueError) as e:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid numeric field: {e}',
+                'timestamp': datetime.now().isoformat()
+            }), 400
+        
+        row = feedback_store.append(dict(
+            record,
+            **{
+                'Patient ID': patient_id or record.get('Patient ID', ''),
+                'Recommended': actual_treatment,
+                'Predicted': data.get('predicted_treatment', ''),
+                'Model Version': data.get('model_version', model_version),
+                'Clinician': data.get('clinician', ''),
+                'Recorded At': datetime.now().isoformat()
+            }
+        ))
+        
+        return jsonify({
+            'success': True,
+            'message': 'Outcome recorded',
+            'feedback': row,
+            'timestamp': datetime.now().isoformat()
+        }), 201
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+@app.route('/feedback', methods=['GET'])
+def feedback_summary():
+    """Summary of recorded outcomes"""
+    try:
+        return jsonify({
+            'success': True,
+            'summary': feedback_store.summary(),
             'timestamp': datetime.now().isoformat()
         })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+@app.route('/train/incremental', methods=['POST'])
+def train_incremental():
+    """Start an incremental update from recorded outcomes in the background
+
+    Optional JSON body: ``mode`` ('warm_start' or 'window'), ``new_trees``, ``window``.
+    """
+    from incremental_training import INCREMENTAL_MODES
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        mode = data.get('mode', 'warm_start')
+        if mode not in INCREMENTAL_MODES:
+            return jsonify({
+                'success': False,
+                'error': f"mode must be one of: {', '.join(INCREMENTAL_MODES)}",
+                'timestamp': datetime.now().isoformat()
+            }), 400
+        
+        sizes = {}
+        for field, default in (('new_trees', INCREMENTAL_NEW_TREES), ('window', INCREMENTAL_WINDOW)):
+            value = data.get(field, default)
+            # Whole numbers only (JSON numbers or digit strings); True/False and 2.5 are rejected
+            if isinstance(value, str) and value.strip().isdigit():
+                value = int(value)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                return jsonify({
+                    'success': False,
+                    'error': f'{field} must be a positive integer',
+                    'timestamp': datetime.now().isoformat()
+                }), 400
+            sizes[field] = value
+        
+        if model_bundle is None:
+            return jsonify({
+                'success': False,
+                'error': 'Model not loaded',
+                'timestamp': datetime.now().isoformat()
+            }), 503
+        
+        job, created = training_jobs.start(mode=mode, **sizes)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Incremental training started' if created else 'A training job is already running',
+            'job': job,
+            'status_url': f"/train/{job['job_id']}",
+            'timestamp': datetime.now().isoformat()
+        }), 202 if created else 409
         
     except Exception as e:
         return jsonify({
@@ -1005,43 +1610,119 @@ def get_patient_care_template(patient_id):
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@app.route('/train/<job_id>', methods=['GET'])
+def train_status(job_id):
+    """Get the status of a training job"""
+    job = training_jobs.get(job_id) if re.fullmatch(r'[0-9a-f]{12}', job_id) else None
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Training job {job_id} not found',
+            'timestamp': datetime.now().isoformat()
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job,
+        'active_model_version': model_version,
+        'timestamp': datetime.now().isoformat()
+    })
+
+# Patient fields returned by /patients: (key, patient_data.csv column, dtype)
+PATIENT_LIST_FIELDS = [
+    ('patient_id', 'Patient ID', None),
+    ('age', 'Age', 'int64'),
+    ('menopause_stage', 'Menopause Stage', None),
+    ('cyst_size', 'SI Cyst Size cm', 'float64'),
+    ('ca125_level', 'fca 125 Level', 'int64'),
+    ('region', 'Region', None),
+    ('date_of_exam', 'Date of Exam', None),
+    ('previous_recommendation', 'Recommended', None)
+]
+
+def list_patients_after_cursor():
+    """Keyset page of /patients in Patient ID order, continued with ``next_cursor``"""
+    try:
+        after = decode_cursor(request.args.get('cursor', ''))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 400
+    
+    per_page = max(int(request.args.get('per_page', 20)), 1)
+    page_patients, next_after = patient_repository.page_after(after, per_page)
+    next_cursor = encode_cursor(*next_after) if next_after else None
+    total_patients = patient_repository.count()
+    
+    if wants_ndjson():
+        headers = {'X-Total-Count': str(total_patients)}
+        if next_cursor:
+            headers['X-Next-Cursor'] = next_cursor
+        return ndjson_response(iter_serialized_records(page_patients, PATIENT_LIST_FIELDS), headers=headers)
+    
+    return jsonify({
+        'success': True,
+        'pagination': {
+            'per_page': per_page,
+            'total_patients': total_patients,
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
+        },
+        'patients': frame_records(page_patients, PATIENT_LIST_FIELDS),
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/patients', methods=['GET'])
 def list_patients():
-    """List all patients with pagination"""
+    """List all patients with pagination
+
+    ``?cursor=`` (empty for the first page, then each response's
+    ``next_cursor``) pages through patients in Patient ID order at a
+    constant cost per page; ``page``/``per_page`` keeps offset pages in
+    table order. With ``Accept: application/x-ndjson`` patients are
+    streamed one per line; the whole list is streamed unless ``cursor``,
+    ``page`` or ``per_page`` is given.
+    """
     try:
-        if patient_data is None:
+        if patient_repository is None:
             return jsonify({
                 'success': False,
                 'error': 'Patient data not loaded',
                 'timestamp': datetime.now().isoformat()
             }), 503
         
+        if 'cursor' in request.args:
+            return list_patients_after_cursor()
+        
+        if wants_ndjson() and 'page' not in request.args and 'per_page' not in request.args:
+            records = (record for chunk in patient_repository.iter_chunks(NDJSON_CHUNK_SIZE)
+                       for record in frame_records(chunk, PATIENT_LIST_FIELDS))
+            return ndjson_response(records, headers={'X-Total-Count': str(patient_repository.count())})
+        
         # Pagination parameters
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 20))
         
         # Calculate pagination
-        total_patients = len(patient_data)
+        total_patients = patient_repository.count()
         total_pages = (total_patients + per_page - 1) // per_page
         start_idx = (page - 1) * per_page
         end_idx = start_idx + per_page
         
         # Get patients for current page
-        page_patients = patient_data.iloc[start_idx:end_idx]
-        
-        patients = []
-        for _, row in page_patients.iterrows():
-            patients.append({
-                'patient_id': row['Patient ID'],
-                'age': int(row['Age']),
-                'menopause_stage': row['Menopause Stage'],
-                'cyst_size': float(row['SI Cyst Size cm']),
-                'ca125_level': int(row['fca 125 Level']),
-                'region': row['Region'],
-                'date_of_exam': row['Date of Exam'],
-                'previous_recommendation': row['Recommended']
+        page_patients = patient_repository.slice(start_idx, end_idx)
+        
+        if wants_ndjson():
+            return ndjson_response(iter_serialized_records(page_patients, PATIENT_LIST_FIELDS), headers={
+                'X-Total-Count': str(total_patients),
+                'X-Page': str(page),
+                'X-Total-Pages': str(total_pages)
             })
         
+        patients = frame_records(page_patients, PATIENT_LIST_FIELDS)
+        
         return jsonify({
             'success': True,
             'pagination': {
@@ -1063,9 +1744,131 @@ def list_patients():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+def process_dataset_upload(context, path, file_extension):
+    """Parse and score an uploaded dataset inside a background job"""
+    sample_data = []
+    
+    try:
+        if file_extension in SUPPORTED_EXTENSIONS:
+            # Stream the sheet in chunks, writing scored rows to the results file
+            results_path = os.path.join(UPLOAD_RESULTS_DIR, f'{context.job_id}.csv')
+            results_url = f'/upload-dataset/{context.job_id}/results'
+            totals = {'chunks_done': 0, 'total_records': 0, 'processed_records': 0,
+                      'failed_records': 0, 'predicted_records': 0}
+            
+            def score_and_sample(chunk):
+                scored, counts = score_upload_chunk(chunk)
+                # Store sample data (first 3 records)
+                for record in scored.head(3 - len(sample_data)).to_dict('records'):
+                    sample_data.append({
+                        'patient_data': {col: record[col] for col in PATIENT_FIELDS},
+                        'risk_assessment': {
+                            'risk_level': record['Risk Level'],
+                            'risk_score': int(record['Risk Score']),
+                            'risk_factors': record['Risk Factors'].split('; ') if record['Risk Factors'] else []
+                        }
+                    })
+                return scored, counts
+            
+            def report_chunk(progress):
+                totals['chunks_done'] += 1
+                totals['total_records'] = progress['total_records']
+                totals['processed_records'] += progress['processed']
+                totals['failed_records'] += progress['failed']
+                totals['predicted_records'] += progress['predicted']
+                context.update(
+                    progress=dict(totals, last_chunk=progress,
+                                  rows_per_second=round(totals['total_records'] / context.elapsed(), 1)),
+                    result={'file_type': file_extension, 'sample_data': sample_data,
+                            'results_url': results_url}
+                )
+                context.check_cancelled()
+            
+            summary = run_dataset_pipeline(path, file_extension, results_path, score_and_sample,
+                                           chunk_size=UPLOAD_CHUNK_SIZE, on_chunk=report_chunk)
+            return {
+                'file_type': file_extension,
+                'total_records': summary['total_records'],
+                'processed_records': summary['processed_records'],
+                'failed_records': summary['failed_records'],
+                'sample_data': sample_data,
+                'upload_id': context.job_id,
+                'results_url': results_url,
+                'predicted_records': summary['predicted_records'],
+                'chunk_size': UPLOAD_CHUNK_SIZE,
+                'chunks': summary['chunks'],
+                'rows_per_second': summary['rows_per_second']
+            }
+        
+        # Extract PDF pages in parallel, streaming them to the results file in page order
+        total_records = count_pages(path)
+        page_budget = context.manager.get(context.job_id)['params'].get('page_budget', PDF_PAGE_BUDGET)
+        pages_to_read = min(total_records, page_budget)
+        results_path = os.path.join(UPLOAD_RESULTS_DIR, f'{context.job_id}.jsonl')
+        results_url = f'/upload-dataset/{context.job_id}/results'
+        processed_records = 0
+        failed_pages = 0
+        table_count = 0
+        
+        os.makedirs(UPLOAD_RESULTS_DIR, exist_ok=True)
+        pages = pdf_extractor.iter_pages(path, pages_to_read)
+        try:
+            with open(results_path, 'w', encoding='utf-8') as output:
+                for page in pages:
+                    output.write(json.dumps(page) + '\n')
+                    output.flush()
+                    if 'error' in page:
+                        print(f"Error processing PDF page {page['page'] - 1}: {page['error']}")
+                        failed_pages += 1
+                    else:
+                        processed_records += 1
+                        table_count += len(page['tables'])
+                        # Store sample data (first 10 pages)
+                        if len(sample_data) < 10:
+                            text = page['text']
+                            sample_data.append({
+                                'page': page['page'],
+                                'text_length': len(text),
+                                'tables': len(page['tables']),
+                                'sample_text': text[:200] + '...' if len(text) > 200 else text
+                            })
+                    
+                    context.update(
+                        progress={'pages_done': page['page'], 'pages_to_read': pages_to_read,
+                                  'total_pages': total_records,
+                                  'pages_per_second': round(page['page'] / context.elapsed(), 1)},
+                        result={'file_type': file_extension, 'sample_data': sample_data,
+                                'results_url': results_url}
+                    )
+                    context.check_cancelled()
+        finally:
+            pages.close()
+        
+        return {
+            'file_type': file_extension,
+            'total_records': total_records,
+            'processed_records': processed_records,
+            'failed_records': failed_pages,
+            'skipped_pages': total_records - pages_to_read,
+            'page_budget': page_budget,
+            'tables_found': table_count,
+            'sample_data': sample_data,
+            'upload_id': context.job_id,
+            'results_url': results_url
+        }
+    
+    finally:
+        # Clean up the uploaded file
+        shutil.rmtree(context.work_dir, ignore_errors=True)
+
 @app.route('/upload-dataset', methods=['POST'])
 def upload_dataset():
-    """Upload and process Excel or PDF files"""
+    """Upload an Excel, CSV, Parquet or PDF file and process it in a background job
+
+    Returns 202 with the job ID straight away; poll /jobs/<job_id> for
+    progress and the processed result. The request never waits for the job,
+    so request workers stay free for /predict traffic.
+    """
     try:
         if 'file' not in request.files:
             return jsonify({
@@ -1083,105 +1886,36 @@ def upload_dataset():
         # Get file info
         filename = file.filename
         file_extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''        
-        # Save file temporarily
-        import tempfile
-        import os
-        from werkzeug.utils import secure_filename
+        if file_extension not in SUPPORTED_EXTENSIONS + ['pdf']:
+            return jsonify({
+                'success': False,
+                'error': 'Unsupported file type. Please upload Excel (.xlsx, .xls), CSV (.csv), Parquet (.parquet) or PDF (.pdf) files',
+                'timestamp': datetime.now().isoformat()
+            }), 400
         
-        temp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(temp_dir, secure_filename(filename))
-        file.save(temp_path)
+        params = {'filename': filename, 'file_type': file_extension}
+        if file_extension == 'pdf':
+            page_budget = request.values.get('page_budget', PDF_PAGE_BUDGET, type=int)
+            params['page_budget'] = max(1, min(page_budget, PDF_PAGE_BUDGET))
         
-        processed_records = 0
-        total_records = 0
-        sample_data = []
-        
-        try:
-            if file_extension in ['xlsx', 'xls']:
-                # Process Excel file
-                import pandas as pd
-                df = pd.read_excel(temp_path)
-                total_records = len(df)
-                
-                # Process each row
-                for index, row in df.iterrows():
-                    try:
-                        # Convert row to patient data format
-                        patient_data = {
-                            'Age': int(row.get('Age', 0)),
-                            'Menopause Stage': row.get('Menopause Stage', 'Pre-menopausal'),
-                            'SI Cyst Size cm': float(row.get('SI Cyst Size cm', 0)),
-                            'Cyst Growth': float(row.get('Cyst Growth', 0)),
-                            'fca 125 Level': int(row.get('fca 125 Level', 0)),
-                            'Ultrasound Fe': row.get('Ultrasound Fe', 'Simple cyst'),
-                            'Reported Sym': row.get('Reported Sym', '')
-                        }
-                        
-                        # Assess risk for this patient
-                        risk_assessment = assess_risk_level(patient_data)
-                        
-                        # Store sample data (first 3 records)
-                        if len(sample_data) < 3:
-                            sample_data.append({
-                                'patient_data': patient_data,
-                                'risk_assessment': risk_assessment
-                            })
-                        
-                        processed_records += 1
-                        
-                    except Exception as e:
-                        print(f"Error processing row {index}: {e}")
-                        continue
-                        
-            elif file_extension == 'pdf':
-                # Process PDF file (extract text for now)
-                import PyPDF2
-                
-                with open(temp_path, 'rb') as pdf_file:
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    total_records = len(pdf_reader.pages)
-                    
-                    for page_num in range(min(total_records, 10)):  # Process first 10 pages
-                        try:
-                            page = pdf_reader.pages[page_num]
-                            text = page.extract_text()
-                            
-                            # Extract basic information (simplified)
-                            sample_data.append({
-                                'page': page_num + 1,
-                                'text_length': len(text),
-                                'sample_text': text[:200] + '...' if len(text) > 200 else text
-                            })
-                            
-                            processed_records += 1                 
-                        except Exception as e:
-                            print(f"Error processing PDF page {page_num}: {e}")
-                            continue
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': 'Unsupported file type. Please upload Excel (.xlsx, .xls) or PDF (.pdf) files',
-                    'timestamp': datetime.now().isoformat()
-                }), 400
-                
-        finally:
-            # Clean up temporary file
-            try:
-                os.remove(temp_path)
-                os.rmdir(temp_dir)
-            except:
-                pass
+        # Save the file into the job's work directory and queue it
+        job = upload_jobs.create('upload-dataset', params)
+        upload_path = os.path.join(upload_jobs.work_dir(job['job_id']), secure_filename(filename) or f'upload.{file_extension}')
+        file.save(upload_path)
+        upload_jobs.run(
+            job['job_id'], lambda context: process_dataset_upload(context, upload_path, file_extension)
+        )
         
         return jsonify({
             'success': True,
-            'message': f'File uploaded and processed successfully',
+            'message': 'File uploaded; processing in the background',
             'file_type': file_extension,
-            'total_records': total_records,
-            'processed_records': processed_records,
-            'failed_records': total_records - processed_records,
-            'sample_data': sample_data,
+            'job_id': job['job_id'],
+            'status_url': f"/jobs/{job['job_id']}",
+            'cancel_url': f"/jobs/{job['job_id']}/cancel",
+            'job': upload_jobs.get(job['job_id']),
             'timestamp': datetime.now().isoformat()
-        })
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -1190,16 +1924,91 @@ def upload_dataset():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Recent background jobs, newest first"""
+    limit = request.args.get('limit', 20, type=int)
+    jobs = upload_jobs.list(limit=max(1, min(limit, 100)))
+    return jsonify({
+        'success': True,
+        'jobs': jobs,
+        'total': len(jobs),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Progress, throughput and (partial) results of a background job"""
+    job = upload_jobs.get(job_id) if re.fullmatch(r'[0-9a-f]{12}', job_id) else None
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Job {job_id} not found',
+            'timestamp': datetime.now().isoformat()
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job,
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running background job"""
+    job, accepted = upload_jobs.cancel(job_id) if re.fullmatch(r'[0-9a-f]{12}', job_id) else (None, False)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Job {job_id} not found',
+            'timestamp': datetime.now().isoformat()
+        }), 404
+    
+    return jsonify({
+        'success': accepted,
+        'message': 'Cancel requested' if accepted else f"Job already {job['status']}",
+        'job': job,
+        'timestamp': datetime.now().isoformat()
+    }), 202 if accepted else 409
+
+@app.route('/upload-dataset/<upload_id>/results', methods=['GET'])
+def download_upload_results(upload_id):
+    """Download the scored CSV (spreadsheets) or extracted pages JSONL (PDFs) of an upload"""
+    if re.fullmatch(r'[0-9a-f]{12}', upload_id):
+        scored_path = os.path.join(UPLOAD_RESULTS_DIR, f'{upload_id}.csv')
+        if wants_ndjson() and os.path.exists(scored_path):
+            # Re-read the scored CSV in chunks and stream it one row per line
+            def scored_rows():
+                for chunk in pd.read_csv(scored_path, chunksize=UPLOAD_CHUNK_SIZE):
+                    yield from iter_frame_records(chunk, lambda row: row, chunk_size=len(chunk) or 1)
+            return ndjson_response(scored_rows())
+        
+        for extension, mimetype in [('csv', 'text/csv'), ('jsonl', 'application/x-ndjson')]:
+            results_path = os.path.join(UPLOAD_RESULTS_DIR, f'{upload_id}.{extension}')
+            if os.path.exists(results_path):
+                return send_file(os.path.abspath(results_path), mimetype=mimetype,
+                                 as_attachment=True, download_name=f'scored_{upload_id}.{extension}')
+    
+    return jsonify({
+        'success': False,
+        'error': f'No results for upload {upload_id}',
+        'timestamp': datetime.now().isoformat()
+    }), 404
+
 if __name__ == '__main__':
     print("🚀 Starting Enhanced API Server...")
     
     # Load model and data
     if load_model_and_data():
         print("✅ Model and data loaded successfully")
+        warm_up()
         print("\n📋 Available endpoints:")
         print("  GET  / - API information")
         print("  GET  /health - Health check")
+        print("  GET  /ready - Readiness (200 once warm-up has completed)")
+        print("  GET  /models - Loaded models, routing and per-model latency")
         print("  POST /predict - Enhanced prediction with risk assessment")
+        print("  POST /predict/batch - Batch prediction for many patients")
         print("  POST /care-template - Complete intelligent care template")
         print("  POST /risk-assessment - Risk assessment based on guidelines")
         print("  POST /cost-estimation - Detailed cost analysis")
@@ -1207,6 +2016,9 @@ if __name__ == '__main__':
         print("  GET  /patients - List all patients (paginated)")
         print("  GET  /search-patients?q=<query>&type=<id|region> - Search patients")
         print("  GET  /patient/<patient_id>/care-template - Get care template for existing patient")
+        print("  GET  /patient/<patient_id>/assessments - Assessments generated for a patient")
+        print("  POST /feedback - Record the treatment actually chosen")
+        print("  POST /train/incremental - Update the model from recorded outcomes")
         print("🌐 Server running at: http://127.0.0.1:5001")
         app.run(host='127.0.0.1', port=5001, debug=True)
     else:
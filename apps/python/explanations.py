@@ -0,0 +1,65 @@
+"""
+Per-prediction explanations for the Ovarian Cyst Prediction API
+Turns tree-path feature contributions into the top contributors for each predicted plan
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+DEFAULT_TOP_K = 5
+
+
+def input_values(encoder: Any, features: np.ndarray) -> np.ndarray:
+    """Encoded rows with the numerical columns scaled back to the values the patient sent"""
+    values = np.array(features, dtype=np.float64)
+    values[:, encoder.scaled_index] = values[:, encoder.scaled_index] * encoder.scale_scale + encoder.scale_mean
+    return values
+
+
+def explain_rows(explainer: Any, encoder: Any, features: np.ndarray, class_names: Sequence[str],
+                 predictions: Sequence[str], top_k: int = DEFAULT_TOP_K) -> List[Dict[str, Any]]:
+    """Top ``top_k`` contributors to each row's predicted plan
+
+    ``explainer`` is a FlattenedForest; contributions are changes in the
+    predicted plan's probability. ``baseline`` plus every contribution
+    (the listed ones and ``other_features``) equals the predicted probability.
+    """
+    contributions = explainer.explain(features)
+    values = input_values(encoder, features)
+    class_index = {str(name): i for i, name in enumerate(class_names)}
+
+    explanations = []
+    for row, prediction in enumerate(predictions):
+        k = class_index[prediction]
+        row_contributions = contributions[row, :, k]
+        top = [i for i in np.argsort(-np.abs(row_contributions), kind='stable')[:top_k]
+               if row_contributions[i] != 0.0]
+        listed = []
+        for i in top:
+            column = encoder.feature_columns[i]
+            value = values[row, i]
+            listed.append({
+                'feature': column,
+                'value': bool(value) if i in encoder.encoded_columns else round(float(value), 4),
+                'contribution': round(float(row_contributions[i]), 4)
+            })
+        explanations.append({
+            'method': 'tree_path',
+            'predicted_class': prediction,
+            'baseline': round(float(explainer.bias[k]), 4),
+            'top_contributors': listed,
+            'other_features': round(float(row_contributions.sum() - row_contributions[top].sum()), 4)
+        })
+    return explanations
+
+
+def summarize_explanation(explanation: Dict[str, Any], limit: int = 3) -> str:
+    """One-line rationale naming the strongest contributors"""
+    parts = []
+    for item in explanation['top_contributors'][:limit]:
+        direction = 'for' if item['contribution'] > 0 else 'against'
+        parts.append(f"{item['feature']} = {item['value']} ({direction}, {item['contribution']:+.2f})")
+    if not parts:
+        return f"{explanation['predicted_class']} is the model's baseline recommendation"
+    return f"{explanation['predicted_class']} driven mainly by " + '; '.join(parts)
@@ -0,0 +1,146 @@
+"""
+Preprocessed training-matrix cache for the ovarian cyst treatment model
+Stores the encoded feature matrix once per source file and preprocessing code version
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model_store import file_sha256
+
+FEATURE_CACHE_DIR = os.environ.get('FEATURE_CACHE_DIR', os.path.join('cache', 'features'))
+FEATURE_CACHE_KEEP = int(os.environ.get('FEATURE_CACHE_KEEP', 3))
+
+CACHE_FORMAT = 1
+META_FILE = 'meta.json'
+X_FILE = 'X.npy'
+Y_FILE = 'y.npy'
+TARGET_COLUMN = 'Recommended'
+
+
+def preprocessing_version() -> str:
+    """Hash of the preprocessing code and the pandas release that runs it
+
+    The whole ``ovarian_cyst_predictor`` module is hashed, so editing
+    ``preprocess_and_clean`` or anything it calls (``clean_target_labels``,
+    ``TARGET_ALIASES``), or upgrading pandas, whose dummy encoding it relies
+    on, changes the version and so misses the cache.
+    """
+    import ovarian_cyst_predictor
+
+    digest = hashlib.sha256(inspect.getsource(ovarian_cyst_predictor).encode('utf-8'))
+    digest.update(pd.__version__.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def cache_key(source_path: str) -> Tuple[str, str, str]:
+    """Cache key, source-file hash and code version for a training CSV"""
+    source_hash = file_sha256(source_path)
+    code_version = preprocessing_version()
+    key = hashlib.sha256(f'{source_hash}:{code_version}:{CACHE_FORMAT}'.encode('utf-8')).hexdigest()[:16]
+    return key, source_hash, code_version
+
+
+def _rebuild_target_encoder(classes):
+    from sklearn.preprocessing import LabelEncoder
+
+    target_encoder = LabelEncoder()
+    target_encoder.classes_ = np.array(classes, dtype=object)
+    return target_encoder
+
+
+def _read_entry(path: str) -> Tuple[pd.DataFrame, Any, Dict[str, Any]]:
+    """Memory-map a cache entry and wrap it as the processed training frame (no copy)"""
+    with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    X = np.load(os.path.join(path, X_FILE), mmap_mode='r')
+    y = np.load(os.path.join(path, Y_FILE), mmap_mode='r')
+
+    frame = pd.DataFrame(X, columns=meta['feature_columns'], copy=False)
+    frame[TARGET_COLUMN] = y
+    return frame, _rebuild_target_encoder(meta['classes']), meta
+
+
+def _write_entry(cache_dir: str, key: str, processed: pd.DataFrame, target_encoder: Any,
+                 meta: Dict[str, Any]) -> str:
+    """Publish a cache entry with a single rename so readers never see a partial one"""
+    os.makedirs(cache_dir, exist_ok=True)
+    staging_path = os.path.join(cache_dir, f'.staging-{uuid.uuid4().hex[:8]}')
+    os.makedirs(staging_path)
+    try:
+        features = processed.drop(columns=[TARGET_COLUMN])
+        np.save(os.path.join(staging_path, X_FILE), np.ascontiguousarray(features.to_numpy(dtype=np.float64)))
+        np.save(os.path.join(staging_path, Y_FILE), processed[TARGET_COLUMN].to_numpy(dtype=np.int64))
+        meta = dict(meta, feature_columns=[str(col) for col in features.columns],
+                    classes=[str(cls) for cls in target_encoder.classes_],
+                    rows=len(processed), created_at=datetime.now().isoformat())
+        with open(os.path.join(staging_path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        final_path = os.path.join(cache_dir, key)
+        if os.path.isdir(final_path):
+            shutil.rmtree(staging_path)
+        else:
+            os.rename(staging_path, final_path)
+    except Exception:
+        shutil.rmtree(staging_path, ignore_errors=True)
+        raise
+    return final_path
+
+
+def _prune(cache_dir: str, keep: int):
+    """Remove all but the ``keep`` most recently used entries"""
+    entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if not name.startswith('.')]
+    entries = [path for path in entries if os.path.isdir(path)]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def load_training_frame(source_path: str = 'patient_data.csv', cache_dir: Optional[str] = FEATURE_CACHE_DIR,
+                        keep: int = FEATURE_CACHE_KEEP) -> Tuple[pd.DataFrame, Any]:
+    """Processed training frame and target encoder, as ``preprocess_and_clean`` returns them
+
+    Served from the cache when the source file and the preprocessing code are
+    unchanged; otherwise the CSV is preprocessed and the result cached. Feature
+    values are stored as float64 and memory-mapped on load, so a cache hit
+    does not copy the matrix. Pass ``cache_dir=None`` to skip the cache.
+    """
+    from ovarian_cyst_predictor import preprocess_and_clean
+
+    if cache_dir is None:
+        return preprocess_and_clean(pd.read_csv(source_path))
+
+    key, source_hash, code_version = cache_key(source_path)
+    path = os.path.join(cache_dir, key)
+    if os.path.isdir(path):
+        try:
+            frame, target_encoder, meta = _read_entry(path)
+            os.utime(path)  # mark as recently used for pruning
+            print(f"📦 Feature cache hit: {meta['rows']} rows x {len(meta['feature_columns'])} features ({key})")
+            return frame, target_encoder
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Feature cache entry {key} unreadable ({e}); rebuilding")
+            shutil.rmtree(path, ignore_errors=True)
+
+    processed, target_encoder = preprocess_and_clean(pd.read_csv(source_path))
+    path = _write_entry(cache_dir, key, processed, target_encoder, {
+        'format': CACHE_FORMAT,
+        'source_path': os.path.abspath(source_path),
+        'source_hash': source_hash,
+        'preprocessing_version': code_version
+    })
+    _prune(cache_dir, keep)
+    print(f"📦 Feature cache stored: {len(processed)} rows ({key})")
+    # Train on the memory-mapped copy too, so a hit and a miss give identical frames
+    frame, target_encoder, _ = _read_entry(path)
+    return frame, target_encoder
@@ -0,0 +1,164 @@
+"""
+Compiled feature encoder for the Ovarian Cyst Prediction API
+Turns patient dicts into model-ready numpy rows without building DataFrames
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping
+
+import numpy as np
+
+NUMERICAL_COLUMNS = ['Age', 'SI Cyst Size cm', 'Cyst Growth', 'fca 125 Level']
+SYMPTOM_COLUMN = 'Reported Sym'
+CATEGORICAL_COLUMNS = ['Menopause Stage', 'Ultrasound Fe']
+SYMPTOM_SEPARATOR = ', '
+
+
+def _clean_category(value: Any) -> str:
+    """Apply the strip / quote removal / 'Unknown' fill used during training"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return 'Unknown'
+    if not isinstance(value, str):
+        raise ValueError(f"Expected text value, got {type(value).__name__}")
+    return value.strip().replace('"', '')
+
+
+def _to_float(value: Any) -> float:
+    """Convert a raw field value to float, treating None as missing"""
+    if value is None:
+        return np.nan
+    return float(value)
+
+
+class FeatureEncoder:
+    """Encodes patient records into scaled float64 feature rows
+
+    Built once from ``feature_columns.pkl`` and ``scaler.pkl``. Produces the
+    same values as the pandas pipeline in ``preprocess_and_clean`` (dummy
+    encoding, column alignment and standard scaling) by writing straight
+    into preallocated numpy rows.
+    """
+
+    def __init__(self, feature_columns: Iterable[str], scaler: Any):
+        self.feature_columns = [str(col) for col in feature_columns]
+        self.n_features = len(self.feature_columns)
+        self.column_index = {col: idx for idx, col in enumerate(self.feature_columns)}
+
+        # One index map per encoded source field, keyed by the raw category value
+        self.symptom_index = self._prefix_index('Symptom_')
+        self.categorical_index = {
+            col: self._prefix_index(f'{col}_') for col in CATEGORICAL_COLUMNS
+        }
+        self.encoded_columns = set(self.symptom_index.values())
+        for index_map in self.categorical_index.values():
+            self.encoded_columns.update(index_map.values())
+
+        # Scaler parameters laid out against the feature row
+        scaler_columns = list(getattr(scaler, 'feature_names_in_', NUMERICAL_COLUMNS))
+        self.scaled_index = np.array(
+            [self.column_index[col] for col in scaler_columns if col in self.column_index],
+            dtype=np.intp
+        )
+        keep = [i for i, col in enumerate(scaler_columns) if col in self.column_index]
+        self.scale_mean = np.asarray(scaler.mean_, dtype=np.float64)[keep]
+        self.scale_scale = np.asarray(scaler.scale_, dtype=np.float64)[keep]
+
+    def _prefix_index(self, prefix: str) -> Dict[str, int]:
+        """Map raw category values to the column index of their dummy column"""
+        return {
+            col[len(prefix):]: idx
+            for idx, col in enumerate(self.feature_columns)
+            if col.startswith(prefix)
+        }
+
+    def encode_into(self, patient: Mapping[str, Any], row: np.ndarray) -> np.ndarray:
+        """Write one patient record into ``row`` (a zeroed float64 vector)"""
+        fields = {str(key).strip(): value for key, value in patient.items()}
+
+        for key, value in fields.items():
+            idx = self.column_index.get(key)
+            if idx is not None and idx not in self.encoded_columns:
+                row[idx] = _to_float(value)
+
+        if SYMPTOM_COLUMN in fields:
+            symptoms = _clean_category(fields[SYMPTOM_COLUMN])
+            for symptom in symptoms.split(SYMPTOM_SEPARATOR):
+                idx = self.symptom_index.get(symptom)
+                if idx is not None:
+                    row[idx] = 1.0
+
+        for col in CATEGORICAL_COLUMNS:
+            if col not in fields:
+                raise ValueError(f"Missing required field: {col}")
+            idx = self.categorical_index[col].get(_clean_category(fields[col]))
+            if idx is not None:
+                row[idx] = 1.0
+
+        row[self.scaled_index] = (row[self.scaled_index] - self.scale_mean) / self.scale_scale
+        return row
+
+    def encode(self, patient: Mapping[str, Any]) -> np.ndarray:
+        """Encode a single patient into a (1, n_features) matrix"""
+        matrix = np.zeros((1, self.n_features), dtype=np.float64)
+        self.encode_into(patient, matrix[0])
+        return matrix
+
+    def encode_batch(self, patients: List[Mapping[str, Any]]) -> np.ndarray:
+        """Encode several patients into one (n_patients, n_features) matrix"""
+        matrix = np.zeros((len(patients), self.n_features), dtype=np.float64)
+        for i, patient in enumerate(patients):
+            self.encode_into(patient, matrix[i])
+        return matrix
+
+    def encode_frame(self, frame: Any) -> np.ndarray:
+        """Encode a DataFrame of patients column by column (same values as ``encode_batch``)
+
+        Text fields must hold strings or missing values; numeric fields
+        should already be coerced to floats.
+        """
+        matrix = np.zeros((len(frame), self.n_features), dtype=np.float64)
+        positions = np.arange(len(frame))
+        columns = {str(col).strip(): col for col in frame.columns}
+
+        for key, col in columns.items():
+            idx = self.column_index.get(key)
+            if idx is not None and idx not in self.encoded_columns:
+                matrix[:, idx] = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        if SYMPTOM_COLUMN in columns:
+            symptoms = self._clean_text_column(frame[columns[SYMPTOM_COLUMN]])
+            exploded = symptoms.str.split(SYMPTOM_SEPARATOR, regex=False).explode()
+            idx = exploded.map(self.symptom_index).to_numpy(dtype=np.float64, na_value=np.nan)
+            rows = np.repeat(positions, symptoms.str.count(SYMPTOM_SEPARATOR).to_numpy() + 1)
+            hit = ~np.isnan(idx)
+            matrix[rows[hit], idx[hit].astype(np.intp)] = 1.0
+
+        for col in CATEGORICAL_COLUMNS:
+            if col not in columns:
+                raise ValueError(f"Missing required field: {col}")
+            values = self._clean_text_column(frame[columns[col]])
+            idx = values.map(self.categorical_index[col]).to_numpy(dtype=np.float64, na_value=np.nan)
+            hit = ~np.isnan(idx)
+            matrix[positions[hit], idx[hit].astype(np.intp)] = 1.0
+
+        scaled = matrix[:, self.scaled_index]
+        matrix[:, self.scaled_index] = (scaled - self.scale_mean) / self.scale_scale
+        return matrix
+
+    @staticmethod
+    def _clean_text_column(values: Any) -> Any:
+        """Vectorized ``_clean_category`` over a pandas Series"""
+        present = values.notna()
+        if not values[present].map(lambda value: isinstance(value, str)).all():
+            raise ValueError("Expected text values in column " + str(values.name))
+        cleaned = values.astype(object).where(present, 'Unknown')
+        return cleaned.str.strip().str.replace('"', '', regex=False)
+
+    def describe(self) -> Dict[str, int]:
+        """Summary of the compiled column layout"""
+        return {
+            'feature_count': self.n_features,
+            'symptom_columns': len(self.symptom_index),
+            'menopause_columns': len(self.categorical_index['Menopause Stage']),
+            'ultrasound_columns': len(self.categorical_index['Ultrasound Fe']),
+            'scaled_columns': len(self.scaled_index)
+        }
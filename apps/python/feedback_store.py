@@ -0,0 +1,75 @@
+"""
+Clinician outcome feedback for the Ovarian Cyst Prediction API
+Appends confirmed treatment outcomes to a CSV laid out like patient_data.csv
+"""
+
+import csv
+import io
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+FEEDBACK_PATH = os.path.join('feedback', 'outcomes.csv')
+
+# patient_data.csv columns first, so the file can be read like training data
+FEEDBACK_COLUMNS = ['Patient ID', 'Age', 'Menopause Stage', 'SI Cyst Size cm', 'Cyst Growth',
+                    'fca 125 Level', 'Ultrasound Fe', 'Reported Sym', 'Recommended',
+                    'Date of Exam', 'Region', 'Predicted', 'Model Version', 'Clinician', 'Recorded At']
+
+
+class FeedbackStore:
+    """Append-only store of confirmed outcomes, one CSV row per outcome
+
+    Each row is written with a single ``write`` on a file opened for
+    appending, so server processes sharing the file never interleave rows.
+    """
+
+    def __init__(self, path: str = FEEDBACK_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Append one outcome; missing columns are left blank"""
+        row = {col: record.get(col, '') for col in FEEDBACK_COLUMNS}
+        line = io.StringIO()
+        csv.DictWriter(line, fieldnames=FEEDBACK_COLUMNS, lineterminator='\n').writerow(row)
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock:
+            try:
+                # Only the process that creates the file writes the header
+                fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                os.write(fd, (','.join(FEEDBACK_COLUMNS) + '\n').encode('utf-8'))
+                os.close(fd)
+            except FileExistsError:
+                pass
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, line.getvalue().encode('utf-8'))
+            finally:
+                os.close(fd)
+        return row
+
+    def load(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """All recorded outcomes in the order they arrived (the last ``limit`` if given)"""
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=FEEDBACK_COLUMNS)
+        frame = pd.read_csv(self.path)
+        return frame.tail(limit).reset_index(drop=True) if limit else frame
+
+    def summary(self) -> Dict[str, Any]:
+        """Outcome count and how often the model's prediction was overruled"""
+        frame = self.load()
+        predicted = frame[frame['Predicted'].notna()]
+        return {
+            'total_outcomes': int(len(frame)),
+            'by_treatment': {str(k): int(v) for k, v in frame['Recommended'].value_counts().items()},
+            'with_prediction': int(len(predicted)),
+            'prediction_overruled': int((predicted['Predicted'] != predicted['Recommended']).sum())
+        }
+
+    def reset_after_fork(self):
+        """Replace the lock inherited from the parent process"""
+        self._lock = threading.Lock()
@@ -0,0 +1,170 @@
+"""
+Flattened random-forest inference engine for the Ovarian Cyst Prediction API
+Evaluates a fitted RandomForestClassifier with vectorized numpy traversal
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+
+def _float32_floor(values: np.ndarray) -> np.ndarray:
+    """Largest float32 values that do not exceed the given float64 values
+
+    sklearn compares float32 inputs against float64 thresholds. For any
+    float32 ``x`` the test ``x <= t`` is equivalent to ``x <= floor32(t)``,
+    so storing thresholds this way keeps splits bit-for-bit identical.
+    """
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+class FlattenedForest:
+    """Contiguous-array copy of a fitted forest with a sklearn-like interface
+
+    All trees are packed into shared node arrays (feature index, threshold,
+    left and right child, class distribution of every node). Leaves point to
+    themselves, so every tree can be stepped in lockstep for ``max_depth``
+    iterations over the whole batch. A single fitted decision tree is
+    treated as a forest of one.
+    """
+
+    def __init__(self, estimator: Any):
+        estimator = getattr(estimator, 'best_estimator_', estimator)
+        if hasattr(estimator, 'estimators_'):
+            trees = [tree.tree_ for tree in estimator.estimators_]
+        else:
+            trees = [estimator.tree_]
+        if not trees:
+            raise ValueError("Forest has no fitted trees")
+        if any(tree.n_outputs != 1 for tree in trees):
+            raise ValueError("Only single-output classifiers are supported")
+
+        self.classes_ = estimator.classes_
+        self.n_classes = len(self.classes_)
+        self.n_features_in_ = estimator.n_features_in_
+        self.n_trees = len(trees)
+        self.max_depth = max(tree.max_depth for tree in trees)
+
+        node_counts = np.array([tree.node_count for tree in trees], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+        self.roots = offsets.astype(np.int32)
+        self.n_nodes = int(node_counts.sum())
+
+        self.feature = np.empty(self.n_nodes, dtype=np.int32)
+        self.threshold = np.empty(self.n_nodes, dtype=np.float32)
+        self.left = np.empty(self.n_nodes, dtype=np.int32)
+        self.right = np.empty(self.n_nodes, dtype=np.int32)
+        self.leaf_proba = np.empty((self.n_nodes, self.n_classes), dtype=np.float64)
+
+        for tree, offset, count in zip(trees, offsets, node_counts):
+            nodes = slice(offset, offset + count)
+            own_ids = np.arange(offset, offset + count, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            self.feature[nodes] = np.where(is_leaf, 0, tree.feature)
+            self.threshold[nodes] = _float32_floor(tree.threshold)
+            self.left[nodes] = np.where(is_leaf, own_ids, tree.children_left + offset)
+            self.right[nodes] = np.where(is_leaf, own_ids, tree.children_right + offset)
+
+            # Recent sklearn stores class fractions in tree_.value and returns
+            # them as-is; older releases stored weighted counts and normalised
+            proba = tree.value[:, 0, :self.n_classes].astype(np.float64)
+            totals = proba.sum(axis=1)
+            if not np.allclose(totals, 1.0):
+                totals[totals == 0.0] = 1.0
+                proba = proba / totals[:, np.newaxis]
+            self.leaf_proba[nodes] = proba
+
+        # Forest output before any split is applied: the mean root distribution
+        self.bias = self.leaf_proba[self.roots].mean(axis=0)
+
+    def _check_input(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[-1]} features, but the forest expects {self.n_features_in_}"
+            )
+        if not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity")
+        return X
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index (global) reached in every tree, shape (n_trees, n_samples)"""
+        X = self._check_input(X)
+
+        samples = np.arange(X.shape[0])[np.newaxis, :]
+        nodes = np.repeat(self.roots[:, np.newaxis], X.shape[0], axis=1)
+        for _ in range(self.max_depth):
+            go_left = X[samples, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities averaged over all trees"""
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[1], self.n_classes), dtype=np.float64)
+        # Accumulate tree by tree, in the same order sklearn does
+        for tree_leaves in leaves:
+            proba += self.leaf_proba[tree_leaves]
+        proba /= self.n_trees
+        return proba
+
+    def explain(self, X: np.ndarray) -> np.ndarray:
+        """Per-feature contributions to each class probability, shape (n_samples, n_features, n_classes)
+
+        Walks every decision path once (the Saabas method): each split moves
+        the prediction from the parent's class distribution to the child's,
+        and that change is credited to the split feature. For every row,
+        ``bias + contributions.sum(axis=1)`` equals ``predict_proba``.
+        """
+        X = self._check_input(X)
+        n_samples, n_features = X.shape
+
+        samples = np.arange(n_samples)[np.newaxis, :]
+        row_offsets = samples * n_features
+        nodes = np.repeat(self.roots[:, np.newaxis], n_samples, axis=1)
+        contributions = np.zeros((self.n_classes, n_samples * n_features), dtype=np.float64)
+        for _ in range(self.max_depth):
+            split_feature = self.feature[nodes]
+            go_left = X[samples, split_feature] <= self.threshold[nodes]
+            children = np.where(go_left, self.left[nodes], self.right[nodes])
+            moved = children != nodes
+            if not moved.any():
+                break
+            slots = (row_offsets + split_feature)[moved]
+            change = self.leaf_proba[children[moved]] - self.leaf_proba[nodes[moved]]
+            for k in range(self.n_classes):
+                contributions[k] += np.bincount(slots, weights=change[:, k], minlength=contributions.shape[1])
+            nodes = children
+        contributions /= self.n_trees
+        return contributions.T.reshape(n_samples, n_features, self.n_classes)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Most probable class for each row"""
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1), axis=0)
+
+    def describe(self) -> Dict[str, int]:
+        """Size of the flattened forest"""
+        return {
+            'trees': self.n_trees,
+            'nodes': self.n_nodes,
+            'max_depth': self.max_depth,
+            'bytes': int(sum(a.nbytes for a in (
+                self.feature, self.threshold, self.left, self.right, self.leaf_proba
+            )))
+        }
+
+
+def verify_engine(engine: FlattenedForest, estimator: Any, n_samples: int = 256,
+                  seed: int = 0) -> bool:
+    """Check that the engine reproduces ``estimator.predict_proba`` exactly"""
+    rng = np.random.default_rng(seed)
+    shape = (n_samples, engine.n_features_in_)
+    # Mix continuous values, dummy-style 0/1 values and exact split thresholds
+    choice = rng.integers(0, 3, size=shape)
+    probe = np.where(choice == 0, rng.normal(scale=2.0, size=shape), rng.integers(0, 2, size=shape))
+    probe = np.where(choice == 2, rng.choice(engine.threshold, size=shape), probe)
+    return bool(np.array_equal(engine.predict_proba(probe), estimator.predict_proba(probe)))
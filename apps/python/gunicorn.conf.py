@@ -0,0 +1,114 @@
+"""
+Gunicorn production profile for the Ovarian Cyst Prediction API
+Loads the model once in the master and shares it with forked workers
+"""
+
+import gc
+import math
+import os
+import sys
+
+# The app module must expose load_model_and_data() and may expose
+# warm_up() and reinit_after_fork() (see api_server.py / enhanced_api_server.py)
+wsgi_app = os.environ.get('GUNICORN_APP', 'api_server:app')
+
+
+def available_cores() -> int:
+    """CPUs this process may actually use, honouring affinity and cgroup quotas"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+
+    quota = None
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            limit, period = f.read().split()
+        if limit != 'max':
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            # cgroup v1
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                limit = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+
+    if quota is not None:
+        cores = min(cores, max(1, math.ceil(quota)))
+    return max(1, cores)
+
+
+def default_workers() -> int:
+    """One worker per usable core (plus one to cover I/O waits), capped"""
+    max_workers = int(os.environ.get('GUNICORN_MAX_WORKERS', 16))
+    return max(2, min(available_cores() + 1, max_workers))
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+workers = int(os.environ.get('GUNICORN_WORKERS', 0)) or default_workers()
+
+# Threads let concurrent requests in one worker share a micro-batch
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import the app in the master so workers inherit the loaded model
+# copy-on-write instead of unpickling it and reading the CSVs themselves
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically; replacements fork from the loaded master and
+# switch to the bundle in models/CURRENT if it was promoted since the master loaded
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+
+def _app_module(server):
+    """Module that defines the WSGI app (imported in the master)"""
+    return sys.modules[server.app.wsgi().import_name]
+
+
+def _load_in_master(server):
+    module = _app_module(server)
+    gc.unfreeze()
+    if not module.load_model_and_data():
+        raise RuntimeError('Failed to load the model and data files')
+    # Warm the hot paths before forking, so every worker starts warm and ready
+    warm_up = getattr(module, 'warm_up', None)
+    if warm_up is not None and not warm_up():
+        server.log.warning('Warm-up failed; /ready will report 503')
+    # Move everything loaded so far out of the collector's reach, so GC
+    # passes in the workers don't write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    server.log.info('Model loaded in master (pid %s); %s frozen objects',
+                    os.getpid(), gc.get_freeze_count())
+
+
+def on_starting(server):
+    _load_in_master(server)
+
+
+def on_reload(server):
+    # SIGHUP: reload the current model bundle before the new workers fork,
+    # so every worker moves to a freshly trained version together
+    _load_in_master(server)
+
+
+def post_fork(server, worker):
+    # Threads, locks and queues don't survive fork(); give the worker its own,
+    # and move it off the master's model if a newer bundle has been promoted
+    reinit = getattr(_app_module(server), 'reinit_after_fork', None)
+    if reinit is not None:
+        reinit()
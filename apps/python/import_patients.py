@@ -0,0 +1,18 @@
+import argparse
+from patient_store import PATIENT_DB_PATH, import_csv
+import os
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Import patient records into the SQLite patient store')
+    parser.add_argument('csv_path', nargs='?', default='patient_data.csv',
+                        help='Patient CSV in the patient_data.csv layout (default: patient_data.csv)')
+    parser.add_argument('--db', default=os.environ.get('PATIENT_DB_PATH', PATIENT_DB_PATH),
+                        help='SQLite file to fill (default: PATIENT_DB_PATH or data/patients.sqlite3)')
+    args = parser.parse_args()
+
+    try:
+        rows = import_csv(args.csv_path, args.db)
+        print(f"Imported {rows} patients from {args.csv_path} into {args.db}")
+        print("Running servers pick up the new rows on their next request; no restart is needed.")
+    except Exception as e:
+        print(f"Error importing patients: {e}")
@@ -0,0 +1,123 @@
+"""
+Incremental model updates for the Ovarian Cyst Prediction API
+Grows or refits the serving forest on recent outcomes and gates promotion on holdout accuracy
+"""
+
+import copy
+import time
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+
+from feature_encoder import NUMERICAL_COLUMNS
+from model_search import build_estimator
+from model_store import ModelBundle, ModelRejected
+from ovarian_cyst_predictor import clean_target_labels
+
+INCREMENTAL_MODES = ('warm_start', 'window')
+
+DEFAULT_NEW_TREES = 50
+DEFAULT_WINDOW = 50000
+DEFAULT_HOLDOUT_FRACTION = 0.25
+DEFAULT_MIN_FEEDBACK = 10
+DEFAULT_MAX_ACCURACY_DROP = 0.0
+
+
+def encode_outcomes(bundle: ModelBundle, frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode patient rows with the bundle's own feature schema and scaler
+
+    Outcome labels are cleaned as in training; rows whose outcome is still
+    not one of the model's classes, or that lack a numeric field, are dropped.
+    """
+    frame = frame.copy()
+    frame['Recommended'] = clean_target_labels(frame['Recommended'].astype(str))
+    for col in NUMERICAL_COLUMNS:
+        frame[col] = pd.to_numeric(frame[col], errors='coerce')
+    usable = frame['Recommended'].isin(bundle.target_encoder.classes_) & frame[NUMERICAL_COLUMNS].notna().all(axis=1)
+    frame = frame[usable]
+    X = bundle.feature_encoder.encode_frame(frame)
+    y = bundle.target_encoder.transform(frame['Recommended'])
+    return X, y
+
+
+def incremental_update(bundle: ModelBundle, base: pd.DataFrame, feedback: pd.DataFrame,
+                       mode: str = 'warm_start', new_trees: int = DEFAULT_NEW_TREES,
+                       window: int = DEFAULT_WINDOW, holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION,
+                       min_feedback: int = DEFAULT_MIN_FEEDBACK,
+                       max_accuracy_drop: float = DEFAULT_MAX_ACCURACY_DROP) -> Dict[str, Any]:
+    """Build a candidate model from the latest outcomes and return its bundle artifacts
+
+    The newest ``holdout_fraction`` of the feedback is held out. Training
+    uses the last ``window`` rows of the base data followed by the rest of
+    the feedback:
+
+    - ``warm_start`` keeps every existing tree and adds ``new_trees`` trees
+      fitted on that window
+    - ``window`` refits a forest with the serving model's parameters on it
+
+    Raises ModelRejected when there is too little feedback, or when the
+    candidate's holdout accuracy falls more than ``max_accuracy_drop`` below
+    the serving model's.
+    """
+    if mode not in INCREMENTAL_MODES:
+        raise ValueError(f"Unknown incremental mode: {mode} (expected one of {', '.join(INCREMENTAL_MODES)})")
+    started = time.perf_counter()
+
+    X_feedback, y_feedback = encode_outcomes(bundle, feedback)
+    if len(y_feedback) < min_feedback:
+        raise ModelRejected(f"Need at least {min_feedback} usable outcomes, have {len(y_feedback)}",
+                            {'mode': mode, 'feedback_rows': int(len(y_feedback))})
+
+    n_holdout = max(1, int(round(len(y_feedback) * holdout_fraction)))
+    X_holdout, y_holdout = X_feedback[-n_holdout:], y_feedback[-n_holdout:]
+    X_base, y_base = encode_outcomes(bundle, base)
+    X_train = np.concatenate([X_base, X_feedback[:-n_holdout]])[-window:]
+    y_train = np.concatenate([y_base, y_feedback[:-n_holdout]])[-window:]
+
+    current = bundle.model
+    missing = set(current.classes_) - set(np.unique(y_train))
+    if missing:
+        raise ModelRejected("Training window lacks outcomes for: "
+                            + ', '.join(bundle.target_encoder.inverse_transform(sorted(missing))),
+                            {'mode': mode, 'train_rows': int(len(y_train))})
+
+    if mode == 'warm_start':
+        candidate = copy.deepcopy(current)
+        candidate.set_params(warm_start=True, n_jobs=-1,
+                             n_estimators=len(current.estimators_) + max(1, int(new_trees)))
+    else:
+        params = {key: value for key, value in current.get_params().items()
+                  if key in ('n_estimators', 'max_depth', 'min_samples_split', 'min_samples_leaf')}
+        candidate = build_estimator(n_jobs=-1, **params)
+    candidate.fit(X_train, y_train)
+    # Stored bundles load with the plain settings; warm_start only applied to this fit
+    candidate.set_params(warm_start=False, n_jobs=None)
+
+    current_accuracy = float(accuracy_score(y_holdout, current.predict(X_holdout)))
+    candidate_accuracy = float(accuracy_score(y_holdout, candidate.predict(X_holdout)))
+    evaluation = {
+        'mode': mode,
+        'feedback_rows': int(len(y_feedback)),
+        'train_rows': int(len(y_train)),
+        'holdout_rows': int(n_holdout),
+        'trees_before': len(current.estimators_),
+        'trees_after': len(candidate.estimators_),
+        'current_accuracy': round(current_accuracy, 4),
+        'candidate_accuracy': round(candidate_accuracy, 4),
+        'max_accuracy_drop': max_accuracy_drop,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+    print(f"🧪 Incremental {mode}: holdout accuracy {current_accuracy:.3f} -> {candidate_accuracy:.3f} "
+          f"({n_holdout} outcomes, {len(y_train)} training rows)")
+    if candidate_accuracy < current_accuracy - max_accuracy_drop:
+        raise ModelRejected("Candidate is less accurate than the serving model on recent outcomes", evaluation)
+
+    return {
+        'model': candidate,
+        'feature_columns': bundle.feature_columns,
+        'target_encoder': bundle.target_encoder,
+        'scaler': bundle.scaler,
+        'evaluation': evaluation
+    }
@@ -0,0 +1,154 @@
+"""
+Micro-batching inference scheduler for the Ovarian Cyst Prediction API
+Coalesces concurrent single-patient predictions into one model call
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+_STOP = object()
+
+
+class InferenceScheduler:
+    """Queues encoded feature rows and predicts them in small batches
+
+    A background thread takes the first queued job, keeps collecting jobs
+    until ``max_batch_size`` is reached or ``max_wait_ms`` has passed, then
+    stacks the rows into one matrix and calls ``predict_fn`` once. Every
+    caller gets back its own entry of the returned list. If the batch call
+    raises, each row is predicted on its own and only the failing callers
+    get the exception.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], List[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+        self._batches = 0
+        self._jobs = 0
+        self._errors = 0
+        self._last_batch_size = 0
+        self._max_batch_seen = 0
+        self._batch_sizes: Dict[int, int] = {}
+
+    def start(self):
+        """Start the batching thread if it is not already running"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name='inference-scheduler', daemon=True
+                )
+                self._worker.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop the batching thread after it drains the current batch"""
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.put(_STOP)
+            worker.join(timeout)
+        self._worker = None
+
+    def reset_after_fork(self):
+        """Give a freshly forked worker its own queue and lock
+
+        The batching thread does not survive ``fork()``, and a queue or lock
+        copied from the parent may be held by it. Jobs queued in the parent
+        are dropped; counters restart so metrics describe this process only.
+        """
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._batches = 0
+        self._jobs = 0
+        self._errors = 0
+        self._last_batch_size = 0
+        self._max_batch_seen = 0
+        self._batch_sizes = {}
+
+    def submit(self, row: np.ndarray, timeout: Optional[float] = 10.0) -> Any:
+        """Queue one encoded feature row and block until its result is ready"""
+        if self._worker is None or not self._worker.is_alive():
+            # Started lazily so forked server workers each get their own thread
+            self.start()
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=np.float64).ravel(), future))
+        return future.result(timeout=timeout)
+
+    def _collect(self, first) -> list:
+        """Gather jobs behind ``first`` until the batch is full or the deadline passes"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = self._collect(first)
+            try:
+                results = self.predict_fn(np.vstack([row for row, _ in batch]))
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+                failed = False
+            except Exception:
+                # Predict the rows one at a time, so a bad row only fails its own caller
+                self._run_each(batch)
+                failed = True
+
+            self._record(len(batch), failed)
+
+    def _run_each(self, batch: list):
+        for row, future in batch:
+            try:
+                future.set_result(self.predict_fn(row[np.newaxis, :])[0])
+            except Exception as e:
+                future.set_exception(e)
+
+    def _record(self, size: int, failed: bool):
+        with self._lock:
+            self._batches += 1
+            self._jobs += size
+            self._errors += int(failed)
+            self._last_batch_size = size
+            self._max_batch_seen = max(self._max_batch_seen, size)
+            self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and batch-size statistics"""
+        with self._lock:
+            return {
+                'running': self._worker is not None and self._worker.is_alive(),
+                'queue_depth': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'batches_run': self._batches,
+                'jobs_processed': self._jobs,
+                'failed_batches': self._errors,
+                'last_batch_size': self._last_batch_size,
+                'largest_batch': self._max_batch_seen,
+                'average_batch_size': round(self._jobs / self._batches, 2) if self._batches else 0.0,
+                'batch_size_histogram': {str(size): count for size, count in sorted(self._batch_sizes.items())}
+            }
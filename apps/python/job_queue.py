@@ -0,0 +1,259 @@
+"""
+Background job queue for the Ovarian Cyst Prediction API
+Runs long dataset jobs on a worker pool and persists their state to disk
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+JOBS_DIR = 'jobs'
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once a cancel has been requested"""
+
+
+class JobContext:
+    """Handle given to a running job for progress reports and cancel checks"""
+
+    def __init__(self, manager: 'JobManager', job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+        self.started = time.monotonic()
+
+    @property
+    def work_dir(self) -> str:
+        return self.manager.work_dir(self.job_id)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def update(self, **changes):
+        """Merge ``changes`` into the job record and persist it"""
+        self.manager._update(self.job_id, **changes)
+
+    def check_cancelled(self):
+        """Raise JobCancelled if a cancel was requested (from any process)"""
+        if self.manager.cancel_requested(self.job_id):
+            raise JobCancelled()
+
+
+class JobManager:
+    """Runs jobs on a thread pool and keeps one JSON state file per job
+
+    State files live in ``jobs_dir/<job_id>.json`` and are rewritten
+    atomically on every update, so any server process can report on any
+    job and the history survives a restart. Cancels are requested with a
+    marker file that the running job checks between units of work. Only the
+    ``keep`` most recently updated finished jobs are kept; older ones are
+    deleted with their work directories.
+    """
+
+    def __init__(self, jobs_dir: str = JOBS_DIR, max_workers: int = 2, keep: int = 200):
+        self.jobs_dir = jobs_dir
+        self.max_workers = max(1, int(max_workers))
+        self.keep = max(1, int(keep))
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._recovered = False
+
+    def _state_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f'{job_id}.json')
+
+    def _cancel_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f'{job_id}.cancel')
+
+    def work_dir(self, job_id: str) -> str:
+        """Scratch directory for a job's input files"""
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _persist(self, job: Dict[str, Any]):
+        path = self._state_path(job['job_id'])
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, default=str)
+        os.replace(tmp_path, path)
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._state_path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def recover(self):
+        """Mark jobs left queued or running by a previous server process as interrupted
+
+        Call once at startup, before any job is submitted. Later calls are no-ops.
+        """
+        with self._lock:
+            if self._recovered:
+                return
+            self._recovered = True
+        if not os.path.isdir(self.jobs_dir):
+            return
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith('.json'):
+                continue
+            job = self._read(name[:-len('.json')])
+            if job is not None and job.get('status') in ACTIVE_STATUSES:
+                job.update(status='interrupted', finished_at=datetime.now().isoformat(),
+                           error='Server restarted before the job finished')
+                self._persist(job)
+                self._remove_work_files(job['job_id'])
+        self.prune()
+
+    def create(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Register a queued job and create its work directory"""
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            'job_id': job_id,
+            'kind': kind,
+            'status': 'queued',
+            'params': params or {},
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'duration_seconds': None,
+            'progress': {},
+            'result': None,
+            'error': None
+        }
+        os.makedirs(self.work_dir(job_id), exist_ok=True)
+        with self._lock:
+            self._jobs[job_id] = job
+            self._persist(job)
+        return dict(job)
+
+    def run(self, job_id: str, fn: Callable[[JobContext], Dict[str, Any]]) -> Future:
+        """Queue ``fn(context)`` on the worker pool; its return value becomes the job result"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='job')
+            future = self._executor.submit(self._execute, job_id, fn)
+            self._futures[job_id] = future
+        return future
+
+    def _execute(self, job_id: str, fn: Callable[[JobContext], Dict[str, Any]]) -> Dict[str, Any]:
+        context = JobContext(self, job_id)
+        try:
+            context.check_cancelled()
+            self._update(job_id, status='running', started_at=datetime.now().isoformat())
+            result = fn(context)
+            outcome = {'status': 'succeeded', 'result': result}
+        except JobCancelled:
+            outcome = {'status': 'cancelled'}
+        except Exception as e:
+            traceback.print_exc()
+            outcome = {'status': 'failed', 'error': str(e)}
+
+        self._update(job_id, finished_at=datetime.now().isoformat(),
+                     duration_seconds=round(context.elapsed(), 3), **outcome)
+        with self._lock:
+            self._futures.pop(job_id, None)
+        if os.path.exists(self._cancel_path(job_id)):
+            os.remove(self._cancel_path(job_id))
+        self.prune()
+        return self.get(job_id)
+
+    def _remove_work_files(self, job_id: str):
+        """Delete a finished job's work directory (its uploaded input) and cancel marker"""
+        shutil.rmtree(self.work_dir(job_id), ignore_errors=True)
+        try:
+            os.remove(self._cancel_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def prune(self):
+        """Delete finished jobs beyond the ``keep`` most recently updated"""
+        try:
+            names = [name for name in os.listdir(self.jobs_dir) if name.endswith('.json')]
+        except FileNotFoundError:
+            return
+        paths = [os.path.join(self.jobs_dir, name) for name in names]
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except OSError:
+                pass
+        # Only files past the newest ``keep`` are read, to skip jobs that are still active
+        for path in sorted(mtimes, key=mtimes.get, reverse=True)[self.keep:]:
+            job_id = os.path.basename(path)[:-len('.json')]
+            job = self._read(job_id)
+            if job is None or job.get('status') in ACTIVE_STATUSES:
+                continue
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._remove_work_files(job_id)
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(changes)
+            self._persist(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job, from memory or from its state file"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return json.loads(json.dumps(job, default=str))
+        return self._read(job_id)
+
+    def list(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recently created jobs, newest first"""
+        if not os.path.isdir(self.jobs_dir):
+            return []
+        jobs = [self._read(name[:-len('.json')]) for name in os.listdir(self.jobs_dir)
+                if name.endswith('.json')]
+        jobs = [job for job in jobs if job is not None]
+        jobs.sort(key=lambda job: job.get('created_at') or '', reverse=True)
+        return jobs[:limit]
+
+    def cancel_requested(self, job_id: str) -> bool:
+        return os.path.exists(self._cancel_path(job_id))
+
+    def cancel(self, job_id: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Request a cancel; returns (job, accepted). Finished jobs are left untouched"""
+        job = self.get(job_id)
+        if job is None or job['status'] not in ACTIVE_STATUSES:
+            return job, False
+
+        with open(self._cancel_path(job_id), 'w', encoding='utf-8') as f:
+            f.write(datetime.now().isoformat())
+
+        # A job still waiting in this process's queue can be dropped right away
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self._update(job_id, status='cancelled', finished_at=datetime.now().isoformat())
+            with self._lock:
+                self._futures.pop(job_id, None)
+            # The job never ran, so nothing else removes its uploaded file
+            self._remove_work_files(job_id)
+            self.prune()
+        return self.get(job_id), True
+
+    def reset_after_fork(self):
+        """Drop the pool and lock inherited from the parent process"""
+        self._lock = threading.Lock()
+        self._executor = None
+        self._jobs = {}
+        self._futures = {}
@@ -0,0 +1,171 @@
+"""
+JSON encoding and decoding for the Ovarian Cyst Prediction API
+A Flask JSON provider backed by orjson (when installed) that understands numpy values and pre-serialized fragments
+"""
+
+import functools
+import json
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_PROVIDERS = ('auto', 'orjson', 'stdlib')
+
+
+class JSONFragment:
+    """A static value that is serialized once and then embedded verbatim
+
+    Meant for payloads such as the treatment protocols and the endpoint list;
+    the value must not change after the fragment is created. The stdlib
+    encoder splices the cached text in; orjson embeds the cached bytes as an
+    ``orjson.Fragment``, one per set of options (sorted keys, indentation).
+    """
+
+    def __init__(self, value: Any):
+        self.value = value
+        self._encoded: Optional[str] = None
+        self._orjson: Dict[int, Any] = {}
+
+    def encoded(self, provider: 'NumpyJSONProvider') -> str:
+        if self._encoded is None:
+            self._encoded = provider.dumps(self.value, separators=(',', ':'))
+        return self._encoded
+
+    def orjson_fragment(self, option: int) -> Any:
+        fragment = self._orjson.get(option)
+        if fragment is None:
+            fragment = orjson.Fragment(orjson.dumps(self.value, default=_orjson_default(option), option=option))
+            self._orjson[option] = fragment
+        return fragment
+
+
+def fragment_map(values: Dict[str, Any]) -> Dict[str, Any]:
+    """A fragment for every dict or list entry of a table such as TREATMENT_PROTOCOLS
+
+    Scalars are cheaper to encode than to splice, so they are kept as they are.
+    """
+    return {key: JSONFragment(value) if isinstance(value, (dict, list)) else value
+            for key, value in values.items()}
+
+
+def _default(o: Any) -> Any:
+    """numpy arrays and scalars as Python values, then Flask's conversions (dates, UUIDs, dataclasses)"""
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, np.generic):
+        return o.item()
+    return DefaultJSONProvider.default(o)
+
+
+@functools.lru_cache(maxsize=None)
+def _orjson_default(option: int) -> Callable[[Any], Any]:
+    """orjson ``default`` for one set of options; fragments are encoded with those same options"""
+    def default(o: Any) -> Any:
+        if isinstance(o, JSONFragment):
+            return o.orjson_fragment(option)
+        return _default(o)
+    return default
+
+
+class _Embedder:
+    """Replaces fragments with placeholder strings during one dumps call, then splices them in"""
+
+    # Random per process, so request data cannot forge a placeholder
+    prefix = f'__fragment_{uuid.uuid4().hex}_'
+
+    def __init__(self, provider: 'NumpyJSONProvider'):
+        self.provider = provider
+        self.fragments: List[JSONFragment] = []
+
+    def default(self, o: Any) -> Any:
+        if isinstance(o, JSONFragment):
+            self.fragments.append(o)
+            return f'{self.prefix}{len(self.fragments) - 1}'
+        return _default(o)
+
+    def splice(self, text: str) -> str:
+        for i, fragment in enumerate(self.fragments):
+            text = text.replace(f'"{self.prefix}{i}"', fragment.encoded(self.provider), 1)
+        return text
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Flask's default provider (stdlib json) plus numpy scalars and arrays and JSONFragment values"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        embedder = _Embedder(self)
+        kwargs.setdefault('default', embedder.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        text = json.dumps(obj, **kwargs)
+        return embedder.splice(text) if embedder.fragments else text
+
+
+class OrjsonProvider(NumpyJSONProvider):
+    """orjson encoder and decoder; output matches the stdlib provider's except that
+
+    - non-ASCII text is written as UTF-8 instead of ``\\u`` escapes
+    - NaN and infinite floats become ``null`` instead of the invalid ``NaN``
+    """
+
+    # Datetimes and dataclasses go through Flask's own conversion (HTTP dates) as before
+    options = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+               | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+    # Keyword arguments orjson can honour; anything else is handed to the stdlib encoder
+    supported_kwargs = frozenset(['indent', 'separators', 'sort_keys', 'ensure_ascii'])
+
+    def _encode(self, obj: Any, indent: Optional[int] = None, sort_keys: Optional[bool] = None) -> Optional[bytes]:
+        """orjson bytes for ``obj``, or None when it needs the stdlib encoder (e.g. integers over 64 bits)"""
+        option = self.options
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_orjson_default(option), option=option)
+        except orjson.JSONEncodeError:
+            return None
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs.keys() <= self.supported_kwargs:
+            data = self._encode(obj, kwargs.get('indent'), kwargs.get('sort_keys'))
+            if data is not None:
+                return data.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # The stdlib parser also accepts NaN/Infinity and reports the error otherwise
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        data = self._encode(obj, indent=2 if indent else None)
+        if data is None:
+            return super().response(obj)
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
+
+
+def json_provider_class(name: str = 'auto') -> type:
+    """Provider for JSON_PROVIDER: 'orjson', 'stdlib', or 'auto' (orjson when it is installed)"""
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Unknown JSON provider '{name}' (expected one of {', '.join(JSON_PROVIDERS)})")
+    if name == 'orjson' and orjson is None:
+        raise ValueError("The 'orjson' JSON provider requires the 'orjson' package")
+    if name == 'orjson' and not hasattr(orjson, 'Fragment'):
+        raise ValueError("The 'orjson' JSON provider requires orjson 3.10 or newer")
+    if name == 'stdlib' or orjson is None or not hasattr(orjson, 'Fragment'):
+        return NumpyJSONProvider
+    return OrjsonProvider
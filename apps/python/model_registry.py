@@ -0,0 +1,288 @@
+"""
+Multi-model registry for the Ovarian Cyst Prediction API
+Keeps several model bundles loaded, routes requests between them and tracks latency and agreement
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from forest_engine import FlattenedForest
+
+PRIMARY_MODEL = 'primary'
+ROUTE_HEADER = 'X-Model'
+
+
+def parse_model_list(value: str) -> Dict[str, str]:
+    """Parse ``name=value,name=value`` settings (e.g. MODEL_CANDIDATES, MODEL_ROUTING_SPLIT)"""
+    entries = {}
+    for item in (value or '').split(','):
+        if '=' in item:
+            name, setting = item.split('=', 1)
+            if name.strip() and setting.strip():
+                entries[name.strip()] = setting.strip()
+    return entries
+
+
+def estimate_model_bytes(engine: Any) -> int:
+    """Bytes held by the arrays of a flattened forest or a fitted sklearn tree model"""
+    describe = getattr(engine, 'describe', None)
+    if callable(describe) and 'bytes' in describe():
+        return int(describe()['bytes'])
+    trees = [est.tree_ for est in getattr(engine, 'estimators_', [])]
+    if not trees and hasattr(engine, 'tree_'):
+        trees = [engine.tree_]
+    total = 0
+    for tree in trees:
+        state = tree.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return int(total)
+
+
+class LatencyStats:
+    """Call count and a window of recent per-call latencies"""
+
+    def __init__(self, window: int = 1000):
+        self.samples = deque(maxlen=window)
+        self.calls = 0
+        self.rows = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, rows: int):
+        with self._lock:
+            self.samples.append(seconds)
+            self.calls += 1
+            self.rows += rows
+            self.total_seconds += seconds
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = np.array(self.samples) * 1000.0 if self.samples else np.zeros(1)
+        return {
+            'calls': self.calls,
+            'rows': self.rows,
+            'errors': self.errors,
+            'mean_ms_per_row': round(self.total_seconds * 1000.0 / self.rows, 4) if self.rows else 0.0,
+            'p50_ms': round(float(np.percentile(recent, 50)), 3),
+            'p95_ms': round(float(np.percentile(recent, 95)), 3),
+            'max_ms': round(float(recent.max()), 3)
+        }
+
+
+class RegisteredModel:
+    """One loaded bundle with its inference engine and counters"""
+
+    def __init__(self, name: str, bundle: Any, engine: Any):
+        self.name = name
+        self.bundle = bundle
+        self.engine = engine
+        self.version = bundle.version
+        self.class_names = bundle.target_encoder.classes_[engine.classes_]
+        self.memory_bytes = estimate_model_bytes(engine)
+        self.latency = LatencyStats()
+        # Shadow comparisons against whichever model actually served the request
+        self.shadow_compared = 0
+        self.shadow_agreed = 0
+        self._explainer = engine if isinstance(engine, FlattenedForest) else None
+
+    @property
+    def explainer(self) -> FlattenedForest:
+        """Flattened copy of the model used for tree-path explanations (built on first use)"""
+        if self._explainer is None:
+            self._explainer = FlattenedForest(self.bundle.model)
+        return self._explainer
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        started = time.perf_counter()
+        try:
+            probabilities = self.engine.predict_proba(features)
+        except Exception:
+            self.latency.record_error()
+            raise
+        self.latency.record(time.perf_counter() - started, len(features))
+        return probabilities
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'version': self.version,
+            'model_type': type(self.bundle.model).__name__,
+            'engine': type(self.engine).__name__,
+            'memory_bytes': self.memory_bytes,
+            'latency': self.latency.summary(),
+            'shadow': {
+                'compared': self.shadow_compared,
+                'agreed': self.shadow_agreed,
+                'agreement_rate': round(self.shadow_agreed / self.shadow_compared, 4) if self.shadow_compared else None
+            }
+        }
+
+
+class ModelRegistry:
+    """Named models sharing one feature encoding, with header, split and shadow routing
+
+    A request names its model with the ``X-Model`` header; otherwise it is
+    sent to a candidate with the probability given in ``split`` (percent),
+    and to the primary model for the remainder. Models listed in ``shadow``
+    score every request again on a background thread; their output is only
+    compared and logged, never returned.
+    """
+
+    def __init__(self, split: Optional[Dict[str, float]] = None, shadow: Optional[List[str]] = None,
+                 shadow_log_path: Optional[str] = None, max_shadow_pending: int = 256):
+        self.split = dict(split or {})
+        self.shadow = list(shadow or [])
+        self.shadow_log_path = shadow_log_path
+        self.max_shadow_pending = max(1, int(max_shadow_pending))
+        self._models: Dict[str, RegisteredModel] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._shadow_pending = 0
+        self.shadow_dropped = 0
+        self.recent_shadow = deque(maxlen=100)
+
+    def set_primary(self, bundle: Any, engine: Any) -> RegisteredModel:
+        """Install (or replace) the primary model"""
+        entry = RegisteredModel(PRIMARY_MODEL, bundle, engine)
+        with self._lock:
+            self._models[PRIMARY_MODEL] = entry
+        return entry
+
+    def register(self, name: str, bundle: Any, engine: Any) -> RegisteredModel:
+        """Add a candidate model; it must encode features exactly like the primary"""
+        primary = self.get(PRIMARY_MODEL)
+        if primary is None:
+            raise ValueError("Register the primary model first")
+        if list(bundle.feature_columns) != list(primary.bundle.feature_columns):
+            raise ValueError(f"Model '{name}' uses a different feature schema than the primary model")
+        if not (np.allclose(bundle.scaler.mean_, primary.bundle.scaler.mean_)
+                and np.allclose(bundle.scaler.scale_, primary.bundle.scaler.scale_)):
+            raise ValueError(f"Model '{name}' was trained with a different scaler than the primary model")
+        entry = RegisteredModel(name, bundle, engine)
+        with self._lock:
+            self._models[name] = entry
+        return entry
+
+    def get(self, name: str) -> Optional[RegisteredModel]:
+        with self._lock:
+            return self._models.get(name)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._models)
+
+    def choose(self, requested: Optional[str] = None) -> RegisteredModel:
+        """Model for one request: the requested name, then the percentage split, then the primary"""
+        with self._lock:
+            if requested and requested in self._models:
+                return self._models[requested]
+            draw = random.random() * 100.0
+            for name, percent in self.split.items():
+                entry = self._models.get(name)
+                if entry is None:
+                    continue
+                if draw < percent:
+                    return entry
+                draw -= percent
+            return self._models[PRIMARY_MODEL]
+
+    def submit_shadow(self, served: RegisteredModel, features: np.ndarray, predictions: List[str]):
+        """Score ``features`` with every shadow model in the background and compare to ``predictions``"""
+        targets = [entry for entry in (self.get(name) for name in self.shadow)
+                   if entry is not None and entry is not served]
+        if not targets:
+            return
+        with self._lock:
+            if self._shadow_pending >= self.max_shadow_pending:
+                self.shadow_dropped += 1
+                return
+            self._shadow_pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+            executor = self._executor
+        executor.submit(self._run_shadow, served.name, targets, np.array(features), list(predictions))
+
+    def _run_shadow(self, served_name: str, targets: List[RegisteredModel], features: np.ndarray,
+                    predictions: List[str]):
+        try:
+            for entry in targets:
+                try:
+                    probabilities = entry.predict_proba(features)
+                except Exception as e:
+                    print(f"⚠️ Shadow model {entry.name} failed: {e}")
+                    continue
+                shadow_predictions = [str(entry.class_names[i]) for i in probabilities.argmax(axis=1)]
+                agreed = sum(a == b for a, b in zip(shadow_predictions, predictions))
+                with self._lock:
+                    entry.shadow_compared += len(predictions)
+                    entry.shadow_agreed += agreed
+                self._log_shadow({
+                    'timestamp': datetime.now().isoformat(),
+                    'served_by': served_name,
+                    'shadow_model': entry.name,
+                    'shadow_version': entry.version,
+                    'served_predictions': predictions,
+                    'shadow_predictions': shadow_predictions,
+                    'agreed': agreed
+                })
+        finally:
+            with self._lock:
+                self._shadow_pending -= 1
+
+    def _log_shadow(self, record: Dict[str, Any]):
+        self.recent_shadow.append(record)
+        if self.shadow_log_path:
+            os.makedirs(os.path.dirname(self.shadow_log_path) or '.', exist_ok=True)
+            with open(self.shadow_log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-model latency, memory and shadow agreement plus the routing setup"""
+        with self._lock:
+            models = list(self._models.values())
+            pending = self._shadow_pending
+        return {
+            'models': [entry.describe() for entry in models],
+            'routing': {
+                'header': ROUTE_HEADER,
+                'split_percent': self.split,
+                'shadow': self.shadow
+            },
+            'shadow_queue': {'pending': pending, 'dropped': self.shadow_dropped}
+        }
+
+    def wait_for_shadow(self, timeout: float = 5.0):
+        """Block until queued shadow scoring has finished (used by tests and shutdown)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._shadow_pending == 0:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def reset_after_fork(self):
+        """Drop the shadow thread and lock inherited from the parent process; keep the models"""
+        self._lock = threading.Lock()
+        self._executor = None
+        self._shadow_pending = 0
+        self.shadow_dropped = 0
+        self.recent_shadow = deque(maxlen=100)
+        for entry in self._models.values():
+            entry.latency = LatencyStats()
+            entry.shadow_compared = 0
+            entry.shadow_agreed = 0
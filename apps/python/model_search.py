@@ -0,0 +1,267 @@
+"""
+Hyperparameter search for the ovarian cyst treatment model
+Exhaustive grid, successive halving or randomized search under a wall-clock or CPU budget
+"""
+
+import math
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV, ParameterGrid, ParameterSampler, StratifiedKFold
+
+SEARCH_MODES = ('grid', 'halving', 'random')
+
+# Exhaustive grid: 3 x 3 x 3 x 3 = 81 candidates
+PARAM_GRID = {
+    'n_estimators': [100, 150, 200],
+    'max_depth': [None, 10, 20],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4]
+}
+
+# Ranges sampled by the randomized search (a superset of the grid)
+PARAM_DISTRIBUTIONS = {
+    'n_estimators': list(range(50, 301, 25)),
+    'max_depth': [None, 5, 10, 15, 20, 30],
+    'min_samples_split': list(range(2, 11)),
+    'min_samples_leaf': list(range(1, 5))
+}
+
+# Defaults for train_and_evaluate, overridable per deployment
+TRAINING_SEARCH = os.environ.get('TRAINING_SEARCH', 'grid').lower()
+TRAINING_TIME_BUDGET = float(os.environ['TRAINING_TIME_BUDGET']) if os.environ.get('TRAINING_TIME_BUDGET') else None
+TRAINING_BUDGET_CLOCK = os.environ.get('TRAINING_BUDGET_CLOCK', 'wall').lower()
+TRAINING_RANDOM_CANDIDATES = int(os.environ.get('TRAINING_RANDOM_CANDIDATES', 60))
+
+HALVING_FACTOR = 3
+CV_FOLDS = 3
+RANDOM_STATE = 42
+
+
+def build_estimator(**params) -> RandomForestClassifier:
+    """Forest with the fixed settings shared by every search mode"""
+    return RandomForestClassifier(random_state=RANDOM_STATE, class_weight='balanced', **params)
+
+
+class SearchBudget:
+    """Wall-clock or CPU-time allowance for a search; ``None`` seconds means unlimited
+
+    CPU time is this process's time across all threads, which covers the
+    forest's own tree-building threads.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, clock: str = 'wall'):
+        if clock not in ('wall', 'cpu'):
+            raise ValueError(f"Unknown budget clock: {clock}")
+        self.seconds = seconds
+        self.clock = clock
+        self._now = time.process_time if clock == 'cpu' else time.perf_counter
+        self._started = self._now()
+
+    def elapsed(self) -> float:
+        return self._now() - self._started
+
+    def exhausted(self) -> bool:
+        return self.seconds is not None and self.elapsed() >= self.seconds
+
+
+class CachedFolds:
+    """Training matrix encoded once as contiguous float32 plus fixed CV splits
+
+    The forest converts its input to float32 on every fit; doing it once here
+    means each candidate and fold only slices ready-made arrays. Each fold's
+    training rows are also kept in a class-interleaved order, so any prefix
+    is a stratified subsample (used as the resource in successive halving).
+    """
+
+    def __init__(self, X: Any, y: Any, n_splits: int = CV_FOLDS):
+        self.X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        self.y = np.asarray(y)
+        splitter = StratifiedKFold(n_splits=n_splits)
+        self.splits = [(self._interleave(train), test) for train, test in splitter.split(self.X, self.y)]
+        self.n_classes = len(np.unique(self.y))
+
+    def _interleave(self, indices: np.ndarray) -> np.ndarray:
+        """Order rows so every class appears in proportion along the array"""
+        labels = self.y[indices]
+        position = np.zeros(len(indices))
+        for label in np.unique(labels):
+            members = np.flatnonzero(labels == label)
+            position[members] = (np.arange(len(members)) + 0.5) / len(members)
+        return indices[np.argsort(position, kind='stable')]
+
+    @property
+    def max_resources(self) -> int:
+        """Training rows in the smallest fold"""
+        return min(len(train) for train, _ in self.splits)
+
+    def score(self, params: Dict[str, Any], n_samples: Optional[int] = None) -> float:
+        """Mean CV accuracy of a candidate trained on the first ``n_samples`` rows of each fold"""
+        scores = []
+        for train, test in self.splits:
+            rows = train if n_samples is None else train[:n_samples]
+            model = build_estimator(n_jobs=-1, **params).fit(self.X[rows], self.y[rows])
+            scores.append(accuracy_score(self.y[test], model.predict(self.X[test])))
+        return float(np.mean(scores))
+
+
+class SearchResult:
+    """Best parameters of a search and what it cost
+
+    ``best_estimator`` is set when the search already fitted the winner on
+    all the training data (grid mode refits it), so it need not be fitted again.
+    """
+
+    def __init__(self, mode: str, best_params: Dict[str, Any], best_score: float,
+                 evaluated: int, seconds: float, budget_exhausted: bool = False,
+                 history: Optional[List[Dict[str, Any]]] = None,
+                 best_estimator: Optional[RandomForestClassifier] = None):
+        self.mode = mode
+        self.best_params = best_params
+        self.best_score = best_score
+        self.evaluated = evaluated
+        self.seconds = seconds
+        self.budget_exhausted = budget_exhausted
+        self.history = history or []
+        self.best_estimator = best_estimator
+
+    def fit_best(self, X: Any, y: Any) -> RandomForestClassifier:
+        """The winning forest fitted on ``X``/``y``, reusing the search's refit when there is one"""
+        if self.best_estimator is not None:
+            return self.best_estimator
+        return build_estimator(**self.best_params).fit(X, y)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'best_params': self.best_params,
+            'cv_accuracy': round(self.best_score, 4),
+            'evaluated': self.evaluated,
+            'seconds': round(self.seconds, 2),
+            'budget_exhausted': self.budget_exhausted
+        }
+
+
+def grid_search(X: Any, y: Any) -> SearchResult:
+    """Exhaustive GridSearchCV over PARAM_GRID (ignores any budget)"""
+    started = time.perf_counter()
+    search = GridSearchCV(estimator=build_estimator(), param_grid=PARAM_GRID,
+                          cv=CV_FOLDS, n_jobs=-1, scoring='accuracy')
+    search.fit(X, y)
+    return SearchResult('grid', search.best_params_, float(search.best_score_),
+                        len(search.cv_results_['params']), time.perf_counter() - started,
+                        best_estimator=search.best_estimator_)
+
+
+def _rank(scored: Iterable[Tuple[float, int, Dict[str, Any]]]) -> List[Tuple[float, int, Dict[str, Any]]]:
+    """Best score first; ties keep the original candidate order"""
+    return sorted(scored, key=lambda entry: (-entry[0], entry[1]))
+
+
+def halving_search(folds: CachedFolds, budget: SearchBudget,
+                   candidates: Optional[List[Dict[str, Any]]] = None,
+                   factor: int = HALVING_FACTOR) -> SearchResult:
+    """Successive halving over training rows: score many candidates on few rows,
+    keep the best 1/``factor`` and give the survivors ``factor`` times more rows
+
+    When the budget runs out mid-rung, the best candidate scored so far in
+    the furthest rung wins.
+    """
+    started = time.perf_counter()
+    candidates = list(ParameterGrid(PARAM_GRID)) if candidates is None else candidates
+    # Enough rungs that the last one scores at most ``factor`` candidates on all rows
+    n_rungs = 1
+    while factor ** n_rungs < len(candidates):
+        n_rungs += 1
+    max_resources = folds.max_resources
+    min_resources = min(max_resources, folds.n_classes * 2)
+
+    survivors = list(enumerate(candidates))
+    best: Optional[Tuple[float, int, Dict[str, Any]]] = None
+    history = []
+    evaluated = 0
+    exhausted = False
+    for rung in range(n_rungs):
+        n_samples = max(min_resources, max_resources // factor ** (n_rungs - 1 - rung))
+        scored = []
+        for index, params in survivors:
+            if budget.exhausted():
+                exhausted = True
+                break
+            scored.append((folds.score(params, n_samples), index, params))
+            evaluated += 1
+        if not scored:
+            break
+        ranked = _rank(scored)
+        best = ranked[0]
+        history.append({'rung': rung, 'n_samples': n_samples, 'candidates': len(scored),
+                        'best_cv_accuracy': round(best[0], 4)})
+        if exhausted or len(ranked) == 1:
+            break
+        survivors = [(index, params) for _, index, params in ranked[:max(1, math.ceil(len(ranked) / factor))]]
+
+    if best is None:
+        # Not even one candidate fitted in the budget; fall back to the first
+        best = (float('nan'), 0, candidates[0])
+    return SearchResult('halving', best[2], best[0], evaluated, time.perf_counter() - started,
+                        exhausted, history)
+
+
+def random_search(folds: CachedFolds, budget: SearchBudget,
+                  n_candidates: int = TRAINING_RANDOM_CANDIDATES) -> SearchResult:
+    """Score randomly sampled candidates on the full folds until the budget or the sample runs out"""
+    started = time.perf_counter()
+    candidates = list(ParameterSampler(PARAM_DISTRIBUTIONS, n_iter=n_candidates, random_state=RANDOM_STATE))
+    scored = []
+    exhausted = False
+    for index, params in enumerate(candidates):
+        if budget.exhausted():
+            exhausted = True
+            break
+        scored.append((folds.score(params), index, params))
+
+    best = _rank(scored)[0] if scored else (float('nan'), 0, candidates[0])
+    return SearchResult('random', best[2], best[0], len(scored), time.perf_counter() - started, exhausted)
+
+
+def run_search(mode: str, X: Any, y: Any, time_budget: Optional[float] = None,
+               budget_clock: str = 'wall', folds: Optional[CachedFolds] = None) -> SearchResult:
+    """Pick hyperparameters with the given search mode"""
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode} (expected one of {', '.join(SEARCH_MODES)})")
+    if mode == 'grid':
+        return grid_search(X, y)
+
+    budget = SearchBudget(time_budget, budget_clock)
+    folds = folds if folds is not None else CachedFolds(X, y)
+    if mode == 'halving':
+        return halving_search(folds, budget)
+    return random_search(folds, budget)
+
+
+def compare_search_modes(X_train: Any, y_train: Any, X_test: Any, y_test: Any,
+                         time_budget: Optional[float] = None, budget_clock: str = 'wall',
+                         modes: Iterable[str] = SEARCH_MODES) -> List[Dict[str, Any]]:
+    """Run each search mode, refit its winner and report accuracy against search time
+
+    The encoded folds are built once and shared by the budgeted modes.
+    """
+    folds = CachedFolds(X_train, y_train)
+    rows = []
+    for mode in modes:
+        result = run_search(mode, X_train, y_train, time_budget, budget_clock, folds)
+        model = result.fit_best(X_train, y_train)
+        row = result.to_dict()
+        row['test_accuracy'] = round(float(accuracy_score(y_test, model.predict(X_test))), 4)
+        rows.append(row)
+
+    print("\n--- Search Mode Comparison ---")
+    print(f"{'mode':<8} {'evaluated':>9} {'seconds':>9} {'cv acc':>7} {'test acc':>8}  best parameters")
+    for row in rows:
+        print(f"{row['mode']:<8} {row['evaluated']:>9} {row['seconds']:>9.2f} "
+              f"{row['cv_accuracy']:>7.3f} {row['test_accuracy']:>8.3f}  {row['best_params']}")
+    return rows
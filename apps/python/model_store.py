@@ -0,0 +1,519 @@
+"""
+Versioned model bundles and background training for the Ovarian Cyst Prediction API
+Retrains into a new bundle directory and swaps it in without touching the serving model
+
+A bundle is a directory holding ``manifest.json`` and ``model.joblib``. The
+manifest records the content hash (which is also the version ID), the
+training-data hash, the feature schema, the class list and the scaler
+parameters, so the target encoder and scaler are rebuilt from it instead of
+being pickled separately.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from feature_encoder import FeatureEncoder, NUMERICAL_COLUMNS
+
+BUNDLE_FORMAT = 1
+MANIFEST_FILE = 'manifest.json'
+MODEL_FILE = 'model.joblib'
+MODELS_DIR = 'models'
+CURRENT_POINTER = 'CURRENT'
+TRAINING_JOBS_DIR = os.path.join('jobs', 'training')
+ACTIVE_JOB_MARKER = 'ACTIVE'
+
+# Separate pickles written by older versions of train_model.py
+LEGACY_ARTIFACT_FILES = {
+    'model': 'trained_model.pkl',
+    'feature_columns': 'feature_columns.pkl',
+    'target_encoder': 'target_encoder.pkl',
+    'scaler': 'scaler.pkl'
+}
+
+
+class BundleVerificationError(Exception):
+    """Raised when a bundle's files do not match its manifest"""
+
+
+class ModelRejected(Exception):
+    """Raised by a training function when its candidate must not be promoted"""
+
+    def __init__(self, message: str, evaluation: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.evaluation = evaluation
+
+
+class ModelBundle:
+    """Immutable set of artifacts that serve predictions together
+
+    Request handlers read the active bundle once and use only that object,
+    so a swap never mixes a new model with an old encoder or scaler.
+    """
+
+    __slots__ = ('version', 'path', 'model', 'feature_columns', 'target_encoder',
+                 'scaler', 'feature_encoder', 'manifest', 'loaded_at')
+
+    def __init__(self, version: str, path: str, model: Any, feature_columns: Any,
+                 target_encoder: Any, scaler: Any, manifest: Optional[Dict[str, Any]] = None):
+        values = {
+            'version': version,
+            'path': path,
+            'model': model,
+            'feature_columns': feature_columns,
+            'target_encoder': target_encoder,
+            'scaler': scaler,
+            'feature_encoder': FeatureEncoder(feature_columns, scaler),
+            'manifest': manifest,
+            'loaded_at': datetime.now().isoformat()
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ModelBundle is immutable; build a new bundle instead")
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _content_hash(schema: Dict[str, Any], model_sha256: str) -> str:
+    """Hash identifying a bundle: the model file plus its canonical schema"""
+    digest = hashlib.sha256(model_sha256.encode('utf-8'))
+    digest.update(json.dumps(schema, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _build_schema(model: Any, feature_columns: Any, target_encoder: Any, scaler: Any) -> Dict[str, Any]:
+    """Feature schema, class list and scaler parameters stored in the manifest"""
+    return {
+        'feature_columns': [str(col) for col in feature_columns],
+        'classes': [str(cls) for cls in target_encoder.classes_],
+        'model_classes': [int(cls) for cls in model.classes_],
+        'scaler': {
+            'columns': [str(col) for col in getattr(scaler, 'feature_names_in_', NUMERICAL_COLUMNS)],
+            'mean': [float(v) for v in scaler.mean_],
+            'scale': [float(v) for v in scaler.scale_],
+            'var': [float(v) for v in scaler.var_],
+            'n_samples_seen': int(np.max(scaler.n_samples_seen_))
+        }
+    }
+
+
+def _rebuild_preprocessing(schema: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    """Recreate the feature columns, target encoder and scaler from a schema"""
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+    feature_columns = list(schema['feature_columns'])
+
+    target_encoder = LabelEncoder()
+    target_encoder.classes_ = np.array(schema['classes'], dtype=object)
+
+    params = schema['scaler']
+    scaler = StandardScaler()
+    scaler.mean_ = np.array(params['mean'], dtype=np.float64)
+    scaler.scale_ = np.array(params['scale'], dtype=np.float64)
+    scaler.var_ = np.array(params['var'], dtype=np.float64)
+    scaler.n_samples_seen_ = params['n_samples_seen']
+    scaler.n_features_in_ = len(params['columns'])
+    scaler.feature_names_in_ = np.array(params['columns'], dtype=object)
+
+    return feature_columns, target_encoder, scaler
+
+
+def write_bundle(artifacts: Dict[str, Any], models_dir: str = MODELS_DIR,
+                 training_data_path: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """Write a bundle to ``models_dir/<version>`` and return its path and manifest
+
+    The bundle is staged in a hidden directory and published with a single
+    rename, so a reader never sees a half-written version.
+    """
+    # Imported here so that importing this module does not load joblib
+    import joblib
+
+    model = artifacts['model']
+    schema = _build_schema(model, artifacts['feature_columns'], artifacts['target_encoder'], artifacts['scaler'])
+
+    os.makedirs(models_dir, exist_ok=True)
+    staging_path = os.path.join(models_dir, f'.staging-{uuid.uuid4().hex[:8]}')
+    os.makedirs(staging_path)
+    try:
+        model_path = os.path.join(staging_path, MODEL_FILE)
+        # Uncompressed so the tree arrays can be memory-mapped on load
+        joblib.dump(model, model_path)
+        model_sha256 = file_sha256(model_path)
+        content_hash = _content_hash(schema, model_sha256)
+        version = content_hash[:12]
+
+        manifest = {
+            'format': BUNDLE_FORMAT,
+            'version': version,
+            'content_hash': content_hash,
+            'created_at': datetime.now().isoformat(),
+            'training_data_hash': file_sha256(training_data_path) if training_data_path else None,
+            'model_type': type(model).__name__,
+            'model_params': {
+                key: value for key, value in model.get_params().items()
+                if isinstance(value, (int, float, str, bool, type(None)))
+            },
+            'files': {
+                MODEL_FILE: {'sha256': model_sha256, 'bytes': os.path.getsize(model_path)}
+            },
+            'schema': schema
+        }
+        with open(os.path.join(staging_path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        final_path = os.path.join(models_dir, version)
+        if os.path.isdir(final_path):
+            # Identical content is already published
+            shutil.rmtree(staging_path)
+        else:
+            os.rename(staging_path, final_path)
+    except Exception:
+        shutil.rmtree(staging_path, ignore_errors=True)
+        raise
+    return final_path, manifest
+
+
+def read_manifest(path: str) -> Optional[Dict[str, Any]]:
+    """Manifest of the bundle in ``path``, or None if it is not a bundle"""
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def verify_bundle(path: str, manifest: Dict[str, Any]):
+    """Check file hashes and the content hash against the manifest"""
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise BundleVerificationError(f"Unsupported bundle format: {manifest.get('format')}")
+    for filename, expected in manifest['files'].items():
+        file_path = os.path.join(path, filename)
+        if not os.path.exists(file_path):
+            raise BundleVerificationError(f"Bundle file missing: {filename}")
+        if file_sha256(file_path) != expected['sha256']:
+            raise BundleVerificationError(f"Checksum mismatch for {filename}")
+    if _content_hash(manifest['schema'], manifest['files'][MODEL_FILE]['sha256']) != manifest['content_hash']:
+        raise BundleVerificationError("Content hash does not match manifest")
+
+
+def load_bundle(path: str, version: Optional[str] = None, verify: bool = True,
+                mmap: bool = True) -> ModelBundle:
+    """Load the bundle in ``path`` (or the legacy pickles if it has no manifest)"""
+    manifest = read_manifest(path)
+    if manifest is None:
+        return _load_legacy_bundle(path, version)
+
+    import joblib
+
+    if verify:
+        verify_bundle(path, manifest)
+    model = joblib.load(os.path.join(path, MODEL_FILE), mmap_mode='r' if mmap else None)
+    feature_columns, target_encoder, scaler = _rebuild_preprocessing(manifest['schema'])
+
+    if getattr(model, 'n_features_in_', len(feature_columns)) != len(feature_columns):
+        raise BundleVerificationError("Model feature count does not match the bundle schema")
+    if [int(cls) for cls in model.classes_] != manifest['schema']['model_classes']:
+        raise BundleVerificationError("Model classes do not match the bundle schema")
+
+    return ModelBundle(manifest['version'], path, model, feature_columns, target_encoder, scaler, manifest)
+
+
+def _load_legacy_bundle(path: str, version: Optional[str] = None) -> ModelBundle:
+    """Load the four separate pickles; the version is a hash of their contents"""
+    import joblib
+
+    file_paths = {name: os.path.join(path, filename) for name, filename in LEGACY_ARTIFACT_FILES.items()}
+    if version is None:
+        digest = hashlib.sha256()
+        for file_path in file_paths.values():
+            digest.update(file_sha256(file_path).encode('utf-8'))
+        version = digest.hexdigest()[:12]
+    artifacts = {name: joblib.load(file_path) for name, file_path in file_paths.items()}
+    return ModelBundle(version, path, **artifacts)
+
+
+def legacy_files_missing(path: str = '.'):
+    """Legacy pickle files that are not present in ``path``"""
+    return [filename for filename in LEGACY_ARTIFACT_FILES.values()
+            if not os.path.exists(os.path.join(path, filename))]
+
+
+def resolve_current_bundle(base_dir: str = '.', models_dir: str = MODELS_DIR) -> Tuple[str, Optional[str]]:
+    """Directory and version of the active bundle
+
+    Uses the version named in ``models/CURRENT``. Falls back to the legacy
+    pickles in ``base_dir`` when no bundle has been promoted yet, in which
+    case the version is derived when the pickles are loaded.
+    """
+    pointer = os.path.join(models_dir, CURRENT_POINTER)
+    if os.path.exists(pointer):
+        with open(pointer, 'r', encoding='utf-8') as f:
+            version = f.read().strip()
+        path = os.path.join(models_dir, version)
+        if version and os.path.isdir(path):
+            return path, version
+    return base_dir, None
+
+
+def set_current_version(models_dir: str, version: str):
+    """Atomically point ``models/CURRENT`` at ``version``"""
+    pointer = os.path.join(models_dir, CURRENT_POINTER)
+    staging = f'{pointer}.{uuid.uuid4().hex[:8]}'
+    with open(staging, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(staging, pointer)
+
+
+class TrainingJobManager:
+    """Runs model training in a background thread, one job at a time across all server processes
+
+    ``train_fn`` returns a dict with ``model``, ``feature_columns``,
+    ``target_encoder`` and ``scaler`` (plus an optional ``evaluation``
+    summary kept on the job). When it finishes, the artifacts are written
+    as a new bundle, loaded back and handed to ``on_complete``, which swaps
+    the serving reference, and ``models/CURRENT`` is pointed at it so the
+    other processes switch too (see CurrentBundleWatcher). A ``train_fn``
+    that raises ModelRejected ends the job as ``rejected`` and leaves the
+    serving model in place.
+
+    Job records are kept in ``jobs_dir/<job_id>.json`` like JobManager's, so
+    any process can report on any job. The running job is named in
+    ``jobs_dir/ACTIVE``, created exclusively so two processes cannot both
+    start one; a marker left by a process that died is taken over.
+    """
+
+    def __init__(self, train_fn: Callable[[], Dict[str, Any]],
+                 on_complete: Callable[[ModelBundle], None],
+                 models_dir: str = MODELS_DIR,
+                 training_data_path: Optional[str] = 'patient_data.csv',
+                 jobs_dir: str = TRAINING_JOBS_DIR):
+        self.train_fn = train_fn
+        self.on_complete = on_complete
+        self.models_dir = models_dir
+        self.training_data_path = training_data_path
+        self.jobs_dir = jobs_dir
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _state_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f'{job_id}.json')
+
+    @property
+    def _marker_path(self) -> str:
+        return os.path.join(self.jobs_dir, ACTIVE_JOB_MARKER)
+
+    def _persist(self, job: Dict[str, Any]):
+        path = self._state_path(job['job_id'])
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, default=str)
+        os.replace(tmp_path, path)
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._state_path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _claim(self, job_id: str) -> Optional[str]:
+        """Create the ACTIVE marker for ``job_id``; returns the running job's ID if another holds it"""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(self._marker_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(self._marker_path, encoding='utf-8') as f:
+                        active_id = f.read().strip()
+                except OSError:
+                    continue
+                active = self._read(active_id)
+                if active is not None and active['status'] in ('queued', 'running') and _process_alive(active.get('pid')):
+                    return active_id
+                # The process running it died, so its job can no longer finish
+                if active is not None and active['status'] in ('queued', 'running'):
+                    active.update(status='interrupted', finished_at=datetime.now().isoformat(),
+                                  error='Server process exited before the job finished')
+                    self._persist(active)
+                try:
+                    os.remove(self._marker_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(job_id)
+            return None
+        raise RuntimeError('Could not claim the training job marker')
+
+    def start(self, **train_kwargs) -> Tuple[Dict[str, Any], bool]:
+        """Start a training job, or return the running one (second value False)
+
+        ``train_kwargs`` are passed on to ``train_fn``.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            job = {
+                'job_id': job_id,
+                'status': 'queued',
+                'created_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'duration_seconds': None,
+                'model_version': None,
+                'params': train_kwargs,
+                'evaluation': None,
+                'error': None,
+                'pid': os.getpid()
+            }
+            # Written before the marker names it, so other processes never see a marker without a record
+            os.makedirs(self.jobs_dir, exist_ok=True)
+            self._persist(job)
+            active_id = self._claim(job_id)
+            if active_id is None:
+                self._jobs[job_id] = job
+            else:
+                os.remove(self._state_path(job_id))
+
+        if active_id is not None:
+            active = self.get(active_id)
+            if active is None:
+                raise RuntimeError(f'Training job {active_id} is running but has no record')
+            return active, False
+        threading.Thread(target=self._run, args=(job_id, train_kwargs), name=f'train-{job_id}', daemon=True).start()
+        return dict(job), True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job's status, from memory or from its record, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return json.loads(json.dumps(job, default=str))
+        return self._read(job_id)
+
+    def reset_after_fork(self):
+        """Forget jobs inherited from the parent; their threads did not survive the fork"""
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(changes)
+            self._persist(job)
+
+    def _run(self, job_id: str, train_kwargs: Dict[str, Any]):
+        started = time.monotonic()
+        self._update(job_id, status='running', started_at=datetime.now().isoformat())
+        try:
+            artifacts = self.train_fn(**train_kwargs)
+            path, manifest = write_bundle(artifacts, self.models_dir, self.training_data_path)
+            bundle = load_bundle(path)
+            self.on_complete(bundle)
+            set_current_version(self.models_dir, manifest['version'])
+            outcome = {'status': 'succeeded', 'model_version': manifest['version'],
+                       'evaluation': artifacts.get('evaluation')}
+        except ModelRejected as e:
+            print(f"⚠️ Training job {job_id} rejected: {e}")
+            outcome = {'status': 'rejected', 'error': str(e), 'evaluation': e.evaluation}
+        except Exception as e:
+            traceback.print_exc()
+            outcome = {'status': 'failed', 'error': str(e)}
+
+        self._update(job_id, finished_at=datetime.now().isoformat(),
+                     duration_seconds=round(time.monotonic() - started, 3), **outcome)
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._release(job_id)
+
+    def _release(self, job_id: str):
+        """Remove the ACTIVE marker if it still names ``job_id``"""
+        try:
+            with open(self._marker_path, encoding='utf-8') as f:
+                if f.read().strip() != job_id:
+                    return
+            os.remove(self._marker_path)
+        except FileNotFoundError:
+            pass
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class CurrentBundleWatcher:
+    """Switches this process to the bundle ``models/CURRENT`` names once another process promotes one
+
+    Training runs in one server process; the others notice the new pointer
+    here. ``models/CURRENT`` is read at most every ``check_interval``
+    seconds, and one thread loads the new bundle while the rest keep
+    serving the old one. A version that fails to load is not retried.
+    """
+
+    def __init__(self, serving_version: Callable[[], Optional[str]], on_change: Callable[[ModelBundle], None],
+                 models_dir: str = MODELS_DIR, check_interval: float = 2.0):
+        self.serving_version = serving_version
+        self.on_change = on_change
+        self.models_dir = models_dir
+        self.check_interval = max(0.0, float(check_interval))
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._failed_version: Optional[str] = None
+
+    def check(self, force: bool = False) -> bool:
+        """Load and hand over the promoted bundle if it is not the one being served; True when switched"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        path, version = resolve_current_bundle(models_dir=self.models_dir)
+        if version is None or version == self.serving_version() or version == self._failed_version:
+            return False
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            # Another thread may have switched since the version was compared above
+            serving_version = self.serving_version()
+            if version == serving_version:
+                return False
+            try:
+                bundle = load_bundle(path, version)
+            except Exception as e:
+                self._failed_version = version
+                print(f"⚠️ Could not load promoted model bundle {version}, keeping {serving_version}: {e}")
+                return False
+            self.on_change(bundle)
+            print(f"✅ Switched to promoted model bundle {version} (was {serving_version})")
+            return True
+        finally:
+            self._lock.release()
+
+    def reset_after_fork(self):
+        """Replace the lock inherited from the parent process"""
+        self._lock = threading.Lock()
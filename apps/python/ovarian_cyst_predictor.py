@@ -1,11 +1,12 @@
 import pandas as pd
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.metrics import accuracy_score, classification_report
 import numpy as np
 import os
 import warnings
+from model_search import (TRAINING_BUDGET_CLOCK, TRAINING_SEARCH, TRAINING_TIME_BUDGET,
+                          compare_search_modes, run_search)
 
 warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
 pd.options.mode.chained_assignment = None # Suppress the SettingWithCopyWarning
@@ -16,6 +17,15 @@ PATIENT_DATA_PATH = os.path.join(SCRIPT_DIR, 'patient_data.csv')
 INVENTORY_PATH = os.path.join(SCRIPT_DIR, 'inventory.csv')
 CHARGES_PATH = os.path.join(SCRIPT_DIR, 'hospital_charges.csv')
 
+# Rare outcome labels in the source data merged into their main class
+TARGET_ALIASES = {'Bic Referral': 'Referral', 'Nauss Surgery': 'Surgery'}
+
+def clean_target_labels(values):
+    """
+    Strips outcome labels and merges rare classes (a pandas Series in, a Series out).
+    """
+    return values.str.strip().replace(TARGET_ALIASES)
+
 def preprocess_and_clean(df):
     """
     Cleans data, merges rare classes, and uses a mix of intelligent and one-hot encoding.
@@ -24,7 +34,7 @@ def preprocess_and_clean(df):
     df_clean.columns = df_clean.columns.str.strip()
 
     # --- Step 1: Clean Target Variable ---
-    df_clean['Recommended'] = df_clean['Recommended'].str.strip().replace({'Bic Referral': 'Referral', 'Nauss Surgery': 'Surgery'})
+    df_clean['Recommended'] = clean_target_labels(df_clean['Recommended'])
 
     # --- Step 2: Intelligent Symptom Parsing ---
     # Treat symptoms as individual binary features. This is smarter than one-hot encoding every combo.
@@ -49,9 +59,9 @@ def preprocess_and_clean(df):
 
     return df_processed, target_encoder
 
-def train_and_evaluate(df, target_encoder):
+def split_and_scale(df):
     """
-    Scales features, performs hyperparameter tuning, and evaluates the best model.
+    Splits into stratified train/test sets and scales the numerical columns on the training split.
     """
     X = df.drop('Recommended', axis=1)
     y = df['Recommended']
@@ -65,22 +75,39 @@ def train_and_evaluate(df, target_encoder):
     X_test_scaled = X_test.copy()
     X_train_scaled[numerical_cols] = scaler.fit_transform(X_train[numerical_cols])
     X_test_scaled[numerical_cols] = scaler.transform(X_test[numerical_cols])
+    return X_train_scaled, X_test_scaled, y_train, y_test, X, scaler
 
-    # --- Hyperparameter Tuning using GridSearchCV ---
-    param_grid = {
-        'n_estimators': [100, 150, 200],
-        'max_depth': [None, 10, 20],
-        'min_samples_split': [2, 5, 10],
-        'min_samples_leaf': [1, 2, 4]
-    }
-    rf = RandomForestClassifier(random_state=42, class_weight='balanced')
-    grid_search = GridSearchCV(estimator=rf, param_grid=param_grid, cv=3, n_jobs=-1, scoring='accuracy')
-    grid_search.fit(X_train_scaled, y_train)
+def compare_search_strategies(df, time_budget=None, budget_clock='wall'):
+    """
+    Reports test accuracy against search time for the grid, halving and random searches.
+    """
+    X_train_scaled, X_test_scaled, y_train, y_test, _, _ = split_and_scale(df)
+    return compare_search_modes(X_train_scaled, y_train, X_test_scaled, y_test, time_budget, budget_clock)
+
+def train_and_evaluate(df, target_encoder, search=None, time_budget=None, budget_clock=None):
+    """
+    Scales features, performs hyperparameter tuning, and evaluates the best model.
+
+    ``search`` is 'grid' (exhaustive GridSearchCV), 'halving' (successive halving)
+    or 'random' (randomized search); the last two stop after ``time_budget``
+    seconds of wall-clock or CPU time (``budget_clock``). Defaults come from the
+    TRAINING_SEARCH, TRAINING_TIME_BUDGET and TRAINING_BUDGET_CLOCK variables.
+    """
+    X_train_scaled, X_test_scaled, y_train, y_test, X, scaler = split_and_scale(df)
+
+    # --- Hyperparameter Tuning ---
+    search = search or TRAINING_SEARCH
+    result = run_search(search, X_train_scaled, y_train,
+                        time_budget if time_budget is not None else TRAINING_TIME_BUDGET,
+                        budget_clock or TRAINING_BUDGET_CLOCK)
 
     print("\n--- Hyperparameter Tuning Results ---")
-    print(f"Best Parameters Found: {grid_search.best_params_}")
+    print(f"Search: {result.mode}, {result.evaluated} candidate evaluations in {result.seconds:.1f}s"
+          f"{' (budget exhausted)' if result.budget_exhausted else ''}")
+    print(f"Best Parameters Found: {result.best_params}")
     
-    best_model = grid_search.best_estimator_
+    # Grid search has already refitted the winner on the training split
+    best_model = result.fit_best(X_train_scaled, y_train)
     y_pred = best_model.predict(X_test_scaled)
     
     target_names = target_encoder.classes_
@@ -92,6 +119,34 @@ def train_and_evaluate(df, target_encoder):
     
     return best_model, X.columns, scaler
 
+def train_decision_tree(df, target_encoder):
+    """
+    Tunes and evaluates a single decision tree on the same split and scaler as the forest.
+
+    A much smaller and faster model, meant to be served next to the forest as a
+    candidate (see MODEL_CANDIDATES) rather than to replace it outright.
+    """
+    from sklearn.model_selection import GridSearchCV
+    from sklearn.tree import DecisionTreeClassifier
+
+    X_train_scaled, X_test_scaled, y_train, y_test, X, scaler = split_and_scale(df)
+
+    grid_search = GridSearchCV(DecisionTreeClassifier(class_weight='balanced', random_state=42),
+                               {'max_depth': [5, 10, 20, None], 'min_samples_leaf': [1, 5, 20]},
+                               cv=3, n_jobs=-1)
+    grid_search.fit(X_train_scaled, y_train)
+    best_model = grid_search.best_estimator_
+    y_pred = best_model.predict(X_test_scaled)
+
+    print("\n--- Decision Tree Evaluation ---")
+    print(f"Best Parameters Found: {grid_search.best_params_}")
+    print(f"Model Accuracy: {accuracy_score(y_test, y_pred):.2f}")
+    print("\nClassification Report:")
+    print(classification_report(y_test, y_pred, target_names=target_encoder.classes_, zero_division='warn'))
+    print("-" * 28)
+
+    return best_model, X.columns, scaler
+
 def generate_care_template(model, feature_names, patient_record, target_encoder, scaler, inventory_df, charges_df):
     """
     Generates a full care template for a single patient record.
@@ -0,0 +1,177 @@
+"""
+In-memory patient lookup index for the Ovarian Cyst Prediction API
+Answers exact, partial and region searches without scanning the whole patient table
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Queries containing these are regular expressions to str.contains, so they keep the table scan
+REGEX_CHARACTERS = frozenset('.^$*+?{}[]\\|()')
+GRAM = 3
+
+
+def _gram_codes(chars: np.ndarray) -> np.ndarray:
+    """Pack rows of three code points (shape (..., 3), uint32) into one int64 per trigram"""
+    chars = chars.astype(np.int64)
+    return (chars[..., 0] << 42) | (chars[..., 1] << 21) | chars[..., 2]
+
+
+class PatientIndex:
+    """Lookup structures over the Patient ID and Region columns, built once at load time
+
+    - exact IDs: a dict from ID to the first row holding it
+    - ID prefixes: the IDs in sorted order, searched by bisection
+    - partial IDs: an inverted index of the trigrams found after the first
+      character of each ID, so together with the prefix search every
+      position a query can match at is covered; candidates are confirmed
+      with a plain substring test
+    - regions: rows grouped by lower-cased region, searched by substring
+
+    Searches return row positions in table order, matching what the
+    ``str.contains`` masks they replace selected.
+    """
+
+    def __init__(self, frame: pd.DataFrame, id_column: str = 'Patient ID', region_column: str = 'Region'):
+        self.n_rows = len(frame)
+
+        ids = frame[id_column]
+        valid = ids.notna().to_numpy()
+        self._id_series = ids
+        self._id_rows = np.flatnonzero(valid)
+        self._ids = ids[valid].astype(str).to_numpy(dtype=object)
+
+        # Reversed so the earliest row wins for duplicated IDs
+        self._first_row = dict(zip(self._ids[::-1].tolist(), self._id_rows[::-1].tolist()))
+
+        # Fixed-width copy of the IDs for fast sorting and trigram extraction
+        width = max(1, max((len(value) for value in self._ids), default=1))
+        fixed = np.array(self._ids.tolist(), dtype=f'<U{width}')
+        self._sorted_order = np.argsort(fixed, kind='stable')
+        self._sorted_ids = self._ids[self._sorted_order]
+
+        self._build_gram_index(fixed)
+
+        regions = frame[region_column]
+        self._region_series = regions
+        region_rows = np.flatnonzero(regions.notna().to_numpy())
+        lowered = regions.iloc[region_rows].astype(str).str.lower().to_numpy()
+        self._region_rows = {
+            str(region): region_rows[members]
+            for region, members in pd.Series(lowered).groupby(lowered, sort=False).indices.items()
+        }
+
+    def _build_gram_index(self, fixed: np.ndarray):
+        """CSR-style postings: sorted trigram codes, offsets, and the ID slots holding each"""
+        width = fixed.dtype.itemsize // 4
+        chars = fixed.view(np.uint32).reshape(len(fixed), width)
+        # Kept for queries shorter than a trigram, one byte per character when the IDs are ASCII
+        self._chars = chars.astype(np.uint8) if not chars.size or chars.max() < 256 else chars
+        codes, slots = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for start in range(1, width - GRAM + 1):
+            window = chars[:, start:start + GRAM]
+            complete = (window != 0).all(axis=1)
+            codes.append(_gram_codes(window[complete]))
+            slots.append(np.flatnonzero(complete))
+        codes = np.concatenate(codes)
+        slots = np.concatenate(slots)
+
+        # Sort by trigram, then slot, and drop trigrams repeated within one ID
+        order = np.lexsort((slots, codes))
+        codes, slots = codes[order], slots[order]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (slots[1:] != slots[:-1])
+        codes, slots = codes[keep], slots[keep]
+
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.empty(0, dtype=np.int64)
+        self._gram_keys = codes[starts]
+        self._gram_offsets = np.r_[starts, len(codes)].astype(np.int64)
+        self._gram_slots = slots
+
+    def _postings(self, code: int) -> np.ndarray:
+        at = np.searchsorted(self._gram_keys, code)
+        if at == len(self._gram_keys) or self._gram_keys[at] != code:
+            return self._gram_slots[:0]
+        return self._gram_slots[self._gram_offsets[at]:self._gram_offsets[at + 1]]
+
+    def _prefix_slots(self, prefix: str) -> np.ndarray:
+        lo = np.searchsorted(self._sorted_ids, prefix, side='left')
+        hi = np.searchsorted(self._sorted_ids, prefix + '\U0010ffff', side='left')
+        return self._sorted_order[lo:hi]
+
+    def _inner_slots(self, query: str) -> np.ndarray:
+        """ID slots containing ``query`` somewhere after the first character"""
+        if len(query) < GRAM:
+            return self._scan_short(query)
+
+        chars = np.array([ord(ch) for ch in query], dtype=np.uint32)
+        windows = np.lib.stride_tricks.sliding_window_view(chars, GRAM)
+        postings = sorted((self._postings(int(code)) for code in _gram_codes(windows)), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        return np.array([slot for slot in candidates if self._ids[slot].find(query, 1) != -1], dtype=np.int64)
+
+    def _scan_short(self, query: str) -> np.ndarray:
+        """Vectorised scan of the character matrix for one- and two-character queries"""
+        codes = [ord(ch) for ch in query]
+        if not codes or min(codes) == 0:
+            return np.flatnonzero([value.find(query, 1) != -1 for value in self._ids])
+        if max(codes) > np.iinfo(self._chars.dtype).max:
+            return np.empty(0, dtype=np.int64)
+        width = self._chars.shape[1]
+        hit = np.zeros(len(self._chars), dtype=bool)
+        for start in range(1, width - len(codes) + 1):
+            match = self._chars[:, start] == codes[0]
+            for offset, code in enumerate(codes[1:], 1):
+                match &= self._chars[:, start + offset] == code
+            hit |= match
+        return np.flatnonzero(hit)
+
+    def ordered_after(self, patient_id: Optional[str], position: int, limit: int) -> np.ndarray:
+        """Next ``limit`` row positions in (ID, position) order, after the given key
+
+        With ``patient_id=None`` the walk starts at the first ID. Rows without
+        an ID are not part of this order. Costs two bisections, however deep
+        into the order the key is.
+        """
+        start = 0
+        if patient_id is not None:
+            lo = np.searchsorted(self._sorted_ids, patient_id, side='left')
+            hi = np.searchsorted(self._sorted_ids, patient_id, side='right')
+            # The stable sort leaves rows sharing an ID in table order
+            start = lo + np.searchsorted(self._id_rows[self._sorted_order[lo:hi]], position, side='right')
+        return self._id_rows[self._sorted_order[start:start + max(int(limit), 0)]]
+
+    def find(self, patient_id: str) -> Optional[int]:
+        """Row position of the first patient with exactly this ID, or None"""
+        return self._first_row.get(patient_id)
+
+    def search_id(self, query: str) -> np.ndarray:
+        """Rows whose ID contains ``query`` (case-sensitive), like ``str.contains(query, na=False)``"""
+        if REGEX_CHARACTERS.intersection(query):
+            return np.flatnonzero(self._id_series.str.contains(query, na=False).to_numpy())
+        slots = np.concatenate([self._prefix_slots(query), self._inner_slots(query)])
+        if len(slots) > len(self._ids) // 64:
+            # Broad queries: marking a flag per ID beats sorting most of the table
+            hit = np.zeros(len(self._ids), dtype=bool)
+            hit[slots] = True
+            slots = np.flatnonzero(hit)
+        else:
+            slots = np.sort(slots)
+            slots = slots[np.r_[True, slots[1:] != slots[:-1]]] if len(slots) else slots
+        return self._id_rows[slots]
+
+    def search_region(self, query: str) -> np.ndarray:
+        """Rows whose region contains ``query`` ignoring case, like ``str.contains(query, case=False, na=False)``"""
+        if REGEX_CHARACTERS.intersection(query):
+            return np.flatnonzero(self._region_series.str.contains(query, case=False, na=False).to_numpy())
+        needle = query.lower()
+        matches = [rows for region, rows in self._region_rows.items() if needle in region]
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(matches))
@@ -0,0 +1,387 @@
+"""
+Patient storage for the Ovarian Cyst Prediction API
+Serves patient records and assessments from memory or from a shared SQLite file behind one API
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model_store import file_sha256
+from patient_index import PatientIndex
+
+PATIENT_STORES = ('memory', 'sqlite')
+PATIENT_DB_PATH = os.path.join('data', 'patients.sqlite3')
+
+# (patient_data.csv column, SQL column, SQL type)
+PATIENT_COLUMNS = [
+    ('Patient ID', 'patient_id', 'TEXT'),
+    ('Age', 'age', 'INTEGER'),
+    ('Menopause Stage', 'menopause_stage', 'TEXT'),
+    ('SI Cyst Size cm', 'cyst_size', 'REAL'),
+    ('Cyst Growth', 'cyst_growth', 'REAL'),
+    ('fca 125 Level', 'ca125_level', 'INTEGER'),
+    ('Ultrasound Fe', 'ultrasound_features', 'TEXT'),
+    ('Reported Sym', 'reported_symptoms', 'TEXT'),
+    ('Recommended', 'recommended', 'TEXT'),
+    ('Date of Exam', 'date_of_exam', 'TEXT'),
+    ('Region', 'region', 'TEXT')
+]
+ASSESSMENT_FIELDS = ['patient_id', 'prediction', 'confidence', 'risk_level', 'model_version', 'created_at']
+
+# row_id keeps the CSV order, which every listing and search returns rows in
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS patients (row_id INTEGER PRIMARY KEY, "
+    + ', '.join(f'{sql} {sql_type}' for _, sql, sql_type in PATIENT_COLUMNS) + ")",
+    "CREATE INDEX IF NOT EXISTS idx_patients_patient_id ON patients (patient_id)",
+    "CREATE INDEX IF NOT EXISTS idx_patients_region ON patients (region)",
+    "CREATE INDEX IF NOT EXISTS idx_patients_date_of_exam ON patients (date_of_exam)",
+    "CREATE TABLE IF NOT EXISTS assessments (id INTEGER PRIMARY KEY, patient_id TEXT NOT NULL, "
+    "prediction TEXT, confidence REAL, risk_level TEXT, model_version TEXT, created_at TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_assessments_patient ON assessments (patient_id, id)",
+    "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)"
+]
+
+SELECT_PATIENTS = 'SELECT ' + ', '.join(f'{sql} AS "{column}"' for column, sql, _ in PATIENT_COLUMNS) + ' FROM patients'
+INSERT_PATIENT = ('INSERT INTO patients (row_id, ' + ', '.join(sql for _, sql, _ in PATIENT_COLUMNS)
+                  + ') VALUES (' + ', '.join('?' * (len(PATIENT_COLUMNS) + 1)) + ')')
+SELECT_VERSION = "SELECT value FROM store_meta WHERE key = 'version'"
+
+
+def encode_cursor(patient_id: str, row_id: int) -> str:
+    """Opaque keyset cursor for the position after ``(patient_id, row_id)``"""
+    raw = json.dumps([patient_id, int(row_id)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    """Key encoded by ``encode_cursor``; an empty cursor means the first page. Raises ValueError"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        patient_id, row_id = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(patient_id, str) or not isinstance(row_id, int):
+        raise ValueError("Invalid cursor")
+    return patient_id, row_id
+
+
+class ConnectionPool:
+    """One SQLite connection per thread, opened on first use
+
+    Every connection runs in WAL mode, so readers in any thread or worker
+    process never block on a writer. Statements are issued with fixed SQL
+    text, so each connection's statement cache keeps them prepared.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._inherited: List[sqlite3.Connection] = []
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, cached_statements=64)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def reset_after_fork(self):
+        """Stop using the parent's connections without closing them (SQLite forbids sharing across fork)"""
+        self._inherited.extend(self._connections)
+        self._connections = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+
+def _create_schema(conn: sqlite3.Connection):
+    with conn:
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', '0')")
+
+
+def import_csv(csv_path: str = 'patient_data.csv', db_path: str = PATIENT_DB_PATH,
+               only_if_empty: bool = False) -> int:
+    """Load a patient CSV into the store, replacing its patients in one transaction
+
+    Readers keep seeing the old rows until the transaction commits. With
+    ``only_if_empty`` nothing happens when the store already holds patients
+    (so several workers starting at once import the file only once).
+    Returns the number of rows imported.
+    """
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=60.0)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        _create_schema(conn)
+        if only_if_empty and conn.execute('SELECT 1 FROM patients LIMIT 1').fetchone():
+            return 0
+
+        frame = pd.read_csv(csv_path)
+        columns = [frame[column].astype(object).where(frame[column].notna(), None).tolist()
+                   if column in frame.columns else [None] * len(frame)
+                   for column, _, _ in PATIENT_COLUMNS]
+        rows = list(zip(range(1, len(frame) + 1), *columns))
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if only_if_empty and conn.execute('SELECT 1 FROM patients LIMIT 1').fetchone():
+                conn.rollback()
+                return 0
+            conn.execute('DELETE FROM patients')
+            conn.executemany(INSERT_PATIENT, rows)
+            version = int(conn.execute(SELECT_VERSION).fetchone()[0]) + 1
+            meta = {
+                'version': str(version),
+                'source_path': os.path.abspath(csv_path),
+                'source_hash': file_sha256(csv_path),
+                'imported_at': datetime.now().isoformat(),
+                'rows': str(len(rows))
+            }
+            conn.executemany('INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)', meta.items())
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(rows)
+    finally:
+        conn.close()
+
+
+class MemoryPatientRepository:
+    """Patients held in a DataFrame per process, searched through a PatientIndex
+
+    Assessments are kept in memory and lost on restart.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, frame: pd.DataFrame, max_assessments: int = 10000):
+        self.frame = frame
+        self.index = PatientIndex(frame)
+        self._assessments = deque(maxlen=max_assessments)
+        self._lock = threading.Lock()
+
+    def count(self) -> int:
+        return len(self.frame)
+
+    def head(self, n: int) -> pd.DataFrame:
+        return self.frame.head(n)
+
+    def get(self, patient_id: str) -> Optional[Dict[str, Any]]:
+        """First patient with exactly this ID, as a dict keyed by the CSV columns"""
+        position = self.index.find(patient_id)
+        return None if position is None else self.frame.iloc[position].to_dict()
+
+    def search_id(self, query: str) -> pd.DataFrame:
+        return self.frame.iloc[self.index.search_id(query)]
+
+    def search_region(self, query: str) -> pd.DataFrame:
+        return self.frame.iloc[self.index.search_region(query)]
+
+    def slice(self, start: int, stop: int) -> pd.DataFrame:
+        """Rows ``start:stop`` in table order, with Python slice semantics"""
+        return self.frame.iloc[start:stop]
+
+    def page_after(self, after: Optional[Tuple[str, int]], limit: int) -> Tuple[pd.DataFrame, Optional[Tuple[str, int]]]:
+        """Up to ``limit`` patients after the ``(Patient ID, row_id)`` key, and the key to continue from
+
+        row_id is the 1-based table position, as in the SQLite store.
+        """
+        patient_id, row_id = after if after else (None, 0)
+        positions = self.index.ordered_after(patient_id, row_id - 1, limit + 1)
+        page = self.frame.iloc[positions[:limit]]
+        if len(positions) <= limit:
+            return page, None
+        return page, (str(page['Patient ID'].iloc[-1]), int(positions[limit - 1]) + 1)
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(self.frame), chunk_size):
+            yield self.frame.iloc[start:start + chunk_size]
+
+    def record_assessment(self, **assessment) -> Dict[str, Any]:
+        record = {field: assessment.get(field) for field in ASSESSMENT_FIELDS}
+        record['created_at'] = record['created_at'] or datetime.now().isoformat()
+        with self._lock:
+            self._assessments.append(record)
+        return record
+
+    def assessments(self, patient_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent assessments of a patient, newest first"""
+        with self._lock:
+            matches = [record for record in self._assessments if record['patient_id'] == patient_id]
+        return matches[::-1][:limit]
+
+    def describe(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'patients': self.count()}
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+
+
+class SqlitePatientRepository:
+    """Patients and assessments in one SQLite file shared by every worker process
+
+    Rows are read on demand; each process keeps only a PatientIndex over
+    the ID and Region columns for searches. It is rebuilt when another
+    process re-imports the patients, as is the cached patient count.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str = PATIENT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.pool = ConnectionPool(path)
+        _create_schema(self.pool.connection())
+        self._lock = threading.Lock()
+        self._version = None
+        self._row_ids = np.empty(0, dtype=np.int64)
+        self.index = None
+        self._refresh()
+
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self.pool.connection(), params=params)
+
+    def _refresh(self):
+        """Rebuild the search index if the stored patients changed since it was built"""
+        version = self.pool.connection().execute(SELECT_VERSION).fetchone()[0]
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            ids = self._query('SELECT row_id, patient_id AS "Patient ID", region AS "Region" '
+                              'FROM patients ORDER BY row_id')
+            self._row_ids = ids['row_id'].to_numpy()
+            self.index = PatientIndex(ids)
+            self._version = version
+
+    def _rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """Rows at the given index positions, in table order"""
+        row_ids = json.dumps(self._row_ids[positions].tolist())
+        return self._query(SELECT_PATIENTS + ' WHERE row_id IN (SELECT value FROM json_each(?)) '
+                           'ORDER BY row_id', (row_ids,))
+
+    def count(self) -> int:
+        self._refresh()
+        return len(self._row_ids)
+
+    def head(self, n: int) -> pd.DataFrame:
+        return self._query(SELECT_PATIENTS + ' ORDER BY row_id LIMIT ?', (max(int(n), 0),))
+
+    def get(self, patient_id: str) -> Optional[Dict[str, Any]]:
+        """First patient with exactly this ID, as a dict keyed by the CSV columns"""
+        cursor = self.pool.connection().execute(
+            SELECT_PATIENTS + ' WHERE patient_id = ? ORDER BY row_id LIMIT 1', (patient_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([column for column, _, _ in PATIENT_COLUMNS], row))
+
+    def search_id(self, query: str) -> pd.DataFrame:
+        self._refresh()
+        return self._rows(self.index.search_id(query))
+
+    def search_region(self, query: str) -> pd.DataFrame:
+        self._refresh()
+        return self._rows(self.index.search_region(query))
+
+    def slice(self, start: int, stop: int) -> pd.DataFrame:
+        """Rows ``start:stop`` in table order, with Python slice semantics"""
+        start, stop, _ = slice(start, stop).indices(self.count())
+        return self._query(SELECT_PATIENTS + ' ORDER BY row_id LIMIT ? OFFSET ?', (max(stop - start, 0), start))
+
+    def page_after(self, after: Optional[Tuple[str, int]], limit: int) -> Tuple[pd.DataFrame, Optional[Tuple[str, int]]]:
+        """Up to ``limit`` patients after the ``(Patient ID, row_id)`` key, and the key to continue from
+
+        Walks idx_patients_patient_id (whose entries end in row_id), so a
+        page costs the same however deep into the registry it is.
+        """
+        columns = 'SELECT row_id, ' + SELECT_PATIENTS[len('SELECT '):]
+        if after is None:
+            page = self._query(columns + ' WHERE patient_id IS NOT NULL ORDER BY patient_id, row_id LIMIT ?',
+                               (limit + 1,))
+        else:
+            page = self._query(columns + ' WHERE (patient_id, row_id) > (?, ?) ORDER BY patient_id, row_id LIMIT ?',
+                               (after[0], after[1], limit + 1))
+        has_next = len(page) > limit
+        page = page.iloc[:limit]
+        next_after = (str(page['Patient ID'].iloc[-1]), int(page['row_id'].iloc[-1])) if has_next else None
+        return page.drop(columns='row_id'), next_after
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Every patient in table order, one query per chunk"""
+        last_row_id = 0
+        while True:
+            chunk = self._query('SELECT row_id, ' + SELECT_PATIENTS[len('SELECT '):]
+                                + ' WHERE row_id > ? ORDER BY row_id LIMIT ?', (last_row_id, chunk_size))
+            if chunk.empty:
+                return
+            last_row_id = int(chunk['row_id'].iloc[-1])
+            yield chunk.drop(columns='row_id')
+
+    def record_assessment(self, **assessment) -> Dict[str, Any]:
+        record = {field: assessment.get(field) for field in ASSESSMENT_FIELDS}
+        record['created_at'] = record['created_at'] or datetime.now().isoformat()
+        conn = self.pool.connection()
+        with conn:
+            conn.execute('INSERT INTO assessments (' + ', '.join(ASSESSMENT_FIELDS) + ') VALUES ('
+                         + ', '.join('?' * len(ASSESSMENT_FIELDS)) + ')',
+                         [record[field] for field in ASSESSMENT_FIELDS])
+        return record
+
+    def assessments(self, patient_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent assessments of a patient, newest first"""
+        cursor = self.pool.connection().execute(
+            'SELECT ' + ', '.join(ASSESSMENT_FIELDS) + ' FROM assessments WHERE patient_id = ? '
+            'ORDER BY id DESC LIMIT ?', (patient_id, limit))
+        return [dict(zip(ASSESSMENT_FIELDS, row)) for row in cursor.fetchall()]
+
+    def describe(self) -> Dict[str, Any]:
+        meta = dict(self.pool.connection().execute('SELECT key, value FROM store_meta').fetchall())
+        return {'backend': self.backend, 'path': self.path, 'patients': self.count(),
+                'imported_at': meta.get('imported_at'), 'source_hash': meta.get('source_hash')}
+
+    def reset_after_fork(self):
+        self.pool.reset_after_fork()
+        self._lock = threading.Lock()
+
+
+def open_patient_repository(store: str = 'memory', csv_path: str = 'patient_data.csv',
+                            db_path: str = PATIENT_DB_PATH):
+    """Repository for the configured backend; an empty SQLite store is first filled from ``csv_path``"""
+    if store not in PATIENT_STORES:
+        raise ValueError(f"Unknown patient store: {store} (expected one of {', '.join(PATIENT_STORES)})")
+    if store == 'memory':
+        return MemoryPatientRepository(pd.read_csv(csv_path))
+
+    imported = import_csv(csv_path, db_path, only_if_empty=True)
+    if imported:
+        print(f"📥 Imported {imported} patients from {csv_path} into {db_path}")
+    return SqlitePatientRepository(db_path)
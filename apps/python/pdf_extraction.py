@@ -0,0 +1,167 @@
+"""
+Parallel PDF text extraction for the Ovarian Cyst Prediction API
+Splits page ranges across a process pool and yields pages in document order
+"""
+
+import multiprocessing
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_PAGE_BUDGET = 500
+DEFAULT_PAGES_PER_TASK = 8
+
+# Cells in text-laid-out tables are separated by tabs, pipes or runs of spaces
+_CELL_SEPARATOR = re.compile(r'\t|\s*\|\s*|\s{2,}')
+
+
+def default_workers() -> int:
+    """Extraction processes to use when PDF_WORKERS is not set"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return max(1, min(4, cores))
+
+
+def _pool_context():
+    """Start pool processes from a clean single-threaded fork server where available
+
+    Server processes run request and job threads, so forking them directly is
+    unsafe; the fork server preloads only this module and PyPDF2.
+    (Pool processes still import the ``__main__`` script once when they start.)
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__, 'PyPDF2'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def detect_tables(text: str, min_rows: int = 2, min_columns: int = 2) -> List[List[List[str]]]:
+    """Find runs of lines that split into the same number (>= 2) of cells
+
+    PyPDF2 only recovers text, so tables are inferred from layout: consecutive
+    lines with a consistent column count form one table.
+    """
+    tables = []
+    rows: List[List[str]] = []
+    for line in text.splitlines():
+        cells = [cell for cell in _CELL_SEPARATOR.split(line.strip()) if cell]
+        if len(cells) >= min_columns and (not rows or len(cells) == len(rows[0])):
+            rows.append(cells)
+            continue
+        if len(rows) >= min_rows:
+            tables.append(rows)
+        rows = [cells] if len(cells) >= min_columns else []
+    if len(rows) >= min_rows:
+        tables.append(rows)
+    return tables
+
+
+def count_pages(path: str) -> int:
+    """Number of pages in a PDF"""
+    import PyPDF2
+
+    with open(path, 'rb') as pdf_file:
+        return len(PyPDF2.PdfReader(pdf_file).pages)
+
+
+def extract_page_range(path: str, start: int, stop: int) -> List[Dict[str, Any]]:
+    """Extract text and tables for pages [start, stop); runs inside a pool process"""
+    import PyPDF2
+
+    pages = []
+    try:
+        with open(path, 'rb') as pdf_file:
+            reader = PyPDF2.PdfReader(pdf_file)
+            for page_num in range(start, stop):
+                try:
+                    text = reader.pages[page_num].extract_text() or ''
+                    pages.append({'page': page_num + 1, 'text': text, 'tables': detect_tables(text)})
+                except Exception as e:
+                    pages.append({'page': page_num + 1, 'error': str(e)})
+    except Exception as e:
+        done = len(pages)
+        pages.extend({'page': page_num + 1, 'error': str(e)} for page_num in range(start + done, stop))
+    return pages
+
+
+class PdfExtractor:
+    """Extracts PDF pages on a long-lived process pool, yielding them in page order
+
+    The pool is started on first use and reused across jobs, so process
+    start-up is paid once per server process. Page ranges of
+    ``pages_per_task`` pages are handed out with at most two ranges per
+    worker in flight, which bounds memory however long the document is.
+    """
+
+    def __init__(self, workers: int = 1, pages_per_task: int = DEFAULT_PAGES_PER_TASK):
+        self.workers = max(1, int(workers))
+        self.pages_per_task = max(1, int(pages_per_task))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken pool so the next job starts a fresh one"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def iter_pages(self, path: str, page_count: int) -> Iterator[Dict[str, Any]]:
+        """Yield extracted pages 1..page_count in order
+
+        Closing the generator early (e.g. on cancel) drops the ranges not
+        yet started.
+        """
+        ranges = [(start, min(start + self.pages_per_task, page_count))
+                  for start in range(0, page_count, self.pages_per_task)]
+
+        if self.workers == 1 or len(ranges) <= 1:
+            for start, stop in ranges:
+                yield from extract_page_range(path, start, stop)
+            return
+
+        pool = self._get_pool()
+        pending = deque()
+        remaining = iter(ranges)
+        try:
+            for start, stop in remaining:
+                pending.append(pool.submit(extract_page_range, path, start, stop))
+                if len(pending) >= self.workers * 2:
+                    break
+            while pending:
+                try:
+                    pages = pending.popleft().result()
+                except BrokenProcessPool:
+                    self._discard_pool(pool)
+                    raise
+                next_range = next(remaining, None)
+                if next_range is not None:
+                    pending.append(pool.submit(extract_page_range, path, *next_range))
+                yield from pages
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def reset_after_fork(self):
+        """Forget the parent's pool; a forked server worker starts its own"""
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,89 @@
+"""
+Prediction result cache for the Ovarian Cyst Prediction API
+Bounded LRU keyed on the encoded feature row and the model version
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with size and TTL eviction"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300.0):
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(row: np.ndarray, model_version: str) -> str:
+        """Hash a canonicalized encoded feature row together with the model version"""
+        canonical = np.ascontiguousarray(row, dtype=np.float64).ravel() + 0.0  # folds -0.0 into 0.0
+        digest = hashlib.blake2b(canonical.tobytes(), digest_size=16)
+        digest.update(str(model_version).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any):
+        """Store ``value``, evicting the least recently used entries beyond max_size"""
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, e.g. after the model artifacts are reloaded"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def reset_after_fork(self):
+        """Replace the lock inherited from the parent process and reset counters"""
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit / miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
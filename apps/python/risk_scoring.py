@@ -0,0 +1,107 @@
+"""
+Vectorized guideline risk scoring for the Ovarian Cyst Prediction API
+Scores whole columns of patients at once with numpy comparisons
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Risk factor bits, in the order factors are reported
+POST_MENOPAUSAL_AGE = 1 << 0
+CYST_SIZE_LARGE = 1 << 1
+CYST_SIZE_MODERATE = 1 << 2
+CYST_SIZE_ELEVATED = 1 << 3
+CA125_VERY_HIGH = 1 << 4
+CA125_HIGH = 1 << 5
+CA125_ELEVATED = 1 << 6
+RAPID_GROWTH = 1 << 7
+SUSPICIOUS_ULTRASOUND = 1 << 8
+
+RISK_LEVELS = np.array(['Low', 'Medium', 'High'], dtype=object)
+
+
+class RiskScorer:
+    """Guideline-based risk scores, levels and factor bitmasks for many patients
+
+    Thresholds are read once from the guideline dictionary. ``score`` takes
+    one array per clinical field and returns per-patient results; ``assess``
+    scores a single patient dict through the same code path.
+    """
+
+    def __init__(self, guidelines: Dict[str, Any]):
+        observation = guidelines['observation_criteria']
+        surgery = guidelines['surgery_criteria']
+        referral = guidelines['referral_criteria']
+        scoring = guidelines['risk_scoring']
+
+        self.age_threshold = surgery['age_post_menopause']
+        self.cyst_size_thresholds = (referral['cyst_size_min'], surgery['cyst_size_min'],
+                                     observation['cyst_size_max'])
+        self.ca125_thresholds = (referral['ca125_min'], surgery['ca125_min'], observation['ca125_max'])
+        self.growth_threshold = scoring['cyst_growth_rapid']
+        self.suspicious_ultrasound = list(scoring['ultrasound_suspicious'])
+        self.high_score = scoring['high_risk_score']
+        self.medium_score = scoring['medium_risk_score']
+
+        large, moderate, elevated = self.cyst_size_thresholds
+        very_high, high, raised = self.ca125_thresholds
+        # (bit, weight, label) in reporting order
+        self.factors = [
+            (POST_MENOPAUSAL_AGE, 2, "Post-menopausal age"),
+            (CYST_SIZE_LARGE, 3, f"Large cyst (>{large:g}cm)"),
+            (CYST_SIZE_MODERATE, 2, f"Moderate cyst size ({moderate:g}-{large:g}cm)"),
+            (CYST_SIZE_ELEVATED, 1, f"Cyst size >{elevated:g}cm"),
+            (CA125_VERY_HIGH, 4, f"Very high CA-125 (>{very_high:g})"),
+            (CA125_HIGH, 3, f"High CA-125 ({high:g}-{very_high:g})"),
+            (CA125_ELEVATED, 1, f"Elevated CA-125 (>{raised:g})"),
+            (RAPID_GROWTH, 2, "Rapid cyst growth"),
+            (SUSPICIOUS_ULTRASOUND, 2, "Suspicious ultrasound features"),
+        ]
+
+    @staticmethod
+    def _tiers(values: np.ndarray, thresholds, bits) -> np.ndarray:
+        """Bit of the highest threshold each value exceeds (0 if none)"""
+        return np.select([values > t for t in thresholds], bits, 0)
+
+    def factor_masks(self, age, cyst_size, ca125, growth, ultrasound) -> np.ndarray:
+        """Bitmask of triggered risk factors for every patient"""
+        age = np.asarray(age, dtype=np.float64)
+        cyst_size = np.asarray(cyst_size, dtype=np.float64)
+        ca125 = np.asarray(ca125, dtype=np.float64)
+        growth = np.asarray(growth, dtype=np.float64)
+
+        mask = np.where(age > self.age_threshold, POST_MENOPAUSAL_AGE, 0)
+        mask |= self._tiers(cyst_size, self.cyst_size_thresholds,
+                            [CYST_SIZE_LARGE, CYST_SIZE_MODERATE, CYST_SIZE_ELEVATED])
+        mask |= self._tiers(ca125, self.ca125_thresholds,
+                            [CA125_VERY_HIGH, CA125_HIGH, CA125_ELEVATED])
+        mask |= np.where(growth > self.growth_threshold, RAPID_GROWTH, 0)
+        mask |= np.where(np.isin(np.asarray(ultrasound, dtype=object), self.suspicious_ultrasound),
+                         SUSPICIOUS_ULTRASOUND, 0)
+        return mask.astype(np.int32)
+
+    def score(self, age, cyst_size, ca125, growth, ultrasound) -> Dict[str, np.ndarray]:
+        """Risk scores, levels and factor bitmasks for arrays of patients"""
+        masks = self.factor_masks(age, cyst_size, ca125, growth, ultrasound)
+        scores = np.zeros(masks.shape, dtype=np.int32)
+        for bit, weight, _ in self.factors:
+            scores += np.where(masks & bit, weight, 0).astype(np.int32)
+        levels = RISK_LEVELS[(scores >= self.medium_score).astype(np.intp) + (scores >= self.high_score)]
+        return {'risk_score': scores, 'risk_level': levels, 'factor_mask': masks}
+
+    def describe_factors(self, mask: int) -> List[str]:
+        """Human-readable labels for the bits set in ``mask``"""
+        return [label for bit, _, label in self.factors if mask & bit]
+
+    def assess(self, patient: Dict[str, Any]) -> Dict[str, Any]:
+        """Score one patient dict (same fields as the prediction endpoints)"""
+        result = self.score([float(patient['Age'])], [float(patient['SI Cyst Size cm'])],
+                            [float(patient['fca 125 Level'])], [float(patient['Cyst Growth'])],
+                            [patient['Ultrasound Fe']])
+        mask = int(result['factor_mask'][0])
+        return {
+            'risk_level': result['risk_level'][0],
+            'risk_score': int(result['risk_score'][0]),
+            'risk_factors': self.describe_factors(mask)
+        }
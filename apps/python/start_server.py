@@ -2,52 +2,34 @@
 """
 Startup script for SisterCheck Python Backend
 This script will:
-1. Train the model if it doesn't exist
+1. Check that a trained model exists (it never trains one; run train_model.py first)
 2. Start the enhanced API server
 """
 
 import os
 import sys
-import subprocess
-from pathlib import Path
 
 def check_model_files():
-    """Check if the trained model files exist"""
-    required_files = [
-        'trained_model.pkl',
-        'feature_columns.pkl', 
-        'target_encoder.pkl',
-        'scaler.pkl'
-    ]
+    """Check that a verified model bundle (or the legacy pickles) exists"""
+    from model_store import (BundleVerificationError, legacy_files_missing,
+                             read_manifest, resolve_current_bundle, verify_bundle)
     
-    missing_files = []
-    for file in required_files:
-        if not os.path.exists(file):
-            missing_files.append(file)
-    
-    return len(missing_files) == 0, missing_files
-
-def train_model():
-    """Train the model using the training script"""
-    print("🤖 Model files not found. Training new model...")
-    print("=" * 50)
+    bundle_path, bundle_version = resolve_current_bundle()
+    if bundle_version is None:
+        missing_files = legacy_files_missing(bundle_path)
+        return len(missing_files) == 0, missing_files
     
+    manifest = read_manifest(bundle_path)
+    if manifest is None:
+        return False, [os.path.join(bundle_path, 'manifest.json')]
     try:
-        # Run the training script
-        result = subprocess.run([sys.executable, 'train_model.py'], 
-                              capture_output=True, text=True, check=True)
-        
-        print("✅ Model training completed successfully!")
-        print(result.stdout)
-        return True
-        
-    except subprocess.CalledProcessError as e:
-        print("❌ Error during model training:")
-        print(e.stderr)
-        return False
-    except FileNotFoundError:
-        print("❌ train_model.py not found!")
-        return False
+        verify_bundle(bundle_path, manifest)
+    except BundleVerificationError as e:
+        print(f"❌ Model bundle {bundle_version} failed verification: {e}")
+        return False, [bundle_path]
+    
+    print(f"📦 Model bundle {bundle_version} verified")
+    return True, []
 
 def start_server():
     """Start the enhanced API server"""
@@ -55,8 +37,14 @@ def start_server():
     print("=" * 50)
     
     try:
-        # Import and run the server
-        from enhanced_api_server import app
+        # Import the server, then load the model and data and warm up as enhanced_api_server.py does
+        import enhanced_api_server as server
+        
+        if not server.load_model_and_data():
+            print("❌ Failed to load model and data. Server not started.")
+            return False
+        server.warm_up()
+        app = server.app
         
         print("✅ Server started successfully!")
         print("🌐 API available at: http://127.0.0.1:5001")
@@ -64,6 +52,7 @@ def start_server():
         print("  GET  / - API information")
         print("  GET  /health - Health check")
         print("  POST /predict - Enhanced prediction with ML model")
+        print("  POST /predict/batch - Batch prediction for many patients")
         print("  POST /care-template - Complete intelligent care template")
         print("  POST /risk-assessment - Risk assessment based on guidelines")
         print("  POST /cost-estimation - Detailed cost analysis")
@@ -97,16 +86,12 @@ def main():
     model_exists, missing_files = check_model_files()
     
     if not model_exists:
+        # Training is always an explicit step, never part of starting the server
         print(f"📋 Missing model files: {', '.join(missing_files)}")
-        
-        # Train the model
-        if not train_model():
-            print("❌ Failed to train model. Exiting.")
-            return False
-    else:
-        print("✅ Model files found. Skipping training.")
-        
-        # Start the server
+        print("❌ No usable model. Train one first with: python train_model.py")
+        return False
+    
+    print("✅ Model files found.")
     return start_server()
         
 if __name__ == "__main__":
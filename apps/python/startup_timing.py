@@ -0,0 +1,61 @@
+"""
+Startup timing for the Ovarian Cyst Prediction API
+Records how long each import and each loaded artifact takes so cold starts can be tracked
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+
+class StartupTimer:
+    """Collects import and artifact-load timings and prints a startup report
+
+    Imports are timed in the order they run, so a module shared by several
+    imports is charged to the first one that pulls it in.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports: List[Dict[str, Any]] = []
+        self.artifacts: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def _record(self, entries: List[Dict[str, Any]], name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entries.append({'name': name, 'ms': round((time.perf_counter() - started) * 1000.0, 2)})
+
+    def importing(self, name: str):
+        """Context manager timing the import statements inside it"""
+        return self._record(self.imports, name)
+
+    def loading(self, name: str):
+        """Context manager timing the load of one artifact (model bundle, data file, ...)"""
+        return self._record(self.artifacts, name)
+
+    def reset_artifacts(self):
+        """Forget artifact timings before a reload"""
+        self.artifacts = []
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'imports': list(self.imports),
+            'import_ms': round(sum(entry['ms'] for entry in self.imports), 2),
+            'artifacts': list(self.artifacts),
+            'artifact_ms': round(sum(entry['ms'] for entry in self.artifacts), 2),
+            'since_start_ms': round((time.perf_counter() - self.started) * 1000.0, 2)
+        }
+
+    def log(self):
+        """Print the startup report"""
+        report = self.report()
+        print(f"⏱️  Startup: imports {report['import_ms']:.0f} ms, "
+              f"artifacts {report['artifact_ms']:.0f} ms, "
+              f"{report['since_start_ms']:.0f} ms since process import")
+        for entry in report['imports']:
+            print(f"   import {entry['name']}: {entry['ms']:.1f} ms")
+        for entry in report['artifacts']:
+            print(f"   load {entry['name']}: {entry['ms']:.1f} ms")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch prediction endpoint
+"""
+
+import requests
+
+BASE_URL = "http://127.0.0.1:5001"
+
+test_patients = [
+    {
+        'Age': 35,
+        'Menopause Stage': 'Pre-menopausi',
+        'SI Cyst Size cm': 6.5,
+        'Cyst Growth': 0.2,
+        'fca 125 Level': 45,
+        'Ultrasound Fe': 'Complex cyst',
+        'Reported Sym': 'Pelvic pain, Bloating'
+    },
+    {
+        'Age': 62,
+        'Menopause Stage': 'Post-menopausi',
+        'SI Cyst Size cm': 11.0,
+        'Cyst Growth': 1.4,
+        'fca 125 Level': 600,
+        'Ultrasound Fe': 'Solid mass',
+        'Reported Sym': 'Bloating'
+    },
+    {
+        'Age': 28,
+        'Menopause Stage': 'Pre-menopausi',
+        'SI Cyst Size cm': 2.5,
+        'Cyst Growth': 0.0,
+        'fca 125 Level': 20,
+        'Ultrasound Fe': 'Simple cyst',
+        'Reported Sym': 'Fatigue'
+    }
+]
+
+def test_batch_prediction():
+    print("📦 Testing Batch Prediction...")
+    try:
+        response = requests.post(f"{BASE_URL}/predict/batch", json=test_patients)
+        print(f"Status: {response.status_code}")
+        if response.status_code == 200:
+            data = response.json()
+            print(f"✅ Processed {data['processed']}/{data['total_patients']} patients")
+            for result in data['results']:
+                if result['success']:
+                    print(f"   {result['index'] + 1}. {result['prediction']} "
+                          f"({result['confidence']:.2%}) - Risk: {result['risk_assessment']['risk_level']}")
+                else:
+                    print(f"   {result['index'] + 1}. ❌ {result['error']}")
+            return True
+        else:
+            print(f"❌ Error: {response.json()}")
+            return False
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def test_batch_matches_single():
+    print("\n🔍 Comparing Batch and Single Predictions...")
+    try:
+        batch = requests.post(f"{BASE_URL}/predict/batch", json=test_patients).json()
+        for patient, result in zip(test_patients, batch['results']):
+            single = requests.post(f"{BASE_URL}/predict", json=patient).json()
+            if single['probabilities'] != result['probabilities']:
+                print(f"❌ Mismatch for patient {result['index'] + 1}")
+                return False
+        print("✅ Batch predictions match single predictions")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting Batch Prediction Tests")
+    print("=" * 40)
+
+    test_batch_prediction()
+    test_batch_matches_single()
+
+    print("\n✅ All tests completed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for per-prediction feature contributions
+"""
+
+import time
+
+import requests
+
+from warmup import WARMUP_PATIENT
+
+BASE_URL = "http://127.0.0.1:5001"
+
+def test_explain_prediction():
+    print("🔍 Testing Prediction Explanation...")
+    try:
+        response = requests.post(f"{BASE_URL}/predict?explain=true&top_k=3", json=WARMUP_PATIENT)
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Error: {response.json()}")
+            return False
+
+        result = response.json()
+        explanation = result['explanation']
+        print(f"✅ {result['prediction']} ({result['confidence']:.2f}), baseline {explanation['baseline']}")
+        for item in explanation['top_contributors']:
+            print(f"   {item['feature']} = {item['value']}: {item['contribution']:+.4f}")
+        total = (explanation['baseline'] + explanation['other_features']
+                 + sum(item['contribution'] for item in explanation['top_contributors']))
+        print(f"   Contributions add up to {total:.3f} (confidence {result['confidence']:.3f})")
+        return abs(total - result['confidence']) < 0.01
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def test_explain_batch(batch_size=200):
+    print("\n📦 Testing Batch Explanation...")
+    try:
+        patients = [dict(WARMUP_PATIENT, Age=20 + n % 50) for n in range(batch_size)]
+        start = time.time()
+        response = requests.post(f"{BASE_URL}/predict/batch?explain=true", json={'patients': patients})
+        elapsed = time.time() - start
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Error: {response.json()}")
+            return False
+
+        explained = sum(1 for result in response.json()['results'] if 'explanation' in result)
+        print(f"✅ {explained}/{batch_size} predictions explained in {elapsed:.2f}s")
+        return explained == batch_size
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def test_care_template_rationale():
+    print("\n📋 Testing Care Template Rationale...")
+    try:
+        response = requests.post(f"{BASE_URL}/care-template?explain=true", json=WARMUP_PATIENT)
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Error: {response.json()}")
+            return False
+
+        print(f"✅ {response.json()['care_template']['ai_recommendation']['rationale']}")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting Explanation Tests")
+    print("=" * 40)
+
+    test_explain_prediction()
+    test_explain_batch()
+    test_care_template_rationale()
+
+    print("\n✅ All tests completed!")
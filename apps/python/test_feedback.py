@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for outcome feedback and incremental model updates
+"""
+
+import time
+
+import requests
+
+BASE_URL = "http://127.0.0.1:5001"
+
+def test_record_feedback():
+    print("📝 Testing Outcome Feedback...")
+    try:
+        response = requests.post(f"{BASE_URL}/feedback", json={
+            'patient_id': 'OC-1001',
+            'actual_treatment': 'Surgery',
+            'predicted_treatment': 'Medication',
+            'clinician': 'test-script'
+        })
+        print(f"Status: {response.status_code}")
+        if response.status_code != 201:
+            print(f"❌ Error: {response.json()}")
+            return False
+
+        summary = requests.get(f"{BASE_URL}/feedback").json()['summary']
+        print(f"✅ {summary['total_outcomes']} outcomes recorded, "
+              f"{summary['prediction_overruled']} overruled the model")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def test_incremental_training():
+    print("\n🌲 Testing Incremental Training...")
+    try:
+        response = requests.post(f"{BASE_URL}/train/incremental", json={'mode': 'warm_start', 'new_trees': 20})
+        print(f"Status: {response.status_code}")
+        if response.status_code not in (202, 409):
+            print(f"❌ Error: {response.json()}")
+            return False
+
+        status_url = response.json()['status_url']
+        for _ in range(120):
+            job = requests.get(f"{BASE_URL}{status_url}").json()['job']
+            if job['status'] not in ('queued', 'running'):
+                break
+            time.sleep(1)
+
+        evaluation = job['evaluation'] or {}
+        print(f"✅ Job {job['status']}: holdout accuracy "
+              f"{evaluation.get('current_accuracy')} -> {evaluation.get('candidate_accuracy')}")
+        if job['status'] == 'rejected':
+            print(f"   Not promoted: {job['error']}")
+        return job['status'] in ('succeeded', 'rejected')
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting Feedback Tests")
+    print("=" * 40)
+
+    test_record_feedback()
+    test_incremental_training()
+
+    print("\n✅ All tests completed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-model routing (start the server with MODEL_CANDIDATES set)
+"""
+
+from collections import Counter
+
+import requests
+
+from warmup import WARMUP_PATIENT
+
+BASE_URL = "http://127.0.0.1:5001"
+
+def test_list_models():
+    print("🧩 Testing Model Registry...")
+    try:
+        response = requests.get(f"{BASE_URL}/models")
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Error: {response.json()}")
+            return []
+
+        stats = response.json()
+        for model in stats['models']:
+            print(f"✅ {model['name']} ({model['model_type']}, version {model['version']}): "
+                  f"{model['memory_bytes'] / 1024:.0f} KB, p95 {model['latency']['p95_ms']} ms, "
+                  f"shadow agreement {model['shadow']['agreement_rate']}")
+        print(f"   Routing: {stats['routing']}")
+        return [model['name'] for model in stats['models']]
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return []
+
+def test_header_routing(names=None):
+    print("\n🔀 Testing X-Model Header Routing...")
+    try:
+        if names is None:
+            names = [model['name'] for model in requests.get(f"{BASE_URL}/models").json()['models']]
+        for name in names:
+            response = requests.post(f"{BASE_URL}/predict", json=WARMUP_PATIENT, headers={'X-Model': name})
+            served = response.headers.get('X-Model-Name')
+            print(f"{'✅' if served == name else '❌'} Asked for {name}, served by {served} "
+                  f"(version {response.headers.get('X-Model-Version')})")
+
+            response = requests.post(f"{BASE_URL}/predict/batch", json={'patients': [WARMUP_PATIENT] * 3},
+                                     headers={'X-Model': name, 'Accept': 'application/x-ndjson'})
+            served = response.headers.get('X-Model-Name')
+            print(f"{'✅' if served == name else '❌'} Streamed batch for {name}, served by {served} "
+                  f"(version {response.headers.get('X-Model-Version')})")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def test_traffic_split(requests_to_send=50):
+    print("\n📊 Testing Traffic Split...")
+    try:
+        served = Counter()
+        for n in range(requests_to_send):
+            patient = dict(WARMUP_PATIENT, Age=20 + n)
+            response = requests.post(f"{BASE_URL}/predict", json=patient)
+            served[response.headers.get('X-Model-Name')] += 1
+        print(f"✅ {requests_to_send} requests served by: {dict(served)}")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting Model Registry Tests")
+    print("=" * 40)
+
+    names = test_list_models()
+    test_header_routing(names)
+    test_traffic_split()
+    test_list_models()
+
+    print("\n✅ All tests completed!")
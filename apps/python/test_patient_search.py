@@ -82,6 +82,43 @@ def test_list_patients():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def test_cursor_pages():
+    print("\n📑 Testing Cursor Pagination...")
+    try:
+        seen, cursor, pages = [], '', 0
+        while cursor is not None and pages < 1000:
+            response = requests.get(f"{BASE_URL}/patients", params={'cursor': cursor, 'per_page': 25})
+            if response.status_code != 200:
+                print(f"❌ Error: {response.json()}")
+                return
+            data = response.json()
+            seen.extend(patient['patient_id'] for patient in data['patients'])
+            cursor = data['pagination']['next_cursor']
+            pages += 1
+        print(f"✅ Walked {pages} pages, {len(seen)} patients of {data['pagination']['total_patients']}")
+        print(f"   In ID order: {seen == sorted(seen)}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_stream_patients():
+    print("\n🌊 Testing NDJSON Patient Stream...")
+    try:
+        response = requests.get(f"{BASE_URL}/patients",
+                                headers={'Accept': 'application/x-ndjson'}, stream=True)
+        print(f"Status: {response.status_code} ({response.headers.get('Content-Type')})")
+        if response.status_code == 200:
+            count = 0
+            for line in response.iter_lines():
+                if line:
+                    patient = json.loads(line)
+                    count += 1
+            print(f"✅ Streamed {count} patients (expected {response.headers.get('X-Total-Count')})")
+            print(f"   Last: {patient['patient_id']} - Region: {patient['region']}")
+        else:
+            print(f"❌ Error: {response.text}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
 def main():
     print("🚀 Starting Patient Search Tests")
     print("="*40)
@@ -93,6 +130,8 @@ def main():
     test_search_patient()
     test_care_template()
     test_list_patients()
+    test_cursor_pages()
+    test_stream_patients()
     
     print("\n✅ All tests completed!")
 
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Test script for the readiness probe and startup warm-up
+"""
+
+import requests
+
+BASE_URL = "http://127.0.0.1:5001"
+
+def test_ready():
+    print("🔥 Testing Readiness Probe...")
+    try:
+        response = requests.get(f"{BASE_URL}/ready")
+        print(f"Status: {response.status_code}")
+        result = response.json()
+        if response.status_code != 200 or not result['ready']:
+            print(f"❌ Server not ready: {result}")
+            return False
+
+        warmup = result['warmup']
+        print(f"✅ Warm-up completed in {warmup['total_ms']:.0f} ms")
+        for step in warmup['steps']:
+            print(f"   {step['step']}: {step['ms']:.1f} ms (status {step['status']})")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting Readiness Tests")
+    print("=" * 40)
+
+    test_ready()
+
+    print("\n✅ All tests completed!")
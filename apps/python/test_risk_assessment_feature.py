@@ -71,6 +71,31 @@ def test_cost_estimation_endpoint():
         print(f"❌ Cost Estimation Endpoint - ERROR: {e}")
         return False
 
+def test_regional_cost_estimation():
+    """Test cost estimation priced at a named region"""
+    print("\n🗺️ Testing Regional Cost Estimation...")
+    
+    try:
+        response = requests.post(
+            'http://127.0.0.1:5001/cost-estimation',
+            json=dict(test_patient_data, Region='Kitale'),
+            headers={'Content-Type': 'application/json'}
+        )
+        
+        if response.status_code == 200:
+            estimate = response.json().get('cost_estimation', {})
+            print("✅ Regional Cost Estimation - SUCCESS")
+            print(f"   Priced at: {estimate.get('facility')} ({estimate.get('region')})")
+            print(f"   Base Cost: {estimate.get('base_cost')} KES")
+            return True
+        else:
+            print(f"❌ Regional Cost Estimation - FAILED (Status: {response.status_code})")
+            print(f"   Response: {response.text}")
+            return False
+    except Exception as e:
+        print(f"❌ Regional Cost Estimation - ERROR: {e}")
+        return False
+
 def test_inventory_status_endpoint():
     """Test the inventory status endpoint"""
     print("\n📦 Testing Inventory Status Endpoint...")
@@ -189,6 +214,7 @@ def main():
     tests = [
         test_risk_assessment_endpoint,
         test_cost_estimation_endpoint,
+        test_regional_cost_estimation,
         test_inventory_status_endpoint,
         test_care_template_endpoint,
         test_patients_endpoint,
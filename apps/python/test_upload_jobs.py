@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for background dataset upload jobs
+"""
+
+import io
+import time
+
+import pandas as pd
+import requests
+
+BASE_URL = "http://127.0.0.1:5001"
+
+def make_upload(repeat=1):
+    """CSV built from the bundled patient data"""
+    data = pd.concat([pd.read_csv('patient_data.csv')] * repeat, ignore_index=True)
+    return io.BytesIO(data.to_csv(index=False).encode('utf-8'))
+
+def wait_for_job(job_id, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = requests.get(f"{BASE_URL}/jobs/{job_id}").json()['job']
+        if job['status'] not in ('queued', 'running'):
+            return job
+        progress = job['progress']
+        print(f"   ⏳ {job['status']}: {progress.get('total_records', 0)} rows "
+              f"({progress.get('rows_per_second', 0)} rows/s)")
+        time.sleep(1)
+    return job
+
+def test_upload_job():
+    print("📤 Testing Background Upload Job...")
+    try:
+        response = requests.post(f"{BASE_URL}/upload-dataset",
+                                 files={'file': ('patients.csv', make_upload(50), 'text/csv')})
+        print(f"Status: {response.status_code}")
+        if response.status_code != 202:
+            print(f"❌ Error: {response.json()}")
+            return False
+
+        job = wait_for_job(response.json()['job_id'])
+        if job['status'] != 'succeeded':
+            print(f"❌ Job {job['status']}: {job['error']}")
+            return False
+        result = job['result']
+        print(f"✅ Processed {result['processed_records']}/{result['total_records']} records "
+              f"in {job['duration_seconds']}s")
+        scored = requests.get(f"{BASE_URL}{result['results_url']}")
+        print(f"✅ Scored file: {len(scored.content)} bytes")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def test_cancel_job():
+    print("\n🛑 Testing Job Cancellation...")
+    try:
+        job_id = requests.post(f"{BASE_URL}/upload-dataset",
+                               files={'file': ('patients.csv', make_upload(500), 'text/csv')}).json()['job_id']
+        response = requests.post(f"{BASE_URL}/jobs/{job_id}/cancel")
+        print(f"Status: {response.status_code} - {response.json()['message']}")
+        job = wait_for_job(job_id)
+        if job['status'] == 'cancelled':
+            print("✅ Job cancelled")
+            return True
+        print(f"❌ Job ended as {job['status']}")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting Upload Job Tests")
+    print("=" * 40)
+
+    test_upload_job()
+    test_cancel_job()
+
+    print("\n✅ All tests completed!")
@@ -1,35 +1,73 @@
-import pandas as pd
-import joblib
-from ovarian_cyst_predictor import preprocess_and_clean, train_and_evaluate
+import argparse
+from ovarian_cyst_predictor import compare_search_strategies, train_and_evaluate, train_decision_tree
+from feature_cache import load_training_frame
+from model_search import SEARCH_MODES
+from model_store import MODELS_DIR, set_current_version, write_bundle
 import os
 
-def train_and_save_model():
-    """Train the model and save it for the API"""
+def train_and_save_model(search=None, time_budget=None, budget_clock=None, model_type='forest', promote=True):
+    """Train the model and save it as a versioned bundle for the API
+
+    With ``promote=False`` the bundle is written but CURRENT is left alone, so
+    it can be served as a candidate model (MODEL_CANDIDATES=name=<version>).
+    """
     try:
-        print("Loading data...")
-        original_patient_data = pd.read_csv('patient_data.csv')
-        
-        print("Preprocessing data...")
-        processed_data, target_label_encoder = preprocess_and_clean(original_patient_data)
+        print("Loading preprocessed data...")
+        processed_data, target_label_encoder = load_training_frame('patient_data.csv')
         
         print("Training model...")
-        model, feature_columns, scaler = train_and_evaluate(processed_data, target_label_encoder)
+        if model_type == 'tree':
+            model, feature_columns, scaler = train_decision_tree(processed_data, target_label_encoder)
+        else:
+            model, feature_columns, scaler = train_and_evaluate(processed_data, target_label_encoder,
+                                                                search, time_budget, budget_clock)
         
-        print("Saving model and preprocessing objects...")
-        joblib.dump(model, 'trained_model.pkl')
-        joblib.dump(feature_columns, 'feature_columns.pkl')
-        joblib.dump(target_label_encoder, 'target_encoder.pkl')
-        joblib.dump(scaler, 'scaler.pkl')
+        print("Saving model bundle...")
+        bundle_path, manifest = write_bundle({
+            'model': model,
+            'feature_columns': feature_columns,
+            'target_encoder': target_label_encoder,
+            'scaler': scaler
+        }, MODELS_DIR, training_data_path='patient_data.csv')
+        if promote:
+            set_current_version(MODELS_DIR, manifest['version'])
         
         print("Model training completed successfully!")
-        print("Files saved:")
-        print("- trained_model.pkl")
-        print("- feature_columns.pkl")
-        print("- target_encoder.pkl")
-        print("- scaler.pkl")
+        print(f"Bundle saved: {bundle_path}")
+        print(f"- Version: {manifest['version']}")
+        print(f"- Training data hash: {manifest['training_data_hash'][:12]}")
+        print(f"- Features: {len(manifest['schema']['feature_columns'])}")
+        print(f"- Classes: {', '.join(manifest['schema']['classes'])}")
+        if not promote:
+            print(f"- Not promoted; serve it as a candidate with MODEL_CANDIDATES=<name>={manifest['version']}")
         
     except Exception as e:
         print(f"Error training model: {e}")
 
+def compare_search(time_budget=None, budget_clock=None):
+    """Print accuracy against search time for every search mode (nothing is saved)"""
+    processed_data, _ = load_training_frame('patient_data.csv')
+    compare_search_strategies(processed_data, time_budget, budget_clock or 'wall')
+
 if __name__ == "__main__":
-    train_and_save_model() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Train the ovarian cyst treatment model')
+    parser.add_argument('--search', choices=SEARCH_MODES,
+                        help='Hyperparameter search (default: TRAINING_SEARCH or grid)')
+    parser.add_argument('--time-budget', type=float,
+                        help='Seconds allowed for the halving/random search (default: TRAINING_TIME_BUDGET)')
+    parser.add_argument('--budget-clock', choices=['wall', 'cpu'],
+                        help='Measure the budget in wall-clock or CPU seconds (default: TRAINING_BUDGET_CLOCK or wall)')
+    parser.add_argument('--model-type', choices=['forest', 'tree'], default='forest',
+                        help='Random forest (default) or a single decision tree')
+    parser.add_argument('--no-promote', action='store_true',
+                        help='Save the bundle without making it the current model')
+    parser.add_argument('--compare-search', action='store_true',
+                        help='Compare accuracy and time of all search modes instead of training')
+    args = parser.parse_args()
+
+    if args.compare_search:
+        compare_search(args.time_budget, args.budget_clock)
+    else:
+        train_and_save_model(args.search, args.time_budget, args.budget_clock,
+                             args.model_type, not args.no_promote)
+